@@ -1452,6 +1452,18 @@ def scene(
         }
 
 
+@mcp.tool()
+def update_profile(
+    action: str = "get", instance_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Scene update call counts and timings per frame. action: 'start', 'stop', 'reset', 'get'."""
+    bridge, err = _resolve_bridge(instance_id)
+    if err:
+        return err
+
+    return bridge.send_command({"command": "get_update_profile", "action": action})
+
+
 @mcp.tool()
 def window(name: str = None, instance_id: Optional[str] = None) -> Dict[str, Any]:
     """List windows if no name, activate window if name provided."""
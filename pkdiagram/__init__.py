@@ -1,3 +1,7 @@
+from . import startuptrace
+
+startuptrace.startFromEnvironment()
+
 from . import pepper
 
 PEPPER = pepper.PEPPER
@@ -5,12 +9,25 @@ PEPPER = pepper.PEPPER
 from . import util
 from .slugify import slugify
 from . import version
-from . import scene
-from . import models
-from . import widgets
-from . import views
-from . import documentview
-from . import mainwindow
-from . import app
-from . import qnam
-from . import server_types
+
+# Subsystems are imported on first access so that each entry point (pro app,
+# personal app, tests, tools) only pays for what it uses.
+_SUBSYSTEMS = (
+    "scene",
+    "models",
+    "widgets",
+    "views",
+    "documentview",
+    "mainwindow",
+    "app",
+    "qnam",
+    "server_types",
+)
+
+
+def __getattr__(name):
+    if name in _SUBSYSTEMS:
+        import importlib
+
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,7 +7,7 @@ import pickle
 import enum
 import datetime
 import platform
-from typing import Callable
+from typing import Callable, TYPE_CHECKING
 from dataclasses import dataclass
 
 from pkdiagram.pyqt import (
@@ -20,7 +20,9 @@ from pkdiagram.pyqt import (
 )
 from pkdiagram import util, version
 from pkdiagram.qnam import QNAM
-from pkdiagram.server_types import User
+
+if TYPE_CHECKING:
+    from pkdiagram.server_types import User
 
 
 log = logging.getLogger(__name__)
@@ -57,7 +59,7 @@ class DatadogLog:
     time: float
     message: str
     status: DatadogLogStatus = DatadogLogStatus.Info
-    user: User = None
+    user: "User" = None
     session_id: str = None
     fdtype: DatadogFDType = DatadogFDType.Log
     extras: dict = None
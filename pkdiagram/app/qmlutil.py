@@ -3,7 +3,7 @@ TODO: This is currently in pkdiagram.app but really should be scoped to the
 qmlEngine. maybe even moved to qmlengine.py.
 """
 
-import pickle, json, datetime, time, logging
+import pickle, datetime, time, logging
 
 from btcopilot.schema import EventKind, RelationshipKind
 from btcopilot import schema
@@ -33,7 +33,6 @@ from pkdiagram.pyqt import (
 )
 from pkdiagram import util
 from pkdiagram.models import QObjectHelper
-from pkdiagram.server_types import HTTPError
 
 
 log = logging.getLogger(__name__)
@@ -47,6 +46,30 @@ def find_global_type(attr):
         return type(value)
 
 
+_JS_NULL = QJSValue(QJSValue.NullValue)
+
+
+def _qmlValue(o):
+    """
+    Convert an unpickled response into values that PyQt passes to QML as
+    native objects and arrays through a QVariantMap signal argument. This
+    matches what json.dumps() + JSON.parse() used to produce: None is null
+    rather than a dropped key, keys are strings, and datetimes are ISO strings.
+    """
+    if o is None:
+        return _JS_NULL
+    elif isinstance(o, (str, bool, int, float)):
+        return o
+    elif isinstance(o, dict):
+        return {str(k): _qmlValue(v) for k, v in o.items()}
+    elif isinstance(o, (list, tuple)):
+        return [_qmlValue(x) for x in o]
+    elif isinstance(o, datetime.datetime):
+        return o.isoformat()
+    else:
+        return _JS_NULL
+
+
 class QmlUtil(QObject, QObjectHelper):
     """
     TODO: This whole class should not manage dynamic globals from util, it should
@@ -165,9 +188,7 @@ class QmlUtil(QObject, QObjectHelper):
         super().__init__(parent)
         self.setObjectName("util")
         parent.paletteChanged.connect(self.initColors)
-        self._httpReplies = {}
-        self._lastHttpRequestId = 0
-        self._httpRequests = []
+        self._httpRequests = {}  # QML request id: HTTPRequest
         self.initQObjectHelper()
 
     def deinit(self):
@@ -417,11 +438,15 @@ class QmlUtil(QObject, QObjectHelper):
     def copyToClipboard(self, text):
         QApplication.clipboard().setText(text)
 
-    jsServerHttpFinished = pyqtSignal(int, QJSValue, arguments=["id", "response"])
+    jsServerHttpFinished = pyqtSignal(
+        int, "QVariantMap", arguments=["id", "response"]
+    )
 
     @pyqtSlot(QVariant, int, str, str)
     @pyqtSlot(QVariant, int, str, str, QVariant)
     def jsServerHttp(self, session, requestId, method, path, args=None):
+        from pkdiagram.server_types import HTTPError
+
         log.debug(f"{requestId}, {method}, {path}")
         if args is not None:
             data = args.toVariant()
@@ -441,16 +466,19 @@ class QmlUtil(QObject, QObjectHelper):
             def _onSSLErrors(self):
                 pass
 
-            def onFinished(self):
+            def disconnect(self):
                 self.reply.sslErrors.disconnect(self._onSSLErrors)
                 self.reply.finished.disconnect(self.onFinished)
+
+            def onFinished(self):
+                self.disconnect()
                 # Super janky signal-and-id based callback-based mechanism because
                 # `callback` (QJSValue) was becoming not callable by the time the http
                 # request finished!  WTF!?!?!
                 # Can maybe try QJSValue(callback) to retain callable status?
                 # - https://wiki.python.org/moin/PyQt/QML%20callback%20function
                 # self.here(requestId, reply.url(), reply.attribute(QNetworkRequest.HttpStatusCodeAttribute))
-                args = session.qmlEngine().newObject()
+                response = {}
                 try:
                     session.server().checkHTTPReply(reply, quiet=False)
                 except HTTPError as e:
@@ -464,31 +492,28 @@ class QmlUtil(QObject, QObjectHelper):
                         data = pickle.loads(bdata)
                     except pickle.UnpicklingError:
                         data = bdata.decode("utf-8")
-
-                    def myconverter(o):
-                        if isinstance(o, datetime.datetime):
-                            return o.isoformat()
-
-                    jsonString = json.dumps(
-                        data, default=myconverter
-                    )  # How to PyObject to QJSValue?
-                    args.setProperty("_data", jsonString)
+                    response["data"] = _qmlValue(data)
                 httpCode = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
                 if httpCode is None:
                     httpCode = 0
-                args.setProperty("status_code", httpCode)
+                response["status_code"] = httpCode
                 if httpCode != 200 and reply.hasRawHeader(b"FD-User-Message"):
                     user_message = bytes(reply.rawHeader(b"FD-User-Message")).decode(
                         "utf-8"
                     )
-                    args.setProperty("user_message", user_message)
-                self.qmlUtil.jsServerHttpFinished.emit(self.jsId, args)
-                self.qmlUtil._httpRequests.remove(self)
-                for request in self.qmlUtil._httpRequests:
-                    if request is self:
-                        self.qmlUtil._httpRequests.remove(request)
-
-        self._httpRequests.append(HTTPRequest(self, requestId, reply))
+                    response["user_message"] = user_message
+                self.qmlUtil._httpRequests.pop(self.jsId, None)
+                self.qmlUtil.jsServerHttpFinished.emit(self.jsId, response)
+
+        self._httpRequests[requestId] = HTTPRequest(self, requestId, reply)
+
+    @pyqtSlot(int)
+    def jsServerHttpCancel(self, requestId):
+        """Abort a request from jsServerHttp() without emitting jsServerHttpFinished."""
+        request = self._httpRequests.pop(requestId, None)
+        if request:
+            request.disconnect()
+            request.reply.abort()
 
     @pyqtSlot(str, str, result=bool)
     def questionBox(self, title, text):
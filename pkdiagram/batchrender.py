@@ -0,0 +1,302 @@
+"""
+Headless batch renderer for .fd packages.
+
+Loads each package into a Scene under the offscreen platform plugin, sets the
+date, layers and tags, and renders the print rect to PNG and/or PDF without a
+MainWindow. Packages are spread over a pool of worker processes, each of which
+owns one QApplication and renders one scene at a time. A manifest.json with
+one entry per package is written next to the images, e.g.:
+
+    python -m pkdiagram.batchrender ~/archive -o ~/thumbs --max-size 512
+    python -m pkdiagram.batchrender case.fd -o out --format pdf \\
+        --date 1985-06-01 --layer "Cutoffs" --tag nuclear
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import logging
+import argparse
+import traceback
+import multiprocessing
+import concurrent.futures
+from dataclasses import dataclass, asdict
+
+
+_log = logging.getLogger(__name__)
+
+
+FORMATS = ("png", "pdf")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    formats: tuple = ("png",)
+    dateTime: str | None = None  # ISO date, default is the diagram's saved date
+    layers: tuple = ()  # layer names to activate
+    tags: tuple = ()  # active tags
+    scale: float = 2.0  # image pixels per scene unit, before maxSize
+    maxSize: int | None = None  # longest side of PNGs in pixels, i.e. thumbnails
+    skipUnchanged: bool = False  # skip when outputs are newer than the package
+
+
+def findPackages(paths) -> list[str]:
+    """Expand directories into the .fd packages found under them."""
+    ret = []
+    for path in paths:
+        path = os.path.abspath(os.path.expanduser(path))
+        if path.endswith(".fd") and os.path.isdir(path):
+            ret.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            for name in list(dirs):
+                if name.endswith(".fd"):
+                    ret.append(os.path.join(root, name))
+                    dirs.remove(name)
+    return sorted(set(ret))
+
+
+def outputPath(fdPath, outputDir, fmt) -> str:
+    name = os.path.splitext(os.path.basename(fdPath.rstrip(os.sep)))[0]
+    return os.path.join(outputDir, f"{name}.{fmt}")
+
+
+def _ensureApp():
+    from pkdiagram.pyqt import QApplication
+
+    app = QApplication.instance()
+    if app is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+def _isUpToDate(fdPath, outputs) -> bool:
+    picklePath = os.path.join(fdPath, "diagram.pickle")
+    try:
+        mtime = os.path.getmtime(picklePath)
+        return all(os.path.getmtime(x) >= mtime for x in outputs)
+    except OSError:
+        return False
+
+
+def loadScene(fdPath):
+    from pkdiagram.scene import Scene
+
+    with open(os.path.join(fdPath, "diagram.pickle"), "rb") as f:
+        data = pickle.loads(f.read())
+    scene = Scene()
+    scene.read(data)
+    return scene
+
+
+def applyOptions(scene, options: RenderOptions):
+    """Set the date, layers and tags and update the scene without animations."""
+    from pkdiagram.pyqt import QDate, QDateTime
+
+    if options.dateTime:
+        date = QDate.fromString(options.dateTime, "yyyy-MM-dd")
+        if not date.isValid():
+            raise ValueError(f"Invalid date: {options.dateTime}")
+        scene.setCurrentDateTime(QDateTime(date))
+    for name in options.layers:
+        layers = scene.layers(name=name)
+        if not layers:
+            raise ValueError(f"No layer named '{name}'")
+        for layer in layers:
+            layer.setActive(True)
+    if options.tags:
+        scene.setActiveTags(list(options.tags))
+    scene.updateAll()
+
+
+def writePNG(scene, rect, filePath, scale=2.0, maxSize=None):
+    from pkdiagram.pyqt import Qt, QImage, QPainter, QRectF
+
+    if maxSize:
+        scale = min(scale, maxSize / max(rect.width(), rect.height()))
+    size = (rect.size() * scale).toSize()
+    image = QImage(size, QImage.Format_ARGB32)
+    image.fill(Qt.transparent)
+    painter = QPainter()
+    painter.begin(image)
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    scene.render(painter, QRectF(0, 0, size.width(), size.height()), rect)
+    painter.end()
+    if not image.save(filePath, "PNG", 100):
+        raise IOError(f"Could not write {filePath}")
+    return {"width": size.width(), "height": size.height()}
+
+
+def writePDF(scene, rect, filePath):
+    from pkdiagram.pyqt import (
+        QPainter,
+        QPdfWriter,
+        QPageSize,
+        QPageLayout,
+        QMarginsF,
+        QRectF,
+    )
+
+    writer = QPdfWriter(filePath)
+    writer.setResolution(72)  # one point per scene unit
+    writer.setPageSize(QPageSize(rect.size(), QPageSize.Point))
+    writer.setPageMargins(QMarginsF(0, 0, 0, 0), QPageLayout.Point)
+    painter = QPainter()
+    if not painter.begin(writer):
+        raise IOError(f"Could not write {filePath}")
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    scene.render(painter, QRectF(0, 0, writer.width(), writer.height()), rect)
+    painter.end()
+    painter = None  # control dtor order, before writer
+    return {"width": rect.width(), "height": rect.height()}
+
+
+def renderOne(fdPath, outputDir, options: RenderOptions) -> dict:
+    """Render one package. Never raises; errors are reported in the result."""
+    start = time.perf_counter()
+    result = {"source": fdPath, "ok": False, "outputs": {}, "error": None}
+    outputs = {fmt: outputPath(fdPath, outputDir, fmt) for fmt in options.formats}
+    if options.skipUnchanged and _isUpToDate(fdPath, outputs.values()):
+        result["ok"] = True
+        result["skipped"] = True
+        result["outputs"] = {fmt: {"path": path} for fmt, path in outputs.items()}
+        return result
+    _ensureApp()
+    scene = None
+    try:
+        scene = loadScene(fdPath)
+        applyOptions(scene, options)
+        rect = scene.printRect()
+        if rect.isEmpty():
+            raise ValueError("Nothing to render")
+        result["printRect"] = [rect.x(), rect.y(), rect.width(), rect.height()]
+        result["people"] = len(scene.people())
+        for fmt, path in outputs.items():
+            if fmt == "png":
+                info = writePNG(scene, rect, path, options.scale, options.maxSize)
+            else:
+                info = writePDF(scene, rect, path)
+            result["outputs"][fmt] = {"path": path, **info}
+        result["ok"] = True
+    except Exception as e:
+        _log.debug(traceback.format_exc())
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if scene is not None:
+            scene.deinit()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def renderAll(
+    fdPaths, outputDir, options: RenderOptions, jobs=None, progress=None
+) -> dict:
+    """
+    Render `fdPaths` over `jobs` worker processes (default one per CPU, 1 to
+    render in this process) and write the manifest. Returns the manifest.
+    """
+    os.makedirs(outputDir, exist_ok=True)
+    start = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    results = []
+    if jobs == 1 or len(fdPaths) < 2:
+        for fdPath in fdPaths:
+            results.append(renderOne(fdPath, outputDir, options))
+            if progress:
+                progress(results[-1])
+    else:
+        # spawn, not fork, so each worker starts its own QApplication cleanly.
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(jobs, len(fdPaths)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_ensureApp,
+        ) as pool:
+            futures = {
+                pool.submit(renderOne, fdPath, outputDir, options): fdPath
+                for fdPath in fdPaths
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:  # i.e. a worker crashed in Qt
+                    result = {
+                        "source": futures[future],
+                        "ok": False,
+                        "outputs": {},
+                        "error": repr(e),
+                    }
+                results.append(result)
+                if progress:
+                    progress(result)
+    results.sort(key=lambda x: x.get("source") or "")
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "options": asdict(options),
+        "seconds": time.perf_counter() - start,
+        "count": len(results),
+        "failed": sum(1 for x in results if not x["ok"]),
+        "results": results,
+    }
+    with open(os.path.join(outputDir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pkdiagram.batchrender",
+        description=__doc__.split("\n\n")[1],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("paths", nargs="+", help=".fd packages or folders of them")
+    parser.add_argument("-o", "--output", required=True, help="Output folder")
+    parser.add_argument(
+        "--format",
+        action="append",
+        choices=FORMATS,
+        help="Output format; may be repeated (default: png)",
+    )
+    parser.add_argument("--date", help="Current date as YYYY-MM-DD")
+    parser.add_argument("--layer", action="append", default=[], help="Layer name")
+    parser.add_argument("--tag", action="append", default=[], help="Active tag")
+    parser.add_argument("--scale", type=float, default=RenderOptions.scale)
+    parser.add_argument("--max-size", type=int, help="Longest PNG side in pixels")
+    parser.add_argument("--skip-unchanged", action="store_true")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes")
+    args = parser.parse_args(argv)
+
+    options = RenderOptions(
+        formats=tuple(args.format or ["png"]),
+        dateTime=args.date,
+        layers=tuple(args.layer),
+        tags=tuple(args.tag),
+        scale=args.scale,
+        maxSize=args.max_size,
+        skipUnchanged=args.skip_unchanged,
+    )
+    fdPaths = findPackages(args.paths)
+    if not fdPaths:
+        print("No .fd packages found", file=sys.stderr)
+        return 1
+
+    def progress(result):
+        status = "ok" if result["ok"] else f"FAILED: {result['error']}"
+        print(f"{result.get('source')}: {status}", file=sys.stderr)
+
+    manifest = renderAll(fdPaths, args.output, options, args.jobs, progress)
+    print(
+        f"Rendered {manifest['count'] - manifest['failed']}/{manifest['count']} "
+        f"in {manifest['seconds']:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if manifest["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
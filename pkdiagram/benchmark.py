@@ -0,0 +1,339 @@
+"""
+Scene benchmark suite.
+
+Generates a synthetic diagram (see pkdiagram.scene.diagramgenerator) and times
+the scene operations that scale with diagram size. Results are written as JSON
+so that two runs can be compared, e.g.:
+
+    python -m pkdiagram.benchmark --people 5000 -o before.json
+    git checkout my-branch
+    python -m pkdiagram.benchmark --people 5000 -o after.json --compare before.json
+
+--compare prints the ratio for each timing and exits with status 1 when any
+of them got slower than --threshold.
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import random
+import logging
+import argparse
+import contextlib
+import platform
+import statistics
+import subprocess
+
+
+_log = logging.getLogger(__name__)
+
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 1.25
+SCRUB_STEPS = 50
+BULK_DELETE_FRACTION = 0.1
+
+
+class Timer:
+    """Collects named timings over the repeats of one case."""
+
+    def __init__(self):
+        self.timings = {}  # name: [seconds]
+
+    @contextlib.contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.setdefault(name, []).append(time.perf_counter() - start)
+
+
+class Context:
+    """The generated diagram shared by all cases."""
+
+    def __init__(self, spec):
+        from pkdiagram.scene import Scene
+        from pkdiagram.scene.diagramgenerator import generate
+
+        self.spec = spec
+        self.scene = Scene()
+        self.diagram = generate(spec, self.scene)
+        self.data = {}
+        self.scene.write(self.data)
+        self.rng = random.Random(spec.seed)
+
+    def deinit(self):
+        self.scene.deinit()
+
+
+## Cases
+#
+# Each case runs one repeat and records one or more timings. The scene must be
+# left as it was found so that the cases do not depend on their order.
+
+
+def bench_generate(ctx, timer):
+    from pkdiagram.scene import Scene
+    from pkdiagram.scene.diagramgenerator import generate
+
+    scene = Scene()
+    with timer.time("generate"):
+        generate(ctx.spec, scene)
+    scene.deinit()
+
+
+def bench_write(ctx, timer):
+    data = {}
+    with timer.time("write"):
+        ctx.scene.write(data)
+
+
+def bench_read(ctx, timer):
+    from pkdiagram.scene import Scene
+
+    scene = Scene()
+    with timer.time("read"):
+        scene.read(ctx.data)
+    scene.deinit()
+
+
+def bench_pickle(ctx, timer):
+    with timer.time("pickle.save"):
+        bdata = pickle.dumps(ctx.data)
+    with timer.time("pickle.load"):
+        pickle.loads(bdata)
+
+
+def bench_layers(ctx, timer):
+    layers = ctx.diagram.layers
+    if not layers:
+        return
+    with timer.time("layers.switch"):
+        for layer in layers:
+            layer.setActive(True)
+            layer.setActive(False)
+    with timer.time("tags.switch"):
+        for tag in ctx.diagram.tags:
+            ctx.scene.setActiveTags([tag])
+        ctx.scene.setActiveTags([])
+
+
+def bench_scrub(ctx, timer):
+    dateTimes = sorted({x.dateTime() for x in ctx.scene.events() if x.dateTime()})
+    if not dateTimes:
+        return
+    step = max(1, len(dateTimes) // SCRUB_STEPS)
+    original = ctx.scene.currentDateTime()
+    with timer.time("currentDateTime.scrub"):
+        for dateTime in dateTimes[::step]:
+            ctx.scene.setCurrentDateTime(dateTime)
+    ctx.scene.setCurrentDateTime(original)
+
+
+def bench_timeline(ctx, timer):
+    from pkdiagram.models import TimelineModel
+
+    model = TimelineModel()
+    with timer.time("timeline.refresh"):
+        model.scene = ctx.scene
+    model.scene = None
+
+
+def bench_search(ctx, timer):
+    from pkdiagram.models import TimelineModel, SearchModel
+
+    model = TimelineModel()
+    model.scene = ctx.scene
+    searchModel = SearchModel()
+    searchModel.scene = ctx.scene
+    model.searchModel = searchModel
+    with timer.time("search.tags"):
+        for tag in ctx.diagram.tags:
+            searchModel.tags = [tag]
+        searchModel.tags = []
+    with timer.time("search.description"):
+        searchModel.description = "Symptom"
+        searchModel.description = ""
+    model.searchModel = None
+    model.scene = None
+
+
+def bench_bulk_delete(ctx, timer):
+    people = ctx.scene.people()
+    n = max(1, int(len(people) * BULK_DELETE_FRACTION))
+    victims = ctx.rng.sample(people, n)
+    with timer.time("bulkDelete.remove"):
+        ctx.scene.removeItems(*victims, undo=True)
+    with timer.time("bulkDelete.undo"):
+        ctx.scene.undo()
+    with timer.time("bulkDelete.redo"):
+        ctx.scene.redo()
+    ctx.scene.undo()
+
+
+CASES = {
+    "generate": bench_generate,
+    "write": bench_write,
+    "read": bench_read,
+    "pickle": bench_pickle,
+    "layers": bench_layers,
+    "scrub": bench_scrub,
+    "timeline": bench_timeline,
+    "search": bench_search,
+    "bulkDelete": bench_bulk_delete,
+}
+
+
+## Runner
+
+
+def gitCommit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(spec, cases=None, repeat=3) -> dict:
+    """Run `cases` (names in CASES, default all) and return the results dict."""
+    from pkdiagram.pyqt import QT_VERSION_STR, PYQT_VERSION_STR
+
+    names = list(cases or CASES)
+    for name in names:
+        if name not in CASES:
+            raise ValueError(f"Unknown benchmark case: {name}")
+    t0 = time.perf_counter()
+    ctx = Context(spec)
+    setup = time.perf_counter() - t0
+    timer = Timer()
+    try:
+        for name in names:
+            for _ in range(repeat):
+                CASES[name](ctx, timer)
+    finally:
+        ctx.deinit()
+    return {
+        "version": RESULTS_VERSION,
+        "commit": gitCommit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "machine": platform.machine(),
+        "spec": spec.toDict(),
+        "counts": {
+            "people": len(ctx.diagram.people),
+            "marriages": len(ctx.diagram.marriages),
+            "events": len(ctx.diagram.events),
+            "layers": len(ctx.diagram.layers),
+        },
+        "setup": setup,
+        "repeat": repeat,
+        "timings": {
+            name: {
+                "min": min(values),
+                "median": statistics.median(values),
+                "max": max(values),
+                "runs": values,
+            }
+            for name, values in timer.timings.items()
+        },
+    }
+
+
+def compare(baseline: dict, results: dict) -> list:
+    """
+    Returns [(name, before, after, ratio)] on the median timings that exist in
+    both runs.
+    """
+    if baseline.get("spec") != results.get("spec"):
+        _log.warning("Comparing benchmark runs with different diagram specs")
+    ret = []
+    before = baseline.get("timings", {})
+    for name, entry in results["timings"].items():
+        if name not in before:
+            continue
+        a, b = before[name]["median"], entry["median"]
+        ret.append((name, a, b, b / a if a else float("inf")))
+    return ret
+
+
+def formatComparison(rows, threshold=DEFAULT_THRESHOLD) -> str:
+    lines = [f"{'timing':<26}{'before ms':>12}{'after ms':>12}{'ratio':>8}"]
+    for name, a, b, ratio in rows:
+        flag = "  SLOWER" if ratio > threshold else ""
+        lines.append(
+            f"{name:<26}{a * 1000:>12.2f}{b * 1000:>12.2f}{ratio:>8.2f}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from pkdiagram.scene.diagramgenerator import DiagramSpec
+
+    defaults = DiagramSpec()
+    parser = argparse.ArgumentParser(
+        prog="python -m pkdiagram.benchmark", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument("--people", type=int, default=1000)
+    parser.add_argument(
+        "--events-per-person", type=int, default=defaults.eventsPerPerson
+    )
+    parser.add_argument(
+        "--emotions", type=int, default=None, help="default: people / 4"
+    )
+    parser.add_argument("--layers", type=int, default=defaults.layers)
+    parser.add_argument("--tags", type=int, default=defaults.tags)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--case",
+        action="append",
+        choices=list(CASES),
+        help="Run only this case; may be repeated",
+    )
+    parser.add_argument("-o", "--output", help="Write the results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from pkdiagram.pyqt import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])  # noqa: F841
+
+    spec = DiagramSpec(
+        people=args.people,
+        eventsPerPerson=args.events_per_person,
+        emotions=args.people // 4 if args.emotions is None else args.emotions,
+        layers=args.layers,
+        tags=args.tags,
+        seed=args.seed,
+    )
+    results = run(spec, cases=args.case, repeat=args.repeat)
+    text = json.dumps(results, indent=1)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, results)
+        print(formatComparison(rows, args.threshold), file=sys.stderr)
+        if any(ratio > args.threshold for *_, ratio in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
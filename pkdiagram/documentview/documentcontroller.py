@@ -48,7 +48,6 @@ from pkdiagram.widgets import Drawer
 from pkdiagram.documentview import RightDrawerView
 
 if not util.IS_IOS:
-    import xlsxwriter
     from pkdiagram.pyqt import QPrinter, QPrintDialog
 
 
@@ -601,7 +600,7 @@ class DocumentController(QObject):
         self.ui.actionAdd_Anything.setEnabled(on)
 
         if self.scene:
-            self.ui.actionUndo.setEnabled(on and self.scene.stack().canUndo())
+            self.ui.actionUndo.setEnabled(on and self.scene.canUndo())
             self.ui.actionRedo.setEnabled(on and self.scene.stack().canRedo())
         else:
             self.ui.actionUndo.setEnabled(False)
@@ -857,7 +856,7 @@ class DocumentController(QObject):
         self.dv.graphicalTimelineCallout.hide()
 
     def onUndo(self):
-        if self.scene:
+        if self.scene and self.scene.canUndo():
             self.scene.stack().undo()
             self.view.onUndo()
 
@@ -1179,7 +1178,7 @@ class DocumentController(QObject):
         self.uploadToServer.emit()
 
     def __writePDF(self, filePath=None, printer=None):
-        rect = self.printRect()
+        rect = self.scene.printRect()
         sourceRect = rect.size()
         if printer is None:
             printer = QPrinter()
@@ -1206,7 +1205,7 @@ class DocumentController(QObject):
         #                            sourceRect.height() * scale)
         #     p.drawImage(targetRect, image, sourceRect)
         #     p.end()
-        self.render(painter, QRectF(printerRect), self.printRect())
+        self.scene.render(painter, QRectF(printerRect), rect)
         painter.end()
         painter = None  # control dtor order, before printer
 
@@ -1266,6 +1265,8 @@ class DocumentController(QObject):
         painter.end()
 
     def writeExcel(self, filePath):
+        import xlsxwriter
+
         book = xlsxwriter.Workbook(filePath)
         wrap_format = book.add_format({"text_wrap": True})  # doesn't work
         wrap_format.set_text_wrap()  # doesn't work
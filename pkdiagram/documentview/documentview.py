@@ -285,14 +285,14 @@ class DocumentView(QWidget):
             self.sceneModel.inspectItem[int].disconnect(
                 self.controller.onInspectItemById
             )
-            self.scene.stack().canUndoChanged.disconnect(self.ui.actionUndo.setEnabled)
+            self.scene.canUndoChanged.disconnect(self.ui.actionUndo.setEnabled)
             self.scene.stack().canRedoChanged.disconnect(self.ui.actionRedo.setEnabled)
         self.scene = scene
         self._qmlEngine.setScene(scene)
         if scene:
             self.scene.selectionChanged.connect(self.onSceneSelectionChanged)
             self.sceneModel.inspectItem[int].connect(self.controller.onInspectItemById)
-            self.scene.stack().canUndoChanged.connect(self.ui.actionUndo.setEnabled)
+            self.scene.canUndoChanged.connect(self.ui.actionUndo.setEnabled)
             self.scene.stack().canRedoChanged.connect(self.ui.actionRedo.setEnabled)
             if self.scene.hideDateSlider() or self.timelineModel.rowCount() == 0:
                 self.graphicalTimelineShim.setFixedHeight(0)
@@ -1,4 +1,6 @@
+import bisect
 import logging
+from dataclasses import dataclass, field
 from sortedcontainers import SortedList
 
 from pkdiagram.pyqt import (
@@ -33,6 +35,29 @@ from pkdiagram.models import TimelineRow
 _log = logging.getLogger(__name__)
 
 
+@dataclass
+class TimelineLane:
+    """The paintable rows for one tag (or the whole timeline), with each row's
+    day offset from `firstDateTime` precomputed so paint and hit-testing can
+    bisect instead of calling QDateTime.daysTo() for every row."""
+
+    timelineRows: list = field(default_factory=list)
+    dayOffsets: list[int] = field(default_factory=list)
+    firstDateTime: QDateTime | None = None
+    lastDateTime: QDateTime | None = None
+
+    def dayRange(self) -> int:
+        if self.firstDateTime and self.lastDateTime:
+            return self.firstDateTime.daysTo(self.lastDateTime)
+        return 0
+
+    def slice(self, minDay: float, maxDay: float) -> range:
+        """Indexes of the rows whose day offset is in [minDay, maxDay]."""
+        start = bisect.bisect_left(self.dayOffsets, minDay)
+        end = bisect.bisect_right(self.dayOffsets, maxDay)
+        return range(start, end)
+
+
 class GraphicalTimelineCanvas(QWidget):
 
     W = util.CURRENT_DATE_INDICATOR_WIDTH * 2
@@ -58,7 +83,10 @@ class GraphicalTimelineCanvas(QWidget):
         # A list for quick lookup, events can be listed more than once in
         # sullivanian time.
         self._timelineRowRectCache = []
+        self._timelineRowRectCacheKey = None  # (size, isSlider) it was built for
+        self._rowIndexes = {}  # id(TimelineRow): int
         self._tagRows = []
+        self._lane = TimelineLane()
         self._lastMousePos: QPoint | None = None
         self._hoverTimer = None
         self.rowHeight = 150
@@ -87,6 +115,8 @@ class GraphicalTimelineCanvas(QWidget):
         self._timelineModel.rowsMoved.connect(self.refresh)
         self._timelineModel.rowsRemoved.connect(self.refresh)
         self._timelineModel.dataChanged.connect(self.refresh)
+        # Search date bounds change the day range even when no rows change.
+        self._searchModel.changed.connect(self.refresh)
         self.refresh()
 
     def onPaletteChanged(self):
@@ -112,29 +142,49 @@ class GraphicalTimelineCanvas(QWidget):
             return
         self.refreshPending = False
         self._timelineRows = self._timelineModel.rows()
+        self._rowIndexes = {id(row): i for i, row in enumerate(self._timelineRows)}
+        self._lane = self._buildLane(self._timelineRows)
         self._tagRows = []
         if not self.isSlider() and self._searchModel.tags:
             # init day range
             if self.paintSullivanianTime():
                 self._dayRange = 0  # take from tag with greatest day range
-            elif self._timelineRows:
-                firstDateTime, lastDateTime = self.dateTimeRange(self._timelineRows)
-                self._dayRange = firstDateTime.daysTo(lastDateTime)
             else:
-                self._dayRange = 0
-            # init rows
-            for tag in self._searchModel.tags:
-                thisTagRows = [x for x in self._timelineRows if x.event.hasTags([tag])]
-                self._tagRows.append((tag, thisTagRows))
+                self._dayRange = self._lane.dayRange()
+            # init rows, one pass over the rows for all tag lanes
+            tagRows = {tag: [] for tag in self._searchModel.tags}
+            for timelineRow in self._timelineRows:
+                for tag in timelineRow.event.tags():
+                    rows = tagRows.get(tag)
+                    if rows is not None:
+                        rows.append(timelineRow)
+            for tag, thisTagRows in tagRows.items():
+                lane = self._buildLane(thisTagRows)
+                self._tagRows.append((tag, lane))
                 if self.paintSullivanianTime():
-                    firstDateTime, lastDateTime = self.dateTimeRange(thisTagRows)
-                    if firstDateTime and lastDateTime:  # empty rows?
-                        _dayRange = firstDateTime.daysTo(lastDateTime)
-                        if _dayRange > self._dayRange:
-                            self._dayRange = _dayRange
-        self._timelineRowRectCache = []
+                    _dayRange = lane.dayRange()
+                    if _dayRange > self._dayRange:
+                        self._dayRange = _dayRange
+        self._invalidateTimelineRowRectCache()
         self.update()
 
+    def _buildLane(self, timelineRows: list[TimelineRow]) -> TimelineLane:
+        lane = TimelineLane()
+        lane.firstDateTime, lane.lastDateTime = self.dateTimeRange(timelineRows)
+        if not timelineRows or not lane.firstDateTime:
+            return lane
+        for timelineRow in timelineRows:
+            if timelineRow.dateTime() != QDate(QDate(1, 1, 1)):
+                lane.timelineRows.append(timelineRow)
+                lane.dayOffsets.append(
+                    lane.firstDateTime.daysTo(timelineRow.dateTime())
+                )
+        return lane
+
+    def _invalidateTimelineRowRectCache(self):
+        self._timelineRowRectCache = []
+        self._timelineRowRectCacheKey = None
+
     def dateTimeRange(
         self, timelineRows: list[TimelineRow]
     ) -> tuple[QDateTime | None, QDateTime | None]:
@@ -160,8 +210,13 @@ class GraphicalTimelineCanvas(QWidget):
         return first, last
 
     def _buildTimelineRowRectCache(self):
-        """Build the cache of timeline row rectangles without painting."""
+        """Build the cache of timeline row rectangles without painting. Only
+        rebuilt when the rows or the widget geometry change."""
+        cacheKey = (self.width(), self.height(), self.isSlider())
+        if self._timelineRowRectCacheKey == cacheKey:
+            return
         self._timelineRowRectCache = []
+        self._timelineRowRectCacheKey = cacheKey
         if not self.scene or (not self._timelineRows and not self._tagRows):
             return
 
@@ -169,19 +224,19 @@ class GraphicalTimelineCanvas(QWidget):
         if not self.isSlider() and len(self._tagRows):
             rowHeight = (self.height() - self.MARGIN * 2) / (len(self._tagRows))
             bottomY -= self.MARGIN
-            for i, (tag, timelineRows) in enumerate(self._tagRows):
+            for i, (tag, lane) in enumerate(self._tagRows):
                 self._buildRowRectCache(
                     bottomY - (i * rowHeight) - 30,
-                    timelineRows,
+                    lane,
                     dayRange=self._dayRange,
                 )
         else:
             if self.isSlider():
                 bottomY = self.height() / 2
-            self._buildRowRectCache(bottomY, self._timelineRows)
+            self._buildRowRectCache(bottomY, self._lane)
 
-    def _buildRowRectCache(self, bottomY, timelineRows, dayRange=None):
-        """Build rect cache for a single row."""
+    def _rowGeometry(self, bottomY, lane: TimelineLane, dayRange=None):
+        """Return (firstP, lastP, firstR, dayPx) for a lane drawn at bottomY."""
         if self.isSlider():
             y = bottomY
         else:
@@ -191,28 +246,34 @@ class GraphicalTimelineCanvas(QWidget):
             lastP = QPointF(self.width() - self.MARGIN, y)
         else:
             lastP = QPointF(self.width() - self.RIGHT_MARGIN, y)
-        if not timelineRows:
-            return
-
-        firstDateTime, lastDateTime = self.dateTimeRange(timelineRows)
+        if not lane.timelineRows:
+            return firstP, lastP, None, 0
         if dayRange is None:
-            dayRange = firstDateTime.daysTo(lastDateTime)
+            dayRange = lane.dayRange()
         if dayRange == 0:
             dayRange = 1
         firstR = QRectF(0, 0, self.W, self.W)
         firstR.moveCenter(firstP)
         dayPx = (lastP.x() - firstP.x()) / dayRange
+        return firstP, lastP, firstR, dayPx
 
-        for timelineRow in timelineRows:
-            if timelineRow.dateTime() != QDate(QDate(1, 1, 1)):
-                days = firstDateTime.daysTo(timelineRow.dateTime())
-                x = dayPx * days
-                rect = firstR.translated(x, 0)
-                self._timelineRowRectCache.append((timelineRow, rect))
+    def _buildRowRectCache(self, bottomY, lane: TimelineLane, dayRange=None):
+        """Build rect cache for a single row."""
+        firstP, lastP, firstR, dayPx = self._rowGeometry(bottomY, lane, dayRange)
+        if not lane.timelineRows:
+            return
+        for timelineRow, days in zip(lane.timelineRows, lane.dayOffsets):
+            rect = firstR.translated(dayPx * days, 0)
+            self._timelineRowRectCache.append((timelineRow, rect))
+
+    def _rowIndexFor(self, timelineRow: TimelineRow) -> int:
+        iRow = self._rowIndexes.get(id(timelineRow))
+        if iRow is None:
+            iRow = self._timelineModel.rowIndexFor(timelineRow)
+        return iRow
 
     def selectRowsInRect(self, selectionRect: QRectF):
-        if not self._timelineRowRectCache:
-            self._buildTimelineRowRectCache()
+        self._buildTimelineRowRectCache()
         timelineRows = [
             row
             for row, rectF in self._timelineRowRectCache
@@ -220,7 +281,7 @@ class GraphicalTimelineCanvas(QWidget):
         ]
         selection = QItemSelection()
         for timelineRow in timelineRows:
-            iRow = self._timelineModel.rowIndexFor(timelineRow)
+            iRow = self._rowIndexFor(timelineRow)
             index = self._timelineModel.index(iRow, 0)
             selection.select(index, index)
         self._isSelectingRows = True
@@ -307,7 +368,6 @@ class GraphicalTimelineCanvas(QWidget):
             self._lastMousePos = None
 
     def paintEvent(self, e):
-        self._buildTimelineRowRectCache()
         if not self.scene or (not self._timelineRows and not self._tagRows):
             e.ignore()
             return
@@ -325,23 +385,23 @@ class GraphicalTimelineCanvas(QWidget):
                     painter.setFont(self.labelFont)
                     bottomY -= self.MARGIN
                     # tag labels
-                    for i, (tag, timelineRows) in enumerate(self._tagRows):
+                    for i, (tag, lane) in enumerate(self._tagRows):
                         y = bottomY - (i * rowHeight) - 10
                         painter.drawText(-self.x() + self.MARGIN, int(y), tag)
 
                 # event rows
-                for i, (tag, timelineRows) in enumerate(self._tagRows):
+                for i, (tag, lane) in enumerate(self._tagRows):
                     self._drawRow(
                         painter,
                         clipRect,
                         bottomY - (i * rowHeight) - 30,
-                        timelineRows,
+                        lane,
                         dayRange=self._dayRange,
                     )
             else:
                 if self.isSlider():
                     bottomY = self.height() / 2  # center
-                self._drawRow(painter, clipRect, bottomY, self._timelineRows)
+                self._drawRow(painter, clipRect, bottomY, self._lane)
 
             # Draw hover date line
             with util.painter_state(painter):
@@ -421,31 +481,19 @@ class GraphicalTimelineCanvas(QWidget):
             util.GRAPHICAL_TIMELINE_SLIDER_HEIGHT,
         )
 
-    def _drawRow(self, painter, clipRect, bottomY, timelineRows, dayRange=None):
+    def _drawRow(self, painter, clipRect, bottomY, lane: TimelineLane, dayRange=None):
         """Draw a single row for a tag. `y` is bottom left."""
-        if self.isSlider():
-            y = bottomY
-        else:
-            y = bottomY - (self.labelFont.pixelSize() + 5)
-        firstP = QPointF(self.MARGIN, y)
-        if self.isSlider():
-            lastP = QPointF(self.width() - self.MARGIN, y)
-        else:
-            lastP = QPointF(self.width() - self.RIGHT_MARGIN, y)
+        timelineRows = lane.timelineRows
+        firstP, lastP, firstR, dayPx = self._rowGeometry(bottomY, lane, dayRange)
+        y = firstP.y()
         if timelineRows:  # empty events?
-            firstDateTime, lastDateTime = self.dateTimeRange(timelineRows)
+            firstDateTime = lane.firstDateTime
             if dayRange is None:
-                dayRange = firstDateTime.daysTo(lastDateTime)
+                dayRange = lane.dayRange()
             if dayRange == 0:
                 dayRange = 1
-            firstR = QRectF(0, 0, self.W, self.W)
-            firstR.moveCenter(firstP)
-            dayPx = (lastP.x() - firstP.x()) / dayRange
         else:
-            firstR = None
             firstDateTime = QDateTime()
-            lastDateTime = QDateTime()
-            dayPx = 0
         isSullivanianTime = self.paintSullivanianTime()  # cache
 
         # current date marker
@@ -537,48 +585,53 @@ class GraphicalTimelineCanvas(QWidget):
             selectedPen.setColor(selectedColor)
             selectedBrush = QBrush(selectedColor)
             # nodalPen.setWidthF(normalPen.widthF() * 2)
-            for timelineRow in timelineRows:
-                if timelineRow.dateTime() != QDate(QDate(1, 1, 1)):
-                    days = firstDateTime.daysTo(timelineRow.dateTime())
-                    x = dayPx * days
-                    rect = firstR.translated(x, 0)
-                    if x > clipRect.x() + clipRect.width():
-                        continue
-                    if timelineRow.event.nodal():
-                        w = self.W * 0.75
-                        rect = rect.marginsAdded(QMarginsF(w, w, w, w))
-                    # Events can be shown in more than one place
-                    iRow = self._timelineModel.rowIndexFor(timelineRow)
-                    if self._selectionModel.isRowSelected(iRow):
-                        painter.setPen(selectedPen)
-                        painter.setBrush(selectedBrush)
-                    elif timelineRow.event.color():
-                        color = timelineRow.event.color()
-                        # defensive against defaults that are not quite right, and for dark/light mode.
-                        if color in ("transparent", "#ffffff", "#000000"):
-                            painter.setPen(normalPen)
-                            painter.setBrush(normalBrush)
-                        else:
-                            eventColor = QColor(color)
-                            # print('    NODAL', event.dateTime().year(), nodalPen.color().name(), nodalPen.color().alpha())
-                            painter.setPen(eventColor)
-                            painter.setBrush(eventColor)
-                    # elif event.nodal():
-                    #     # print('    NODAL', event.dateTime().year(), nodalPen.color().name(), nodalPen.color().alpha())
-                    #     painter.setPen(nodalPen)
-                    #     painter.setBrush(nodalBrush)
-                    # elif self.scene.itemShownOnDiagram(timelineRow.event):
-                    else:
-                        # print('    NORMAL', event.dateTime().year(), normalPen.color().name(), normalPen.color().alpha())
+            # Cull to the clip rect, padded for the widest (nodal) ellipse.
+            if dayPx > 0:
+                pad = self.W * 2
+                visible = lane.slice(
+                    (clipRect.left() - pad - firstR.x()) / dayPx,
+                    (clipRect.right() + pad - firstR.x()) / dayPx,
+                )
+            else:
+                visible = range(len(timelineRows))
+            for i in visible:
+                timelineRow = timelineRows[i]
+                rect = firstR.translated(dayPx * lane.dayOffsets[i], 0)
+                if timelineRow.event.nodal():
+                    w = self.W * 0.75
+                    rect = rect.marginsAdded(QMarginsF(w, w, w, w))
+                # Events can be shown in more than one place
+                iRow = self._rowIndexFor(timelineRow)
+                if self._selectionModel.isRowSelected(iRow):
+                    painter.setPen(selectedPen)
+                    painter.setBrush(selectedBrush)
+                elif timelineRow.event.color():
+                    color = timelineRow.event.color()
+                    # defensive against defaults that are not quite right, and for dark/light mode.
+                    if color in ("transparent", "#ffffff", "#000000"):
                         painter.setPen(normalPen)
                         painter.setBrush(normalBrush)
-                    # else:
-                    #     # print('    DEEMPH', event.dateTime().year(), deemphPen.color().name(), deemphPen.color().alpha())
-                    #     painter.setPen(deemphPen)
-                    #     painter.setBrush(deemphBrush)
-                    painter.drawEllipse(rect)
-
-        if self.isSlider():
+                    else:
+                        eventColor = QColor(color)
+                        # print('    NODAL', event.dateTime().year(), nodalPen.color().name(), nodalPen.color().alpha())
+                        painter.setPen(eventColor)
+                        painter.setBrush(eventColor)
+                # elif event.nodal():
+                #     # print('    NODAL', event.dateTime().year(), nodalPen.color().name(), nodalPen.color().alpha())
+                #     painter.setPen(nodalPen)
+                #     painter.setBrush(nodalBrush)
+                # elif self.scene.itemShownOnDiagram(timelineRow.event):
+                else:
+                    # print('    NORMAL', event.dateTime().year(), normalPen.color().name(), normalPen.color().alpha())
+                    painter.setPen(normalPen)
+                    painter.setBrush(normalBrush)
+                # else:
+                #     # print('    DEEMPH', event.dateTime().year(), deemphPen.color().name(), deemphPen.color().alpha())
+                #     painter.setPen(deemphPen)
+                #     painter.setBrush(deemphBrush)
+                painter.drawEllipse(rect)
+
+        if self.isSlider() or not timelineRows or not self._lane.firstDateTime:
             return
 
         # event labels
@@ -587,19 +640,23 @@ class GraphicalTimelineCanvas(QWidget):
             prevDays = None
             prevX = None
             nDupes = 0
-            for timelineRow in self._timelineRows:
-                if timelineRow.dateTime() and timelineRow.dateTime() != QDateTime(
-                    QDate(1, 1, 1)
-                ):
-                    days = firstDateTime.daysTo(timelineRow.dateTime())
+            nullDateTime = QDateTime(QDate(1, 1, 1))
+            # Labels are laid out from the global lane's offsets.
+            laneDayOffset = self._lane.firstDateTime.daysTo(firstDateTime)
+            maxX = clipRect.x() + clipRect.width()
+            for timelineRow, globalDays in zip(
+                self._lane.timelineRows, self._lane.dayOffsets
+            ):
+                if timelineRow.dateTime() and timelineRow.dateTime() != nullDateTime:
+                    days = globalDays - laneDayOffset
                     if days == prevDays:
                         nDupes += 1
                     else:
                         nDupes = 0
                     prevDays = days
                     x = dayPx * days
-                    if x > clipRect.x() + clipRect.width():
-                        continue
+                    if x > maxX:
+                        break  # rows are sorted by date
                     if (
                         prevX is not None and x - prevX < self.W * 4
                     ):  # and not item.nodal():
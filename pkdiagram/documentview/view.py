@@ -1123,6 +1123,7 @@ class View(QGraphicsView):
             ratio = self.getVisibleSceneScaleRatio()
             for item in self.scene().itemDetails():
                 item.onVisibleSizeChanged(self, ratio)
+            self.scene().setLevelOfDetail(util.levelOfDetailForRatio(ratio))
 
     def onItemAdded(self, item):
         if item.isItemDetails:
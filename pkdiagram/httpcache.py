@@ -0,0 +1,141 @@
+"""
+On-disk cache of GET response bodies and their validators (ETag and
+Last-Modified) for conditional requests, see Server.nonBlockingRequest().
+
+QNetworkDiskCache only applies to plain QNAM.get() requests, while all of our
+requests are signed and sent with sendCustomRequest(), so this does the same
+job one level up: each entry is a small JSON file with the validators next to
+the body, keyed by user and signed resource path.
+"""
+
+import os
+import json
+import hashlib
+import logging
+
+from pkdiagram import util
+
+
+_log = logging.getLogger(__name__)
+
+
+class HTTPCache:
+
+    DIR_NAME = "http-cache"
+    MAX_SIZE = 64 * 1024 * 1024  # bytes, oldest entries are pruned first
+
+    def __init__(self, dirPath: str = None, maxSize: int = MAX_SIZE):
+        self._dirPath = dirPath
+        self._maxSize = maxSize
+
+    def dirPath(self) -> str:
+        """Resolved on each call so that it follows util.appDataDir()."""
+        return self._dirPath or os.path.join(util.appDataDir(), self.DIR_NAME)
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        base = os.path.join(self.dirPath(), name)
+        return base + ".json", base + ".body"
+
+    def _meta(self, key: str) -> dict | None:
+        metaPath, bodyPath = self._paths(key)
+        try:
+            with open(metaPath, "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("key") != key or not os.path.isfile(bodyPath):
+            return None
+        return meta
+
+    def validators(self, key: str) -> dict[str, str]:
+        """Conditional request headers for `key`, empty if not cached."""
+        meta = self._meta(key)
+        if not meta:
+            return {}
+        ret = {}
+        if meta.get("etag"):
+            ret["If-None-Match"] = meta["etag"]
+        if meta.get("lastModified"):
+            ret["If-Modified-Since"] = meta["lastModified"]
+        return ret
+
+    def body(self, key: str) -> bytes | None:
+        if not self._meta(key):
+            return None
+        try:
+            with open(self._paths(key)[1], "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key: str, body: bytes, etag: str = None, lastModified: str = None):
+        """Store `body`, or drop the entry when there is nothing to validate with."""
+        if not etag and not lastModified:
+            self.remove(key)
+            return
+        if len(body) > self._maxSize:
+            self.remove(key)
+            return
+        metaPath, bodyPath = self._paths(key)
+        try:
+            os.makedirs(self.dirPath(), exist_ok=True)
+            with open(bodyPath + ".tmp", "wb") as f:
+                f.write(body)
+            os.replace(bodyPath + ".tmp", bodyPath)
+            with open(metaPath + ".tmp", "w") as f:
+                json.dump({"key": key, "etag": etag, "lastModified": lastModified}, f)
+            os.replace(metaPath + ".tmp", metaPath)
+        except OSError as e:
+            _log.warning(f"Could not write HTTP cache entry: {e}")
+            self.remove(key)
+            return
+        self.prune()
+
+    def remove(self, key: str):
+        for path in self._paths(key):
+            if os.path.isfile(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        dirPath = self.dirPath()
+        if not os.path.isdir(dirPath):
+            return
+        for entry in os.scandir(dirPath):
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def size(self) -> int:
+        dirPath = self.dirPath()
+        if not os.path.isdir(dirPath):
+            return 0
+        return sum(x.stat().st_size for x in os.scandir(dirPath) if x.is_file())
+
+    def prune(self):
+        """Remove the least recently written bodies until under maxSize."""
+        dirPath = self.dirPath()
+        if not os.path.isdir(dirPath):
+            return
+        entries = [x for x in os.scandir(dirPath) if x.is_file()]
+        total = sum(x.stat().st_size for x in entries)
+        if total <= self._maxSize:
+            return
+        bodies = sorted(
+            (x for x in entries if x.name.endswith(".body")),
+            key=lambda x: x.stat().st_mtime,
+        )
+        for entry in bodies:
+            if total <= self._maxSize:
+                break
+            total -= entry.stat().st_size
+            metaPath = entry.path[: -len(".body")] + ".json"
+            for path in (entry.path, metaPath):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
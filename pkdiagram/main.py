@@ -10,9 +10,9 @@ from pkdiagram.pyqt import (
     QOpenGLWidget,
     QSurfaceFormat,
     QEventLoop,
+    QTimer,
 )
-from pkdiagram import util, extensions
-from pkdiagram.mainwindow import MainWindow
+from pkdiagram import util, extensions, startuptrace
 from pkdiagram.app import Application, AppController
 
 
@@ -48,12 +48,6 @@ if sys.version_info[1] > 7:
 def _main_impl():
     import sys  # no idea
 
-    # Third-party modules from sysroot
-    import six
-    import dateutil.parser
-    import xlsxwriter
-    import sortedcontainers
-
     ENABLE_THERAPIST = util.IS_DEV or util.IS_IOS
 
     parser = OptionParser()
@@ -172,7 +166,8 @@ def _main_impl():
         engine.addImportPath("resources:")
         controller.init(engine)
 
-        engine.load("resources:qml/PersonalApplication.qml")
+        with startuptrace.span("qml", "PersonalApplication.qml"):
+            engine.load("resources:qml/PersonalApplication.qml")
         if not engine.rootObjects():
             _log.critical("Failed to load QML - application cannot start")
             sys.exit(1)
@@ -197,6 +192,7 @@ def _main_impl():
             testBridgeServer.start()
             _log.info(f"Test bridge server started on port {_bridgePort}")
 
+        QTimer.singleShot(0, startuptrace.finish)
         ret = app.exec_()
 
         # Stop test bridge server
@@ -209,6 +205,8 @@ def _main_impl():
         sys.exit(ret)
 
     else:
+        from pkdiagram.mainwindow import MainWindow
+
         util.init_logging()
 
         app = Application(sys.argv, Application.Type.Pro, prefsName=options.prefsName)
@@ -234,11 +232,10 @@ def _main_impl():
 
         # Open file at startup if specified (scheduled after event loop starts)
         if util.IS_DEV and options.open_file:
-            from pkdiagram.pyqt import QTimer
-
             _log.info(f"Will open file at startup: {options.open_file}")
             QTimer.singleShot(100, lambda: mainWindow.open(filePath=options.open_file))
 
+        QTimer.singleShot(0, startuptrace.finish)
         controller.exec(mainWindow)
 
         # Stop test bridge server
@@ -51,7 +51,7 @@ from pkdiagram.pyqt import (
 )
 from pkdiagram import version, util
 from pkdiagram.server_types import Diagram, HTTPError
-from pkdiagram.scene import ItemGarbage, Property, Scene
+from pkdiagram.scene import ItemGarbage, Property, Scene, updateprofiler
 from pkdiagram.scene.clipboard import Clipboard, ImportItems
 from pkdiagram.views import AccountDialog
 from pkdiagram.documentview import DocumentView
@@ -175,6 +175,21 @@ class MainWindow(QMainWindow):
         self.undoView.hide()
         self.ui.actionShow_Undo_View.toggled.connect(self.onShowUndoView)
 
+        # DEBUG: Scene update profiling
+        self.actionProfile_Scene_Updates = QAction("Profile Scene Updates", self)
+        self.actionProfile_Scene_Updates.setCheckable(True)
+        self.actionProfile_Scene_Updates.toggled[bool].connect(
+            self.onProfileSceneUpdates
+        )
+        self.ui.menuDebug.addAction(self.actionProfile_Scene_Updates)
+        self.actionDump_Scene_Update_Profile = QAction(
+            "Dump Scene Update Profile", self
+        )
+        self.actionDump_Scene_Update_Profile.triggered.connect(
+            self.onDumpSceneUpdateProfile
+        )
+        self.ui.menuDebug.addAction(self.actionDump_Scene_Update_Profile)
+
         # Document View
 
         self.documentView = DocumentView(self, self.session)
@@ -516,6 +531,18 @@ class MainWindow(QMainWindow):
             self.undoView.setStack(self.scene.stack())
         self.undoView.setVisible(on)
 
+    def onProfileSceneUpdates(self, on):
+        if on:
+            updateprofiler.reset()
+            updateprofiler.enable([self.scene] if self.scene else [])
+        else:
+            updateprofiler.disable()
+
+    def onDumpSceneUpdateProfile(self):
+        text = updateprofiler.dump()
+        log.info(f"Scene update profile:\n{text}")
+        QApplication.clipboard().setText(text)
+
     def clearWindowIcon(self):
         p = QPixmap(1, 1)
         p.fill(Qt.transparent)
@@ -956,7 +983,7 @@ class MainWindow(QMainWindow):
                         else:
                             newScene.selectAll()
                             items = Clipboard(newScene.selectedItems()).copy(self.scene)
-                            self.scene.push(ImportItems(items))
+                            self.scene.push(ImportItems(self.scene, items))
         else:
             CUtil.instance().openExistingFile(
                 QUrl.fromLocalFile(filePath)
@@ -1218,6 +1245,8 @@ class MainWindow(QMainWindow):
             self.ui.actionPathItem_Shapes.toggled[bool].connect(
                 self.scene.toggleShowPathItemShapes
             )
+            if updateprofiler.isEnabled():
+                updateprofiler.watchScene(self.scene)
             self.ui.actionPaste.setEnabled(False)
             self.ui.actionSave.setEnabled(not readOnly)
             self.ui.actionSave_As.setEnabled(True)
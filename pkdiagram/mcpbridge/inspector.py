@@ -1551,6 +1551,50 @@ class QtInspector:
         else:
             return {"success": False, "error": f"Unknown component: {component}"}
 
+    def _getScenes(self) -> list:
+        from pkdiagram.scene import Scene
+
+        scenes = []
+        for view in self._getGraphicsViews():
+            scene = view.scene()
+            if isinstance(scene, Scene) and scene not in scenes:
+                scenes.append(scene)
+        controller = self._findPersonalAppController()
+        if controller and controller.scene and controller.scene not in scenes:
+            scenes.append(controller.scene)
+        return scenes
+
+    def getUpdateProfile(self, action: str = "get") -> Dict[str, Any]:
+        """
+        Scene update instrumentation.
+
+        Args:
+            action: One of:
+                - "start": Enable collection on all open scenes
+                - "stop": Disable collection, keeping what was collected
+                - "reset": Clear collected frames
+                - "get": Return collected frames and a summary
+
+        Returns:
+            Dict with enabled state, per-frame stats and a summary
+        """
+        from pkdiagram.scene import updateprofiler
+
+        if action == "start":
+            updateprofiler.enable(self._getScenes())
+        elif action == "stop":
+            updateprofiler.disable()
+        elif action == "reset":
+            updateprofiler.reset()
+        elif action != "get":
+            return {"success": False, "error": f"Unknown action: {action}"}
+        return {
+            "success": True,
+            "enabled": updateprofiler.isEnabled(),
+            "frames": updateprofiler.frames(),
+            "summary": updateprofiler.summary(),
+        }
+
     def devLogin(self, username: Optional[str] = None) -> Dict[str, Any]:
         controller = self._findPersonalAppController()
         if controller is None:
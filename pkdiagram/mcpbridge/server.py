@@ -86,6 +86,7 @@ class TestBridgeServer(QObject):
             # Scene items
             "click_scene_item": self._handleClickSceneItem,
             "get_scene_items": self._handleGetSceneItems,
+            "get_update_profile": self._handleGetUpdateProfile,
             "get_layout_bounds": self._handleGetLayoutBounds,
             # Windows
             "get_windows": self._handleGetWindows,
@@ -482,6 +483,11 @@ class TestBridgeServer(QObject):
         itemType = command.get("type")
         return self._inspector.getSceneItems(itemType)
 
+    def _handleGetUpdateProfile(self, command: Dict) -> Dict:
+        """Handle get_update_profile command."""
+        action = command.get("action", "get")
+        return self._inspector.getUpdateProfile(action)
+
     def _handleGetLayoutBounds(self, command: Dict) -> Dict:
         """Handle get_layout_bounds command."""
         return self._inspector.getLayoutBounds()
@@ -58,18 +58,53 @@ class EmotionalUnitsModel(QAbstractListModel, ModelHelper):
         self.refreshProperty("noPairBondsWithNames")
         self.refreshProperty("anyActive")
 
+    def _rowFor(self, emotionalUnit) -> int:
+        """
+        Units that sort equal are only found by identity, and a unit whose
+        sort key changed since it was added is only found by a full scan.
+        """
+        start = self._emotionalUnits.bisect_left(emotionalUnit)
+        end = self._emotionalUnits.bisect_right(emotionalUnit)
+        for row in range(start, end):
+            if self._emotionalUnits[row] is emotionalUnit:
+                return row
+        for row, x in enumerate(self._emotionalUnits):
+            if x is emotionalUnit:
+                return row
+        return -1
+
+    def _insertUnit(self, emotionalUnit):
+        row = self._emotionalUnits.bisect_right(emotionalUnit)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._emotionalUnits.add(emotionalUnit)
+        self.endInsertRows()
+
+    def _removeRow(self, row):
+        emotionalUnit = self._emotionalUnits[row]
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._emotionalUnits[row]
+        self.endRemoveRows()
+        if emotionalUnit.layer() in self._activeLayers:
+            self._activeLayers.remove(emotionalUnit.layer())
+
     def set(self, attr, value):
         if attr == "scene":
             if self._scene:
-                self._scene.marriageAdded.disconnect(self.onMarriageAddedOrRemoved)
-                self._scene.marriageRemoved.disconnect(self.onMarriageAddedOrRemoved)
+                self._scene.marriageAdded.disconnect(self.onMarriageAdded)
+                self._scene.marriageRemoved.disconnect(self.onMarriageRemoved)
+                self._scene.finishedBatchAddingRemovingItems.disconnect(
+                    self.onFinishedBatchAddingRemovingItems
+                )
                 self._scene.layerChanged.disconnect(self.onLayerChanged)
                 self._scene.propertyChanged.disconnect(self.onSceneProperty)
         super().set(attr, value)
         if attr == "scene":
             if self._scene:
-                self._scene.marriageAdded.connect(self.onMarriageAddedOrRemoved)
-                self._scene.marriageRemoved.connect(self.onMarriageAddedOrRemoved)
+                self._scene.marriageAdded.connect(self.onMarriageAdded)
+                self._scene.marriageRemoved.connect(self.onMarriageRemoved)
+                self._scene.finishedBatchAddingRemovingItems.connect(
+                    self.onFinishedBatchAddingRemovingItems
+                )
                 self._scene.layerChanged.connect(self.onLayerChanged)
                 self._scene.propertyChanged.connect(self.onSceneProperty)
             self.refresh()
@@ -88,8 +123,33 @@ class EmotionalUnitsModel(QAbstractListModel, ModelHelper):
     def layers(self) -> list[Layer]:
         return [x.layer() for x in self._emotionalUnits]
 
-    def onMarriageAddedOrRemoved(self):
-        self.refresh()
+    def onMarriageAdded(self, marriage):
+        emotionalUnit = marriage.emotionalUnit()
+        if not marriage.peopleNames() or not emotionalUnit.name():
+            return
+        if self._rowFor(emotionalUnit) > -1:
+            return
+        self._insertUnit(emotionalUnit)
+        if emotionalUnit.layer().active():
+            self._activeLayers.append(emotionalUnit.layer())
+        self.refreshProperty("noPairBondsWithNames")
+        self.refreshProperty("anyActive")
+
+    def onMarriageRemoved(self, marriage):
+        row = self._rowFor(marriage.emotionalUnit())
+        if row > -1:
+            self._removeRow(row)
+        self.refreshProperty("noPairBondsWithNames")
+        self.refreshProperty("anyActive")
+
+    def onFinishedBatchAddingRemovingItems(self):
+        """marriageRemoved is not emitted for batch removals."""
+        marriages = set(self._scene.marriages())
+        for row in reversed(range(len(self._emotionalUnits))):
+            if self._emotionalUnits[row].marriage() not in marriages:
+                self._removeRow(row)
+        self.refreshProperty("noPairBondsWithNames")
+        self.refreshProperty("anyActive")
 
     @util.iblocked
     def onLayerChanged(self, prop):
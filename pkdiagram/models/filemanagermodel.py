@@ -1,4 +1,7 @@
 import os
+
+from sortedcontainers import SortedList
+
 from pkdiagram.pyqt import (
     Qt,
     QModelIndex,
@@ -33,11 +36,16 @@ class FileManagerModel(QAbstractListModel, QObjectHelper):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._entries = []
-        self._unfilteredEntries = []
+        self._entriesByPath = {}  # path: entry, for every entry (unfiltered)
+        self._searchKeys = {}  # path: lowercase text that searchText matches
+        self._indexes = {}  # role: SortedList[(sortKey, path)] of every entry
+        self._shown = SortedList()  # (sortKey, path) for entries that pass the filter
         self._sortRole = self.NameRole
         self._sortOrder = Qt.AscendingOrder
         self._searchText = None
+        self._rolesByName = {
+            roleName.decode(): role for role, roleName in self.roleNames().items()
+        }
 
     def initFileManagerModel(self):
         sortBy = self.get("sortBy")
@@ -48,21 +56,17 @@ class FileManagerModel(QAbstractListModel, QObjectHelper):
 
     def set(self, attr, x):
         if attr == "searchText":
-            self.beginResetModel()
             self._searchText = x
-            self._resort()
+            self._refilter()
             self.refreshProperty("searchText")
-            self.endResetModel()
         else:
             super().set(attr, x)
 
     def reset(self, attr):
         super().reset(attr)
         if attr == "searchText":
-            self.beginResetModel()
             self._searchText = None
-            self._resort()
-            self.endResetModel()
+            self._refilter()
 
     def get(self, attr):
         if attr == "searchText":
@@ -72,139 +76,240 @@ class FileManagerModel(QAbstractListModel, QObjectHelper):
         return ret
 
     def rowForFilePath(self, filePath):
-        for row, entry in enumerate(self._entries):
-            if entry[self.PathRole] == filePath:
-                return row
+        entry = self._entriesByPath.get(filePath)
+        if entry is None:
+            return None
+        return self._rowForKey(self._sortKey(entry, self._sortRole))
 
     def roleForName(self, name):
-        for role, roleName in self.roleNames().items():
-            if name == roleName.decode():
-                return role
+        return self._rolesByName.get(name)
 
     @pyqtSlot(str)
     def sortByRoleName(self, name):
         self._sortRole = self.roleForName(name)
         self.sort(0)
 
+    def _searchKey(self, entry):
+        # The separator keeps a search from matching across the two fields.
+        name = entry[self.NameRole] or ""
+        owner = entry[self.OwnerRole] or ""
+        return f"{name.lower()}\0{owner.lower()}"
+
     def _shouldShowEntry(self, entry):
         searchText = self._searchText.lower() if self._searchText else None
         if not searchText:
             return True
-        elif entry[self.NameRole] and searchText in entry[self.NameRole].lower():
-            return True
-        elif entry[self.OwnerRole] and searchText in entry[self.OwnerRole].lower():
-            return True
-        else:
-            return False
+        searchKey = self._searchKeys.get(entry[self.PathRole])
+        if searchKey is None:
+            searchKey = self._searchKey(entry)
+        return searchText in searchKey
 
     def entryForRow(self, row):
-        return self._entries[row]
+        if self._sortOrder == Qt.DescendingOrder:
+            row = len(self._shown) - 1 - row
+        return self._entriesByPath[self._shown[row][1]]
 
-    @pyqtSlot()
-    def _sorted(self):
-        def key(entry):
-            if self._sortRole in entry and entry[self._sortRole]:
-                return entry[self._sortRole]
-            else:
-                return 0
+    ## Index
+
+    def _sortKey(self, entry, role):
+        # Missing values sort first and never get compared to real ones.
+        value = entry.get(role)
+        return ((1, value) if value else (0, 0), entry[self.PathRole])
 
-        entries = [x for x in self._unfilteredEntries if self._shouldShowEntry(x)]
-        entries = sorted(entries, key=key)
+    def _index(self, role):
+        """The sorted index for `role`, built the first time it is sorted by."""
+        index = self._indexes.get(role)
+        if index is None:
+            index = SortedList(
+                self._sortKey(entry, role) for entry in self._entriesByPath.values()
+            )
+            self._indexes[role] = index
+        return index
+
+    def _rowForKey(self, key):
+        try:
+            i = self._shown.index(key)
+        except ValueError:
+            return None
+        if self._sortOrder == Qt.DescendingOrder:
+            return len(self._shown) - 1 - i
+        return i
+
+    def _rowForNewKey(self, key):
+        """The row that `key` will have once it is added to the shown rows."""
+        i = self._shown.bisect_left(key)
+        if self._sortOrder == Qt.DescendingOrder:
+            return len(self._shown) - i
+        return i
+
+    def _indexEntry(self, entry):
+        path = entry[self.PathRole]
+        self._entriesByPath[path] = entry
+        self._searchKeys[path] = self._searchKey(entry)
+        for role, index in self._indexes.items():
+            index.add(self._sortKey(entry, role))
+
+    def _unindexEntry(self, entry):
+        path = entry[self.PathRole]
+        del self._entriesByPath[path]
+        del self._searchKeys[path]
+        for role, index in self._indexes.items():
+            index.remove(self._sortKey(entry, role))
+
+    def _sorted(self):
+        """The shown keys in row order."""
+        keys = [
+            key
+            for key in self._index(self._sortRole)
+            if self._shouldShowEntry(self._entriesByPath[key[1]])
+        ]
         if self._sortOrder == Qt.DescendingOrder:
-            entries.reverse()
-        return entries
+            keys.reverse()
+        return keys
 
     def _resort(self):
-        self._entries = self._sorted()
+        self._shown = SortedList(self._sorted())
 
-    def addFileEntry(self, path, _batch=False, **kwargs):
-        # Create new entry
-        newEntry = {}
-        newEntry[self.PathRole] = path
-        for role in self.roleNames():
-            if not role in newEntry:
-                newEntry[role] = None
-        for k, v in kwargs.items():
-            newEntry[self.roleForName(k)] = v
-        # Update cached rows
-        found = False
-        for oldEntry in self._unfilteredEntries:
-            if oldEntry[self.PathRole] == newEntry[self.PathRole]:
-                found = True
-                break
-        if found:
-            newEntry = oldEntry
-        else:
-            self._unfilteredEntries.append(newEntry)
-        # Update shown rows
-        if not self._shouldShowEntry(newEntry):
+    def _refilter(self):
+        """Apply a changed filter as row removes and inserts, not a model reset."""
+        wanted = self._sorted()
+        wantedSet = set(wanted)
+        # Remove rows that no longer pass, in contiguous runs from the bottom up.
+        row = len(self._shown) - 1
+        while row >= 0:
+            if self._keyForRow(row) in wantedSet:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._keyForRow(row) not in wantedSet:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, last)
+            for i in range(last, row, -1):
+                self._shown.remove(self._keyForRow(i))
+            self.endRemoveRows()
+        # Insert new rows in contiguous runs from the top down.
+        row = 0
+        while row < len(wanted):
+            if wanted[row] in self._shown:
+                row += 1
+                continue
+            first = row
+            while row < len(wanted) and wanted[row] not in self._shown:
+                row += 1
+            self.beginInsertRows(QModelIndex(), first, row - 1)
+            self._shown.update(wanted[first:row])
+            self.endInsertRows()
+
+    def _keyForRow(self, row):
+        if self._sortOrder == Qt.DescendingOrder:
+            row = len(self._shown) - 1 - row
+        return self._shown[row]
+
+    def _showKey(self, key):
+        row = self._rowForNewKey(key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._shown.add(key)
+        self.endInsertRows()
+
+    def _hideKey(self, key):
+        row = self._rowForKey(key)
+        if row is None:
             return
-        if _batch:
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._shown.remove(key)
+        self.endRemoveRows()
+
+    def _moveKey(self, oldKey, newKey):
+        oldRow = self._rowForKey(oldKey)
+        self._shown.remove(oldKey)
+        newRow = self._rowForNewKey(newKey)
+        self._shown.add(oldKey)
+        if newRow != oldRow:
+            # Qt wants the destination in terms of the rows before the move.
+            dest = newRow + 1 if newRow > oldRow else newRow
+            self.beginMoveRows(QModelIndex(), oldRow, oldRow, QModelIndex(), dest)
+        self._shown.remove(oldKey)
+        self._shown.add(newKey)
+        if newRow != oldRow:
+            self.endMoveRows()
+        return newRow
+
+    ## Entries
+
+    def addFileEntry(self, path, _batch=False, **kwargs):
+        """Add an entry, or update it if there already is one for `path`."""
+        if path in self._entriesByPath:
+            if not _batch:
+                self.updateFileEntry(path, **kwargs)
+            else:
+                entry = self._entriesByPath[path]
+                self._unindexEntry(entry)
+                entry.update(self._valuesFor(kwargs))
+                self._indexEntry(entry)
             return
-        entries = self._sorted()
-        newRow = entries.index(newEntry)
-        if len(entries) > len(self._entries):
-            self.beginInsertRows(QModelIndex(), newRow, newRow)
-            self._entries = entries
-            self.endInsertRows()
-        elif len(entries) < len(self._entries):
-            oldRow = None
-            for row, oldEntry in enumerate(self._entries):
-                if oldEntry[self.PathRole] == newEntry[self.PathRole]:
-                    oldRow = row
-                    break
-            if oldRow != newRow:
-                self.rowsAboutToBeMoved.emit(
-                    QModelIndex(), oldRow, oldRow, QModelIndex(), newRow
-                )
-                self._entries = entries
-                self.rowsMoved.emit(
-                    QModelIndex(), oldRow, oldRow, QModelIndex(), newRow
-                )
-        else:
-            pass  # exists
+        newEntry = dict.fromkeys(self.roleNames())
+        newEntry.update(self._valuesFor(kwargs))
+        newEntry[self.PathRole] = path
+        self._indexEntry(newEntry)
+        # Batches call _resort() when done.
+        if not _batch and self._shouldShowEntry(newEntry):
+            self._showKey(self._sortKey(newEntry, self._sortRole))
+
+    def _valuesFor(self, kwargs):
+        return {self.roleForName(k): v for k, v in kwargs.items()}
 
     def removeFileEntry(self, path):
-        entry = None
-        for _entry in self._unfilteredEntries:
-            if _entry[self.PathRole] == path:
-                entry = _entry
+        entry = self._entriesByPath.get(path)
         if not entry:
             return
-        self._unfilteredEntries.remove(entry)
-        if entry in self._entries:
-            row = self._entries.index(entry)
-            if row > -1:
-                self.beginRemoveRows(QModelIndex(), row, row)
-                del self._entries[row]
-                self.endRemoveRows()
-
-    def updateFileEntry(self, path, **kwargs):
-        entry = None
-        for _entry in self._unfilteredEntries:
-            if _entry[self.PathRole] == path:
-                entry = _entry
-                break
-        row = self._entries.index(entry) > -1
-        for role, roleName in self.roleNames().items():
-            name = roleName.decode()
-            if name in kwargs and kwargs[name] != entry[role]:
-                entry[role] = kwargs[name]
-                if row != -1:
-                    index = self.index(row, 0)
-                    self.dataChanged.emit(index, index, [role])
+        self._hideKey(self._sortKey(entry, self._sortRole))
+        self._unindexEntry(entry)
+
+    def updateFileEntry(self, path, newPath=None, **kwargs):
+        """Set values by role name, and move the entry to `newPath` if passed."""
+        entry = self._entriesByPath.get(path)
+        if entry is None:
+            return
+        values = self._valuesFor(kwargs)
+        if newPath is not None:
+            values[self.PathRole] = newPath
+        changed = {
+            role: value for role, value in values.items() if value != entry[role]
+        }
+        if not changed:
+            return
+        oldKey = self._sortKey(entry, self._sortRole)
+        wasShown = self._rowForKey(oldKey) is not None
+        self._unindexEntry(entry)
+        entry.update(changed)
+        self._indexEntry(entry)
+        newKey = self._sortKey(entry, self._sortRole)
+        isShown = self._shouldShowEntry(entry)
+        if wasShown and not isShown:
+            self._hideKey(oldKey)
+        elif isShown and not wasShown:
+            self._showKey(newKey)
+        elif isShown:
+            if newKey != oldKey:
+                row = self._moveKey(oldKey, newKey)
+            else:
+                row = self._rowForKey(newKey)
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, list(changed))
 
     def clear(self):
         self.beginResetModel()
-        self._unfilteredEntries = []
-        self._entries = []
+        self._entriesByPath = {}
+        self._searchKeys = {}
+        self._indexes = {}
+        self._shown = SortedList()
         self.endResetModel()
         self.cleared.emit()
 
     ## Qt Virtuals
 
     def rowCount(self, index=QModelIndex()):
-        return len(self._entries)
+        return len(self._shown)
 
     def roleNames(self):
         return {
@@ -224,7 +329,7 @@ class FileManagerModel(QAbstractListModel, QObjectHelper):
             _role = self.NameRole
         else:
             _role = role
-        entry = self._entries[index.row()]
+        entry = self.entryForRow(index.row())
         return entry.get(_role)
 
     def sort(self, column, order=Qt.AscendingOrder):
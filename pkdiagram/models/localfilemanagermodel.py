@@ -25,7 +25,7 @@ class LocalFileManagerModel(FileManagerModel):
 
     def setData(self, index, value, role=Qt.DisplayRole):
         if role == self.NameRole:
-            entry = self._entries[index.row()]
+            entry = self.entryForRow(index.row())
             oldFilePath = entry[self.PathRole]
             dirPath = os.path.dirname(oldFilePath)
             newFilePath = os.path.join(dirPath, value) + util.DOT_EXTENSION
@@ -37,9 +37,7 @@ class LocalFileManagerModel(FileManagerModel):
                 except:
                     pass
                 if success:
-                    entry[self.NameRole] = value
-                    entry[self.PathRole] = newFilePath
-                self.dataChanged.emit(index, index, [role])
+                    self.updateFileEntry(oldFilePath, newPath=newFilePath, name=value)
                 return success
         return False
 
@@ -91,7 +89,7 @@ class LocalFileManagerModel(FileManagerModel):
 
     @pyqtSlot(int)
     def deleteFileAtRow(self, row):
-        entry = self._entries[row]
+        entry = self.entryForRow(row)
         filePath = entry[self.PathRole]
         status = entry[self.StatusRole]
         peoplePath = os.path.join(filePath, "People")
@@ -116,13 +114,11 @@ class LocalFileManagerModel(FileManagerModel):
             )
         if btn != QMessageBox.Yes:
             return
-        self.beginRemoveRows(QModelIndex(), row, row)
         if os.path.isdir(filePath):
             shutil.rmtree(filePath)
         else:  # prolly won't hit it, but what the hell....
             os.remove(filePath)
-        del self._entries[row]
-        self.endRemoveRows()
+        self.removeFileEntry(filePath)
 
     def get(self, attr):
         if attr == "sortBy":
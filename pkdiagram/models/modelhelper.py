@@ -52,7 +52,11 @@ class ModelHelper(QObjectHelper):
         # a value changed signal
         if not self.refreshingAttr() == prop.name():
             # blocked from set() when this is called back from onItemProperty()
-            self.refreshProperty(prop.name())
+            if self._scene:
+                # Once per bulk edit instead of once per item
+                self._scene.deferCall(self.refreshProperty, prop.name())
+            else:
+                self.refreshProperty(prop.name())
 
     def onSceneProperty(self, prop):
         """Virtual"""
@@ -162,6 +166,7 @@ class ModelHelper(QObjectHelper):
             with self._scene.macro(
                 f"Set attribute '{attr}' on model class '{self.__class__.__name__}'",
                 undo=undo,
+                deferNotifications=True,
             ):
                 for item in self._items:
                     # if the item has not been set yet then leave it alone
@@ -191,7 +196,8 @@ class ModelHelper(QObjectHelper):
             return
         undo = attr != "resetter"
         with self._scene.macro(
-            f"Reset attribute '{attr}' on model class '{self.__class__.__name__}'"
+            f"Reset attribute '{attr}' on model class '{self.__class__.__name__}'",
+            deferNotifications=True,
         ):
             for item in self._items:
                 prop = item.prop(attr)
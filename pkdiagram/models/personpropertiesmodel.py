@@ -111,7 +111,9 @@ class PersonPropertiesModel(QObject, ModelHelper):
             gender = util.personKindFromIndex(value)
             self.set("gender", gender)
         elif attr == "deemphasize":
-            with self._scene.macro("Set person(s) deemphasized"):
+            with self._scene.macro(
+                "Set person(s) deemphasized", deferNotifications=True
+            ):
                 if value:
                     for item in self._items:
                         item.setItemOpacity(util.DEEMPHASIZED_OPACITY, undo=True)
@@ -1,9 +1,79 @@
+from dataclasses import dataclass
+
 from pkdiagram.pyqt import QObject, QDateTime, pyqtSlot, pyqtSignal
 from .qobjecthelper import QObjectHelper
 from .modelhelper import ModelHelper
 from pkdiagram.scene import Item, Property, Event
 
 
+def _epochMSecs(dateTime: QDateTime) -> int | None:
+    if not dateTime or dateTime.isNull():
+        return None
+    return QDateTime(dateTime).toMSecsSinceEpoch()
+
+
+@dataclass(slots=True)
+class EventSearchKey:
+    """Per-event values the search kernel tests against, computed once per
+    event change instead of once per filter pass."""
+
+    dateTime: int | None
+    loggedDateTime: int | None
+    peopleIds: frozenset
+    nodal: bool
+    relationship: bool
+    description: str
+    tagBits: int
+
+
+@dataclass(slots=True)
+class CompiledSearch:
+    """A snapshot of the SearchModel properties in a form that is cheap to
+    test against an EventSearchKey."""
+
+    peopleIds: frozenset
+    nodal: bool
+    hideRelationships: bool
+    startDateTime: int | None
+    endDateTime: int | None
+    loggedStartDateTime: int | None
+    loggedEndDateTime: int | None
+    description: str
+    tagBits: int
+
+    def shouldHide(self, key: EventSearchKey) -> bool:
+        if self.peopleIds and not (self.peopleIds & key.peopleIds):
+            return True
+        elif self.nodal and not key.nodal:
+            return True
+        elif self.hideRelationships and key.relationship:
+            return True
+        elif key.dateTime is None:
+            return True
+        elif self.loggedStartDateTime is not None or self.loggedEndDateTime is not None:
+            if key.loggedDateTime is None:
+                return True
+            elif (
+                self.loggedStartDateTime is not None
+                and key.loggedDateTime < self.loggedStartDateTime
+            ):
+                return True
+            elif (
+                self.loggedEndDateTime is not None
+                and key.loggedDateTime > self.loggedEndDateTime
+            ):
+                return True
+        if self.startDateTime is not None and key.dateTime < self.startDateTime:
+            return True
+        elif self.endDateTime is not None and key.dateTime > self.endDateTime:
+            return True
+        elif self.description and self.description not in key.description:
+            return True
+        elif self.tagBits and not (self.tagBits & key.tagBits):
+            return True
+        return False
+
+
 class SearchModel(QObject, QObjectHelper):
     """Just a Scene-global placeholder for a bunch of properties."""
 
@@ -38,6 +108,8 @@ class SearchModel(QObject, QObjectHelper):
         #     prop.set(_default, notify=False)
         #     self._properties[entry["attr"]] = prop
 
+        self._compiled = None
+        self._tagBits = {}
         self.initQObjectHelper(storage=True)
         # self.startDateTimeChanged.connect(self.onChanged)
         # self.endDateTimeChanged.connect(self.onChanged)
@@ -96,6 +168,7 @@ class SearchModel(QObject, QObjectHelper):
     #         self._propertyListeners.remove(x)
 
     def onQObjectHelperPropertyChanged(self, attr, value):
+        self._compiled = None
         if self._initializing:
             return
         if attr in (
@@ -119,40 +192,48 @@ class SearchModel(QObject, QObjectHelper):
 
     # Verbs
 
-    def shouldHide(self, row: "TimelineRow") -> bool:
-        """Search kernel."""
-        event = row.event
-        nullLoggedDate = bool(
-            not event.loggedDateTime() or event.loggedDateTime().isNull()
+    def _tagMask(self, tags) -> int:
+        mask = 0
+        for tag in tags:
+            bit = self._tagBits.get(tag)
+            if bit is None:
+                bit = self._tagBits[tag] = 1 << len(self._tagBits)
+            mask |= bit
+        return mask
+
+    def compiled(self) -> CompiledSearch:
+        """Return the current filter, rebuilt only after a property changes."""
+        if self._compiled is None:
+            self._compiled = CompiledSearch(
+                peopleIds=frozenset(p.id for p in self.people),
+                nodal=bool(self.nodal),
+                hideRelationships=bool(self.hideRelationships),
+                startDateTime=_epochMSecs(self.startDateTime),
+                endDateTime=_epochMSecs(self.endDateTime),
+                loggedStartDateTime=_epochMSecs(self.loggedStartDateTime),
+                loggedEndDateTime=_epochMSecs(self.loggedEndDateTime),
+                description=(self.description or "").lower(),
+                tagBits=self._tagMask(self.tags or []),
+            )
+        return self._compiled
+
+    def searchKeyFor(self, event: Event) -> EventSearchKey:
+        """Build the search key for an event. Callers that filter the same
+        events repeatedly (i.e. TimelineModel) cache these until the event
+        changes."""
+        description = event.description()
+        return EventSearchKey(
+            dateTime=_epochMSecs(event.dateTime()),
+            loggedDateTime=_epochMSecs(event.loggedDateTime()),
+            peopleIds=frozenset(p.id for p in event.people()),
+            nodal=bool(event.nodal()),
+            relationship=bool(event.relationship()),
+            description=description.lower() if description else "",
+            tagBits=self._tagMask(event.tags()),
         )
-        hidden = False
-        if self.people and not any(p in event.people() for p in self.people):
-            hidden = True
-        elif self.nodal and not event.nodal():
-            hidden = True
-        elif self.hideRelationships and event.relationship():
-            hidden = True
-        elif not event.dateTime() or event.dateTime().isNull():
-            hidden = True
-        elif (self.loggedStartDateTime or self.loggedEndDateTime) and nullLoggedDate:
-            hidden = True
-        elif (self.loggedStartDateTime and not nullLoggedDate) and QDateTime(
-            event.loggedDateTime()
-        ) < self.loggedStartDateTime:
-            hidden = True
-        elif (self.loggedEndDateTime and not nullLoggedDate) and QDateTime(
-            event.loggedDateTime()
-        ) > self.loggedEndDateTime:
-            hidden = True
-        elif self.startDateTime and QDateTime(event.dateTime()) < self.startDateTime:
-            hidden = True
-        elif self.endDateTime and QDateTime(event.dateTime()) > self.endDateTime:
-            hidden = True
-        elif self.description and (
-            self.description.lower()
-            not in (event.description().lower() if event.description() else "")
-        ):
-            hidden = True
-        elif self.tags and not event.hasTags(self.tags):  # ignore search model tags
-            hidden = True
-        return hidden
+
+    def shouldHide(self, row: "TimelineRow", key: EventSearchKey = None) -> bool:
+        """Search kernel."""
+        if key is None:
+            key = self.searchKeyFor(row.event)
+        return self.compiled().shouldHide(key)
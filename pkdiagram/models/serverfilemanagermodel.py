@@ -38,6 +38,9 @@ class ServerFileManagerModel(FileManagerModel):
     - Can be periodically queried to detect and emit changes to files.
         - Overwrites local version with server version if server version is newer
         - Can be used to automatically update the currently opened file.
+    - Index (metadata) is stored apart from the diagram data blobs.
+        - Blobs are only rewritten when their content hash changes.
+        - Blobs are read and verified lazily when a diagram is first accessed.
     - Allows permission-bound provisioning:
         - Upload (Owner)
         - Share diagram with various users (owner, admin)
@@ -55,6 +58,8 @@ class ServerFileManagerModel(FileManagerModel):
 
     DiagramDataRole = FileManagerModel.OwnerRole + 1
 
+    INDEX_VERSION = 2
+
     serverError = pyqtSignal(int)
     updateFinished = pyqtSignal()
     reloadDiagramRequested = pyqtSignal(str, Diagram, arguments=["fpath", "diagram"])
@@ -67,6 +72,7 @@ class ServerFileManagerModel(FileManagerModel):
         super().__init__(parent)
         self.initialized = False
         self.diagramCache = {}
+        self._blobHashes = {}  # diagram_id: content hash of the blob on disk
         self._indexReplies = []
         self._userId = None
         self.prefs = QApplication.instance().prefs()
@@ -91,9 +97,7 @@ class ServerFileManagerModel(FileManagerModel):
             # log.info("Creating folder:", self.dataPath)
             os.makedirs(self.dataPath)
         if not os.path.isfile(self.metadataPath):
-            with open(self.metadataPath, "wb") as f:
-                bdata = pickle.dumps(self.diagramCache)
-                f.write(bdata)
+            self.write()
         self.initialized = True
         self.read()
 
@@ -127,6 +131,7 @@ class ServerFileManagerModel(FileManagerModel):
                 id = fname.replace(util.DOT_EXTENSION, "")
                 self._deleteLocalFileByID(id)
         self.diagramCache = {}
+        self._blobHashes = {}
         self.write()
         super().clear()
 
@@ -168,16 +173,21 @@ class ServerFileManagerModel(FileManagerModel):
         # delete disk file entries without cache entry to match
         for diagram_id in diskIds:
             if not diagram_id in cacheIds:
-                self._deleteLocalFileByID(id)
-        # load up resulting data
+                self._deleteLocalFileByID(diagram_id)
+        # load up resulting data; blobs are already on disk so don't touch them
         # log.info("READ:")
         for diagram in newIndex:
             # log.info(f"    Diagram[{diagram.id}].updated_at: {diagram.updated_at}")
-            self._addOrUpdateDiagram(diagram, _batch=True)
+            self._addFileEntry(diagram, _batch=True)
+            self.diagramCache[diagram.id] = diagram
         self._resort()
 
     def write(self):
         os.makedirs(self.dataPath, exist_ok=True)
+        # Only diagrams that were accessed have data in memory to compare.
+        for diagram in self.diagramCache.values():
+            if diagram.data is not None:
+                self._writeBlob(diagram)
         with open(self.metadataPath, "wb") as f:
             # log.info("self.write():")
             # for diagram_id, diagram in self.diagramCache.items():
@@ -242,6 +252,7 @@ class ServerFileManagerModel(FileManagerModel):
                         fpath = self.localPathForID(diagram.id)
                         self._deleteLocalFileByID(diagram.id)
                         del self.diagramCache[diagram.id]
+                        self._blobHashes.pop(diagram.id, None)
                         self.removeFileEntry(fpath)
 
                 # Pull new entries asyncronously
@@ -316,65 +327,100 @@ class ServerFileManagerModel(FileManagerModel):
         for id, diagram in self.diagramCache.items():
             diagram_fpath = self.localPathForID(id)
             if fpath == diagram_fpath:
-                return diagram
+                return self._loadBlob(diagram)
 
     def findDiagram(self, id):
-        return self.diagramCache.get(id)
+        diagram = self.diagramCache.get(id)
+        if diagram:
+            return self._loadBlob(diagram)
 
     def diagramForRow(self, row):
         diagram_id = self.index(row, 0).data(self.IDRole)
         return self.findDiagram(diagram_id)
 
     def rowForDiagramId(self, diagram_id):
-        for row in range(self.rowCount()):
-            if diagram_id == self.index(row, 0).data(self.IDRole):
-                return row
+        return self.rowForFilePath(self.localPathForID(diagram_id))
 
     def findMyFreeDiagram(self):
         if self.session.isLoggedIn():
             return self.findDiagram(self.session.user.free_diagram_id)
 
-    def _addOrUpdateDiagram(self, newDiagram, _batch=False):
-        """Add or update a diagram and update the underlying FileManagerModel."""
+    def _blobPath(self, diagram_id):
+        return os.path.join(self.localPathForID(diagram_id), "diagram.pickle")
 
-        ## FileManagerModel
-        if newDiagram.isFreeDiagram():
+    def _writeBlob(self, diagram):
+        """Write the diagram's data to its package unless it is already there."""
+        bdata = diagram.data
+        if bdata is None:
+            return
+        elif not isinstance(bdata, bytes):
+            bdata = bdata.encode("utf-8")
+        digest = util.hashFor(bdata)
+        picklePath = self._blobPath(diagram.id)
+        if self._blobHashes.get(diagram.id) == digest and os.path.isfile(picklePath):
+            return
+        os.makedirs(os.path.dirname(picklePath), exist_ok=True)
+        util.writeWithHash(picklePath, bdata)
+        self._blobHashes[diagram.id] = digest
+
+    def _loadBlob(self, diagram):
+        """Read in the diagram's data from disk on first access, or from the
+        server if the cached copy is missing or fails verification."""
+        if diagram.data is not None:
+            return diagram
+        picklePath = self._blobPath(diagram.id)
+        if os.path.isfile(picklePath):
+            try:
+                diagram.data = util.readWithHash(picklePath)
+                return diagram
+            except util.FileTamperedWithError:
+                log.warning(
+                    f"Cached diagram {diagram.id} failed verification, re-fetching."
+                )
+                self._blobHashes.pop(diagram.id, None)
+        if self.session and self.session.isLoggedIn():
+            serverDiagram = self.syncDiagramFromServer(diagram.id)
+            if serverDiagram:
+                diagram.data = serverDiagram.data
+        return diagram
+
+    def _addFileEntry(self, diagram, _batch=False):
+        if diagram.isFreeDiagram():
             name = "Free Diagram"
-        elif (
-            newDiagram.use_real_names and not newDiagram.require_password_for_real_names
-        ):
-            name = newDiagram.name
-        # elif newDiagram.alias:
-        #     name = '[%s]' % newDiagram.alias
-        elif newDiagram.name:
-            name = newDiagram.name
+        elif diagram.use_real_names and not diagram.require_password_for_real_names:
+            name = diagram.name
+        # elif diagram.alias:
+        #     name = '[%s]' % diagram.alias
+        elif diagram.name:
+            name = diagram.name
         else:
             name = "<not set>"
 
-        if newDiagram.updated_at:
-            modified = newDiagram.updated_at.timestamp()
+        if diagram.updated_at:
+            modified = diagram.updated_at.timestamp()
         else:
-            modified = newDiagram.created_at.timestamp()
+            modified = diagram.created_at.timestamp()
         self.addFileEntry(
-            self.localPathForID(newDiagram.id),
+            self.localPathForID(diagram.id),
             name=name,
             status=CUtil.FileIsCurrent,
-            id=newDiagram.id,
-            owner=newDiagram.user.username,
+            id=diagram.id,
+            owner=diagram.user.username,
             modified=modified,
             shown=True,
             _batch=_batch,
         )
 
+    def _addOrUpdateDiagram(self, newDiagram, _batch=False):
+        """Add or update a diagram and update the underlying FileManagerModel."""
+
+        ## FileManagerModel
+        self._addFileEntry(newDiagram, _batch=_batch)
+
         ## ServerFileManagerModel
 
         # Ensure encrypted fd file exists on disk
-        packagePath = os.path.join(
-            self.dataPath, f"{newDiagram.id}{util.DOT_EXTENSION}"
-        )
-        picklePath = os.path.join(packagePath, "diagram.pickle")
-        os.makedirs(packagePath, exist_ok=True)
-        util.writeWithHash(picklePath, newDiagram.data)
+        self._writeBlob(newDiagram)
 
         # Update diagram and emit
         existingDiagram = self.diagramCache.get(newDiagram.id)
@@ -431,15 +477,32 @@ class ServerFileManagerModel(FileManagerModel):
         self.session.server().blockingRequest("DELETE", url)
         # entry = self.findDiagram(diagram_id)
         del self.diagramCache[diagram_id]
+        self._blobHashes.pop(diagram_id, None)
         fpath = self.localPathForID(diagram_id)
         self.removeFileEntry(fpath)
         shutil.rmtree(fpath)
 
     def _demarshal(self, data):
-        return [Diagram.create(entry) for entry in data]
+        if isinstance(data, list):
+            # Version 1 index, with every diagram's data inline.
+            return [Diagram.create(entry) for entry in data]
+        elif not data:
+            return []
+        self._blobHashes = dict(data["blobs"])
+        return [Diagram.create(entry) for entry in data["diagrams"]]
 
     def _marshal(self, data):
-        return [dataclasses.asdict(diagram) for diagram_id, diagram in data.items()]
+        diagrams = []
+        for diagram_id, diagram in data.items():
+            entry = dataclasses.asdict(diagram)
+            entry["data"] = None  # in the blob
+            diagrams.append(entry)
+        blobs = {
+            diagram_id: digest
+            for diagram_id, digest in self._blobHashes.items()
+            if diagram_id in data
+        }
+        return {"version": self.INDEX_VERSION, "diagrams": diagrams, "blobs": blobs}
 
     ## Model Virtuals
 
@@ -473,9 +536,9 @@ class ServerFileManagerModel(FileManagerModel):
 
     def data(self, index, role=Qt.DisplayRole):
         if role == self.DiagramDataRole:
-            entry = self._entries[index.row()]
+            entry = self.entryForRow(index.row())
             diagram = self.findDiagram(entry[self.IDRole])
-            return diagram.data
+            return diagram.data if diagram else None
         else:
             return super().data(index, role)
 
@@ -520,7 +583,7 @@ class ServerFileManagerModel(FileManagerModel):
             log.warning(
                 f"ServerFileManagerModel.ShownRole is deprecated (value: {value})"
             )
-            entry = self._entries[index.row()]
+            entry = self.entryForRow(index.row())
             if value != entry[role]:
                 entry[role] = value
 
@@ -592,7 +655,7 @@ class ServerFileManagerModel(FileManagerModel):
 
             if success:
                 log.info(
-                    f"Pushed diagram {diagram.id} to server, bytes: {len(diagram.data)}, version: {diagram.version}"
+                    f"Pushed diagram {diagram.id} to server, bytes: {len(diagram.data or b'')}, version: {diagram.version}"
                 )
                 self.dataChanged.emit(index, index, [role])
             else:
@@ -97,14 +97,18 @@ class TagsModel(QAbstractListModel, ModelHelper):
         if self._settingItemTags:
             return
         if prop.name() == "tags":
-            startIndex = self.index(0, 0)
-            endIndex = self.index(self.rowCount() - 1, 0)
-            self.dataChanged.emit(startIndex, endIndex, [self.ActiveRole])
+            if self._scene:
+                self._scene.deferCall(self.updateActiveStates)
+            else:
+                self.updateActiveStates()
 
     def onSearchTagsChanged(self):
         """For the active states"""
         if self._settingSearchTags:
             return
+        self.updateActiveStates()
+
+    def updateActiveStates(self):
         startIndex = self.index(0, 0)
         endIndex = self.index(self.rowCount() - 1, 0)
         self.dataChanged.emit(startIndex, endIndex, [self.ActiveRole])
@@ -263,7 +267,9 @@ class TagsModel(QAbstractListModel, ModelHelper):
             elif self._items:
                 todo = set(self._items)
                 self._settingItemTags = True
-                with self._scene.macro(f"Set tag '{tag}' on items to {value}"):
+                with self._scene.macro(
+                    f"Set tag '{tag}' on items to {value}", deferNotifications=True
+                ):
                     for item in todo:
                         if value == Qt.Checked or value:
                             if tag not in item.tags():
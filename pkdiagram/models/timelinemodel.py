@@ -1,4 +1,5 @@
 import logging
+import functools
 from dataclasses import dataclass
 
 # from sortedcontainers import SortedList
@@ -43,13 +44,16 @@ class TimelineRow:
         else:
             return self.event.dateTime()
 
+    def sortKey(self) -> tuple:
+        """By this row's date, then the event's order, start before end."""
+        return (
+            util.dateTimeSortKey(self.dateTime()),
+            self.event.sortKey(),
+            self.isEndMarker,
+        )
+
     def __lt__(self, other):
-        if self.dateTime() < other.dateTime():
-            return True
-        elif self.dateTime() > other.dateTime():
-            return False
-        else:
-            return True
+        return self.sortKey() < other.sortKey()
 
 
 def selectedEvents(timelineModel: "TimelineModel", selectionModel: QItemSelectionModel):
@@ -117,6 +121,27 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
         FUNCTIONING,  # 13
     ]
 
+    # Column label: data() method, see _refreshColumnData()
+    COLUMN_DATA = {
+        BUDDIES: "_buddiesData",
+        DATETIME: "_dateTimeData",
+        UNSURE: "_unsureData",
+        DESCRIPTION: "_descriptionData",
+        LOCATION: "_locationData",
+        PERSON: "_personData",
+        LOGGED: "_loggedData",
+        COLOR: "_colorData",
+        NODAL: "_nodalData",
+        TAGS: "_tagsData",
+        SYMPTOM: "_symptomData",
+        ANXIETY: "_anxietyData",
+        RELATIONSHIP: "_relationshipData",
+        FUNCTIONING: "_functioningData",
+    }
+
+    # Columns with formatted display strings that are cached per row.
+    CACHED_COLUMNS = (DATETIME, DESCRIPTION, PERSON, LOGGED, TAGS)
+
     FlagsRole = Qt.UserRole + 1
     NodalRole = FlagsRole + 1
     DateTimeRole = NodalRole + 1
@@ -137,13 +162,19 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._rows = SortedList()
+        self._rows = SortedList(key=TimelineRow.sortKey)
         self._columnHeaders = []
         self._headerModel = TableHeaderModel(self)
         self._settingData = False  # prevent recursion
         self._searchModel = None
+        self._searchKeys = {}  # Event: EventSearchKey
         self._eventProperties = []
+        self._columnData = []  # [callable(TimelineRow, role)] per column
+        self._columnAttrs = []  # [dynamic property attr or None] per column
+        self._cachedColumns = set()
+        self._displayCache = {}  # (Event, isEndMarker): {column: str}
         self.initModelHelper()
+        self._refreshColumnData()
 
     # def __repr__(self):
     #     s = ''
@@ -161,6 +192,12 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
 
     ## Rows
 
+    def _searchKeyFor(self, event: Event):
+        key = self._searchKeys.get(event)
+        if key is None:
+            key = self._searchKeys[event] = self._searchModel.searchKeyFor(event)
+        return key
+
     def _shouldHide(self, row: TimelineRow):
         """Check if a timeline row should be hidden based on filters."""
         event = row.event
@@ -173,54 +210,85 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
             event.kind() == EventKind.Shift
             and event.relationship()
             and row.isEndMarker
-            and self._scene.emotionsFor(event)
+            and (emotions := self._scene.emotionsFor(event))
         ):
             # Hide end markers for single-date emotions with Shift events
-            emotions = self._scene.emotionsFor(event)
-            if emotions:
-                # Check if any emotion for this event is a singular date
-                # (start and end are the same or no end date)
-                for emotion in emotions:
-                    if emotion.sourceEvent() == event:
-                        emotion_event = emotion.sourceEvent()
-                        if emotion_event:
-                            start_dt = emotion_event.dateTime()
-                            end_dt = emotion_event.endDateTime()
-                            if not end_dt or (start_dt and start_dt == end_dt):
-                                hidden = True
-                                break
-        elif self._searchModel and self._searchModel.shouldHide(row):
+            # Check if any emotion for this event is a singular date
+            # (start and end are the same or no end date)
+            for emotion in emotions:
+                if emotion.sourceEvent() == event:
+                    emotion_event = emotion.sourceEvent()
+                    if emotion_event:
+                        start_dt = emotion_event.dateTime()
+                        end_dt = emotion_event.endDateTime()
+                        if not end_dt or (start_dt and start_dt == end_dt):
+                            hidden = True
+                            break
+        elif self._searchModel and self._searchModel.shouldHide(
+            row, key=self._searchKeyFor(event)
+        ):
             hidden = True
         return hidden
 
+    def _visibleRowsFor(self, event: Event) -> list[TimelineRow]:
+        ret = []
+        startRow = TimelineRow(event=event, isEndMarker=False)
+        if not self._shouldHide(startRow):
+            ret.append(startRow)
+        if event.endDateTime():
+            endRow = TimelineRow(event=event, isEndMarker=True)
+            if not self._shouldHide(endRow):
+                ret.append(endRow)
+        return ret
+
     def _ensureEvent(self, event: Event, emit=True):
         for row in self._rows:
             if row.event == event:
                 return
-        # Check start event row
-        startRow = TimelineRow(event=event, isEndMarker=False)
-        if not self._shouldHide(startRow):
+        for timelineRow in self._visibleRowsFor(event):
             newRow = self._rows.bisect_right(
-                event
+                timelineRow
             )  # SortedList.add uses &.bisect_right()
             if emit:
                 self.beginInsertRows(QModelIndex(), newRow, newRow)
-            self._rows.add(startRow)
+            self._rows.add(timelineRow)
             if emit:
                 self.endInsertRows()
 
-        # Check end event row
-        if event.endDateTime():
-            endRow = TimelineRow(event=event, isEndMarker=True)
-            if not self._shouldHide(endRow):
-                newRow = self._rows.bisect_right(
-                    event
-                )  # SortedList.add uses &.bisect_right()
-                if emit:
-                    self.beginInsertRows(QModelIndex(), newRow, newRow)
-                self._rows.add(endRow)
-                if emit:
-                    self.endInsertRows()
+    def _refilterRows(self):
+        """Apply a changed search filter as row removes/inserts rather than a
+        model reset so views keep their scroll position and selection."""
+        if not self._scene:
+            self._refreshRows()
+            return
+        wanted = {}
+        for event in self._scene.events():
+            for timelineRow in self._visibleRowsFor(event):
+                wanted[(event, timelineRow.isEndMarker)] = timelineRow
+        # Remove rows that no longer pass, in contiguous runs from the bottom up.
+        i = len(self._rows) - 1
+        while i >= 0:
+            row = self._rows[i]
+            if wanted.pop((row.event, row.isEndMarker), None) is not None:
+                i -= 1
+                continue
+            last = i
+            while i > 0:
+                prev = self._rows[i - 1]
+                if (prev.event, prev.isEndMarker) in wanted:
+                    break
+                i -= 1
+            self.beginRemoveRows(QModelIndex(), i, last)
+            del self._rows[i : last + 1]
+            self.endRemoveRows()
+            i -= 1
+        # What is left in `wanted` are the newly visible rows.
+        for timelineRow in sorted(wanted.values(), key=TimelineRow.sortKey):
+            newRow = self._rows.bisect_right(timelineRow)
+            self.beginInsertRows(QModelIndex(), newRow, newRow)
+            self._rows.add(timelineRow)
+            self.endInsertRows()
+        self.refreshAllProperties()
 
     def _removeEvent(self, event):
         rows = [x for x in self._rows if x.event == event]
@@ -234,12 +302,31 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
 
     def refreshColumnHeaders(self):
         self._columnHeaders = self.getColumnHeaders()
+        self._refreshColumnData()
         self._headerModel.setHeaders(self._columnHeaders)
 
+    def _refreshColumnData(self):
+        """Build the column dispatch table for data(), once per header change."""
+        self._columnData = [getattr(self, self.COLUMN_DATA[x]) for x in self.COLUMNS]
+        self._columnAttrs = [None] * len(self.COLUMNS)
+        if self._scene:
+            for entry in self._scene.eventProperties():
+                self._columnData.append(
+                    functools.partial(self._dynamicData, entry["attr"])
+                )
+                self._columnAttrs.append(entry["attr"])
+        self._cachedColumns = {self.COLUMNS.index(x) for x in self.CACHED_COLUMNS}
+        self._displayCache = {}
+
+    def _invalidateDisplay(self, event: Event):
+        self._displayCache.pop((event, False), None)
+        self._displayCache.pop((event, True), None)
+
     def onSceneProperty(self, prop):
         # if prop.name() == "currentDateTime":
         #     self._refreshRows()
         if prop.name() == "showAliases":
+            self._displayCache = {}
             # When showAliases changes, emit dataChanged for columns that display names/aliases
             # Only emit if the display value actually changes
             descCol = self.COLUMNS.index(self.DESCRIPTION)
@@ -260,6 +347,7 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
                     self.index(row_idx, parentCol), self.index(row_idx, parentCol)
                 )
         elif prop.name() == "hideNames":
+            self._displayCache = {}
             # When hideNames changes, emit dataChanged for columns that display names/aliases
             parentCol = self.COLUMNS.index(self.PERSON)
             self.dataChanged.emit(
@@ -290,16 +378,19 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
                 Qt.Horizontal, len(self.COLUMNS), self.columnCount()
             )
             self._eventProperties = list(prop.get())
+            self._refreshColumnData()  # also when only names or order changed
 
     def _refreshRows(self):
         """The core method to collect all the events from people, pair-bonds, and emotions."""
         if not self._scene:
-            self._rows = SortedList()
+            self._rows = SortedList(key=TimelineRow.sortKey)
             self.refreshAllProperties()
             self.modelReset.emit()
             return
         # sort and filter
-        self._rows = SortedList()
+        self._rows = SortedList(key=TimelineRow.sortKey)
+        self._searchKeys = {}
+        self._displayCache = {}
         for event in self._scene.events():
             self._ensureEvent(event, emit=False)
         self.refreshAllProperties()
@@ -309,25 +400,23 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
         return list(self._rows)
 
     def onSearchChanged(self):
-        self._refreshRows()
+        self._refilterRows()
 
     def onEventAdded(self, event):
         self._ensureEvent(event)
 
     def onEventChanged(self, prop):
+        self._searchKeys.pop(prop.item, None)
+        self._invalidateDisplay(prop.item)
         if self._settingData:
             return
         event = prop.item
-        rows = [self._rows.index(x) for x in self._rows if x.event == event]
-        try:
-            startRow = self._rows.index(event)
-        except ValueError:
-            row = -1
+        rows = [i for i, x in enumerate(self._rows) if x.event == event]
         if prop.name() == "person":
             # When person changes (including to None), re-evaluate visibility
             self._removeEvent(event)
             self._ensureEvent(event)
-        elif prop.name() == "dateTime" or prop.name() == "endDateTime":
+        elif prop.name() in ("dateTime", "endDateTime", "kind"):
             self._removeEvent(event)
             self._ensureEvent(event)
             self.refreshProperty("dateBuddies")
@@ -394,6 +483,8 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
                 )
 
     def onEventRemoved(self, event):
+        self._searchKeys.pop(event, None)
+        self._invalidateDisplay(event)
         self._removeEvent(event)
 
     def onPersonRemoved(self, person):
@@ -411,6 +502,8 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
         ):
             person = prop.item
             col = self.COLUMNS.index(self.PERSON)
+            if self._scene.shouldShowAliases():
+                self._displayCache = {}  # any description may contain the name
             # Find all rows with events involving this person
             for row_idx, timelineRow in enumerate(self._rows):
                 event = timelineRow.event
@@ -418,8 +511,10 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
                 if (
                     event.person() == person
                     or event.spouse() == person
+                    or event.child() == person
                     or person in event.relationshipTargets()
                 ):
+                    self._invalidateDisplay(event)
                     self.dataChanged.emit(
                         self.index(row_idx, col), self.index(row_idx, col)
                     )
@@ -447,6 +542,7 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
             if self._searchModel:
                 self._searchModel.changed.disconnect(self.onSearchChanged)
             self._searchModel = value
+            self._searchKeys = {}
             if self._searchModel:
                 self._searchModel.changed.connect(self.onSearchChanged)
             self._refreshRows()
@@ -506,101 +602,106 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
             return None
         timelineRow = self._rows[index.row()]
         event = timelineRow.event
-        ret = None
 
         # roles
 
         if not self._scene:
-            ret = None
+            return None
         elif role == self.FlagsRole:
-            ret = self.flags(index)
+            return self.flags(index)
         elif role == self.DateTimeRole:
-            ret = timelineRow.dateTime()
+            return timelineRow.dateTime()
         elif role == self.NodalRole:
-            ret = event.nodal()
-        elif role == self.NodalRole:
-            ret = ", ".join(event.tags())
+            return event.nodal()
         elif role == self.ColorRole:
             ret = event.color()
-            if ret == "transparent":
-                ret = None
-        # elif role == self.FirstBuddyRole:
-        #     buddyRow = self.dateBuddyForRow(index.row())
-        #     if buddyRow is not None and buddyRow > index.row():
-        #         ret = True
-        #     else:
-        #         ret = False
-        # elif role == self.SecondBuddyRole:
-        #     buddyRow = self.dateBuddyForRow(index.row())
-        #     if buddyRow is not None and buddyRow < index.row():
-        #         ret = True
-        #     else:
-        #         ret = False
+            return None if ret == "transparent" else ret
         elif role == self.ParentIdRole:
             person = event.person()
             return person.id if person else None
         elif role == self.HasNotesRole:
-            ret = bool(event.notes())
+            return bool(event.notes())
 
         # columns
 
-        elif self.isColumn(index, self.BUDDIES):
-            ret = ""
-        elif self.isColumn(index, self.NODAL):
-            ret = event.nodal()
-        elif self.isColumn(index, self.DATETIME):
-            if role == Qt.DisplayRole:
-                ret = util.dateString(timelineRow.dateTime())
-            elif role in (self.DisplayExpandedRole, self.DateTimeRole):
-                ret = util.dateTimeString(timelineRow.dateTime())
-        elif self.isColumn(index, self.UNSURE):
-            ret = event.unsure()
-        elif self.isColumn(index, self.DESCRIPTION):
-            # For relationship events with end markers, show "X began" / "X ended"
-            if event.relationship() and (event.dateTime() or event.endDateTime()):
-                relationship_name = event.relationship().value
-                if timelineRow.isEndMarker:
-                    ret = f"{relationship_name} ended"
-                else:
-                    ret = f"{relationship_name} began"
-            else:
-                ret = event.description()
-        elif self.isColumn(index, self.PERSON):
-            if self._scene.hideNames():
-                ret = "<hidden>"
+        column = index.column()
+        if column >= len(self._columnData):
+            return None
+        elif role == Qt.DisplayRole and column in self._cachedColumns:
+            key = (event, timelineRow.isEndMarker)
+            values = self._displayCache.get(key)
+            if values is None:
+                values = self._displayCache[key] = {}
+            if column not in values:
+                values[column] = self._columnData[column](timelineRow, role)
+            return values[column]
+        else:
+            return self._columnData[column](timelineRow, role)
+
+    def _buddiesData(self, timelineRow, role):
+        return ""
+
+    def _dateTimeData(self, timelineRow, role):
+        if role == Qt.DisplayRole:
+            return util.dateString(timelineRow.dateTime())
+        elif role in (self.DisplayExpandedRole, self.DateTimeRole):
+            return util.dateTimeString(timelineRow.dateTime())
+
+    def _unsureData(self, timelineRow, role):
+        return timelineRow.event.unsure()
+
+    def _descriptionData(self, timelineRow, role):
+        event = timelineRow.event
+        # For relationship events with end markers, show "X began" / "X ended"
+        if event.relationship() and (event.dateTime() or event.endDateTime()):
+            relationship_name = event.relationship().value
+            if timelineRow.isEndMarker:
+                return f"{relationship_name} ended"
             else:
-                ret = event.parentName()
-        elif self.isColumn(index, self.LOCATION):
-            ret = event.location()
-        elif self.isColumn(index, self.LOGGED):
-            ret = util.dateString(event.loggedDateTime())
-        elif self.isColumn(index, self.COLOR):
-            ret = event.color()
-            if ret == "transparent":
-                ret = None
-        elif self.isColumn(index, self.TAGS):
-            ret = ", ".join(event.tags())
-
-        elif index.column() >= len(self.COLUMNS):
-            attr = self.dynamicPropertyAttr(index)
-            if attr:
-                prop = event.dynamicProperty(attr)
-                ret = prop.get()
-
-        elif self.isColumn(index, self.ANXIETY):
-            ret = event.anxiety()
-            ret = ret.value if ret else None
-        elif self.isColumn(index, self.SYMPTOM):
-            ret = event.symptom()
-            ret = ret.value if ret else None
-        elif self.isColumn(index, self.RELATIONSHIP):
-            ret = event.relationship()
-            ret = ret.value if ret else None
-        elif self.isColumn(index, self.FUNCTIONING):
-            ret = event.functioning()
-            ret = ret.value if ret else None
+                return f"{relationship_name} began"
+        else:
+            return event.description()
 
-        return ret
+    def _personData(self, timelineRow, role):
+        if self._scene.hideNames():
+            return "<hidden>"
+        else:
+            return timelineRow.event.parentName()
+
+    def _locationData(self, timelineRow, role):
+        return timelineRow.event.location()
+
+    def _loggedData(self, timelineRow, role):
+        return util.dateString(timelineRow.event.loggedDateTime())
+
+    def _colorData(self, timelineRow, role):
+        ret = timelineRow.event.color()
+        return None if ret == "transparent" else ret
+
+    def _nodalData(self, timelineRow, role):
+        return timelineRow.event.nodal()
+
+    def _tagsData(self, timelineRow, role):
+        return ", ".join(timelineRow.event.tags())
+
+    def _symptomData(self, timelineRow, role):
+        ret = timelineRow.event.symptom()
+        return ret.value if ret else None
+
+    def _anxietyData(self, timelineRow, role):
+        ret = timelineRow.event.anxiety()
+        return ret.value if ret else None
+
+    def _relationshipData(self, timelineRow, role):
+        ret = timelineRow.event.relationship()
+        return ret.value if ret else None
+
+    def _functioningData(self, timelineRow, role):
+        ret = timelineRow.event.functioning()
+        return ret.value if ret else None
+
+    def _dynamicData(self, attr, timelineRow, role):
+        return timelineRow.event.dynamicProperty(attr).get()
 
     def setData(self, index, value, role=Qt.EditRole):
         if not self._scene:
@@ -751,14 +852,8 @@ class TimelineModel(QAbstractTableModel, ModelHelper):
                 return len(self.COLUMNS) + i
 
     def dynamicPropertyAttr(self, index):
-        eventProperties = self._scene.eventProperties()
-        if index.column() < len(self.COLUMNS):
-            return None
-        elif index.column() < (len(self.COLUMNS) + len(eventProperties)):
-            iDynProp = index.column() - len(self.COLUMNS)
-            return eventProperties[iDynProp]["attr"]
-        else:
-            return None
+        if 0 <= index.column() < len(self._columnAttrs):
+            return self._columnAttrs[index.column()]
 
     ## Row Accessors
 
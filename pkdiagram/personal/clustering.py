@@ -0,0 +1,322 @@
+"""
+Offline cluster detection for the personal app.
+
+Events are grouped in time: a cluster window is a run of dated events where
+no two neighbors are more than `maxGapDays` apart. Windows are independent of
+each other, so each one is clustered on its own and cached by a hash of its
+contents. Adding or editing one event only changes the hash of the window it
+lands in, so only that window is re-clustered; every other window is served
+from the in-memory or on-disk cache. LocalClusterEngine.update() goes one step
+further and only re-hashes the windows that one event leaves and lands in.
+
+Input is the same list of event dicts that ClusterModel sends to the server,
+and output is the same cluster dict shape the server returns.
+"""
+
+import json
+import bisect
+import hashlib
+import logging
+import datetime
+from dataclasses import dataclass
+from pathlib import Path
+
+_log = logging.getLogger(__name__)
+
+
+SHIFT_VARIABLES = ("symptom", "anxiety", "functioning")
+VARIABLE_LABELS = {
+    "symptom": "Symptom",
+    "anxiety": "Anxiety",
+    "functioning": "Functioning",
+    "relationship": "Relationship",
+}
+SHIFT_DELTAS = {"up": 1, "down": -1}
+
+# Bump when the algorithm changes so stale on-disk windows are not reused.
+ENGINE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ClusterPoint:
+    """The features of one event that clustering looks at."""
+
+    id: int
+    day: int  # proleptic Gregorian ordinal
+    symptom: int = 0
+    anxiety: int = 0
+    functioning: int = 0
+    relationship: str | None = None
+
+    @staticmethod
+    def fromDict(data: dict) -> "ClusterPoint | None":
+        try:
+            day = datetime.date.fromisoformat(data["dateTime"]).toordinal()
+        except (KeyError, TypeError, ValueError):
+            return None
+        return ClusterPoint(
+            id=data["id"],
+            day=day,
+            symptom=SHIFT_DELTAS.get(data.get("symptom"), 0),
+            anxiety=SHIFT_DELTAS.get(data.get("anxiety"), 0),
+            functioning=SHIFT_DELTAS.get(data.get("functioning"), 0),
+            relationship=data.get("relationship"),
+        )
+
+    def isShift(self) -> bool:
+        return bool(
+            self.symptom or self.anxiety or self.functioning or self.relationship
+        )
+
+    def key(self) -> tuple:
+        return (
+            self.id,
+            self.day,
+            self.symptom,
+            self.anxiety,
+            self.functioning,
+            self.relationship,
+        )
+
+
+def _dateString(day: int) -> str:
+    return datetime.date.fromordinal(day).isoformat()
+
+
+def windowsFor(points: list[ClusterPoint], maxGapDays: int) -> list[list[ClusterPoint]]:
+    """Split date-sorted points wherever neighbors are more than maxGapDays apart."""
+    windows = []
+    current = []
+    for point in points:
+        if current and point.day - current[-1].day > maxGapDays:
+            windows.append(current)
+            current = []
+        current.append(point)
+    if current:
+        windows.append(current)
+    return windows
+
+
+def windowHash(window: list[ClusterPoint], minEvents: int, maxGapDays: int) -> str:
+    h = hashlib.sha256()
+    h.update(repr((ENGINE_VERSION, minEvents, maxGapDays)).encode())
+    for point in window:
+        h.update(repr(point.key()).encode())
+    return h.hexdigest()
+
+
+def clusterWindow(window: list[ClusterPoint], minEvents: int) -> list[dict]:
+    """
+    Cluster one window. A window becomes a cluster when it has at least
+    `minEvents` SARF shifts; the title names the variables that moved the most
+    and in which direction.
+    """
+    shifts = [p for p in window if p.isShift()]
+    if len(shifts) < minEvents:
+        return []
+    totals = {attr: sum(getattr(p, attr) for p in shifts) for attr in SHIFT_VARIABLES}
+    counts = {
+        attr: sum(1 for p in shifts if getattr(p, attr)) for attr in SHIFT_VARIABLES
+    }
+    counts["relationship"] = sum(1 for p in shifts if p.relationship)
+    ranked = sorted(
+        (attr for attr in counts if counts[attr]),
+        key=lambda attr: (-counts[attr], attr),
+    )
+    parts = []
+    for attr in ranked[:2]:
+        label = VARIABLE_LABELS[attr]
+        if attr == "relationship":
+            parts.append(label)
+        elif totals[attr] > 0:
+            parts.append(f"{label} up")
+        elif totals[attr] < 0:
+            parts.append(f"{label} down")
+        else:
+            parts.append(f"{label} mixed")
+    eventIds = [p.id for p in window]
+    digest = hashlib.sha256(repr(eventIds).encode()).hexdigest()
+    return [
+        {
+            "id": f"local-{digest[:12]}",
+            "title": ", ".join(parts),
+            "startDate": _dateString(window[0].day),
+            "endDate": _dateString(window[-1].day),
+            "eventIds": eventIds,
+            "dominantVariable": ranked[0] if ranked else None,
+            "source": "local",
+        }
+    ]
+
+
+@dataclass
+class _Window:
+    points: list[ClusterPoint]  # sorted by (day, id)
+    digest: str
+    clusters: list[dict]
+
+    @property
+    def start(self) -> int:
+        return self.points[0].day
+
+    @property
+    def end(self) -> int:
+        return self.points[-1].day
+
+
+def _pointOrder(point: ClusterPoint) -> tuple:
+    return (point.day, point.id)
+
+
+class LocalClusterEngine:
+    """
+    Incremental wrapper around clusterWindow() with a content-addressed cache.
+
+    detect() clusters a full list of events; update() then applies single
+    event edits to the windows from the last detect().
+
+    cacheDir, when set, holds one JSON file per window hash, so windows
+    survive app restarts and are shared between diagrams with identical
+    histories.
+    """
+
+    def __init__(self, maxGapDays: int = 180, minEvents: int = 2, cacheDir=None):
+        self.maxGapDays = maxGapDays
+        self.minEvents = minEvents
+        self._cacheDir = Path(cacheDir) if cacheDir else None
+        self._windowCache: dict[str, list[dict]] = {}
+        self._points: dict[int, ClusterPoint] = {}
+        self._windows: list[_Window] = []  # sorted by start day
+        self.nClustered = 0  # windows clustered instead of served from cache
+
+    def setCacheDir(self, path):
+        self._cacheDir = Path(path) if path else None
+
+    def _windowPath(self, digest: str) -> Path | None:
+        if not self._cacheDir:
+            return None
+        return self._cacheDir / "clusterwindows" / f"{digest}.json"
+
+    def _cachedWindow(self, digest: str) -> list[dict] | None:
+        clusters = self._windowCache.get(digest)
+        if clusters is not None:
+            return clusters
+        path = self._windowPath(digest)
+        if not path or not path.exists():
+            return None
+        try:
+            with open(path, "r") as f:
+                clusters = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            _log.warning(f"Failed to read cluster window {digest}: {e}")
+            return None
+        self._windowCache[digest] = clusters
+        return clusters
+
+    def _storeWindow(self, digest: str, clusters: list[dict]):
+        self._windowCache[digest] = clusters
+        path = self._windowPath(digest)
+        if not path:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(clusters, f)
+        except OSError as e:
+            _log.warning(f"Failed to write cluster window {digest}: {e}")
+
+    def _window(self, points: list[ClusterPoint]) -> _Window:
+        digest = windowHash(points, self.minEvents, self.maxGapDays)
+        clusters = self._cachedWindow(digest)
+        if clusters is None:
+            clusters = clusterWindow(points, self.minEvents)
+            self._storeWindow(digest, clusters)
+            self.nClustered += 1
+        return _Window(points, digest, clusters)
+
+    def _replaceWindows(self, lo: int, hi: int, points: list[ClusterPoint]):
+        # Only the in-memory cache is pruned; disk entries are cheap to keep.
+        for window in self._windows[lo:hi]:
+            self._windowCache.pop(window.digest, None)
+        self._windows[lo:hi] = [
+            self._window(x) for x in windowsFor(points, self.maxGapDays)
+        ]
+
+    def clusters(self) -> list[dict]:
+        return [c for window in self._windows for c in window.clusters]
+
+    def detect(self, eventsData: list[dict]) -> list[dict]:
+        points = [ClusterPoint.fromDict(x) for x in eventsData]
+        points = sorted((p for p in points if p), key=_pointOrder)
+        self._points = {p.id: p for p in points}
+        self._windows = []
+        self._replaceWindows(0, 0, points)
+        liveDigests = {window.digest for window in self._windows}
+        for digest in list(self._windowCache):
+            if digest not in liveDigests:
+                del self._windowCache[digest]
+        return self.clusters()
+
+    def update(self, eventId: int, eventData: dict | None) -> list[dict]:
+        """
+        Add, change, or with eventData=None remove one event and return the
+        new clusters. Windows are separated by more than maxGapDays, so the
+        event can only split the window it leaves and merge the neighbors of
+        the day it lands on; every other window is left as is.
+        """
+        old = self._points.pop(eventId, None)
+        new = ClusterPoint.fromDict(eventData) if eventData else None
+        if new == old:
+            if old:
+                self._points[eventId] = old
+            return self.clusters()
+        if old:
+            i = bisect.bisect_right(self._windows, old.day, key=lambda w: w.start) - 1
+            points = [p for p in self._windows[i].points if p.id != eventId]
+            self._replaceWindows(i, i + 1, points)
+        if new:
+            self._points[eventId] = new
+            lo = bisect.bisect_left(
+                self._windows, new.day - self.maxGapDays, key=lambda w: w.end
+            )
+            hi = lo
+            while (
+                hi < len(self._windows)
+                and self._windows[hi].start <= new.day + self.maxGapDays
+            ):
+                hi += 1
+            points = [p for window in self._windows[lo:hi] for p in window.points]
+            bisect.insort(points, new, key=_pointOrder)
+            self._replaceWindows(lo, hi, points)
+        return self.clusters()
+
+
+def agreement(clustersA: list[dict], clustersB: list[dict]) -> float:
+    """
+    Pairwise agreement (Rand index) between two clusterings, for comparing
+    local output against recorded server responses. Every pair of events
+    that is in a cluster on either side is counted. An event that only one
+    side clustered counts as unclustered on the other side, so its pairs
+    agree only where that side doesn't group it either.
+    """
+
+    def membership(clusters):
+        ret = {}
+        for c in clusters:
+            for eventId in c.get("eventIds", []):
+                ret[eventId] = c.get("id")
+        return ret
+
+    a = membership(clustersA)
+    b = membership(clustersB)
+    eventIds = sorted(set(a) | set(b))
+    if len(eventIds) < 2:
+        return 1.0
+    agree = total = 0
+    for i, x in enumerate(eventIds):
+        for y in eventIds[i + 1 :]:
+            sameA = a.get(x) is not None and a.get(x) == a.get(y)
+            sameB = b.get(x) is not None and b.get(x) == b.get(y)
+            agree += sameA == sameB
+            total += 1
+    return agree / total
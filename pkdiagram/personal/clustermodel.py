@@ -17,8 +17,9 @@ from pkdiagram.pyqt import (
     pyqtSignal,
     pyqtSlot,
 )
-from pkdiagram.scene import Scene, Event
+from pkdiagram.scene import Scene, Event, Property
 from pkdiagram.app import Session
+from pkdiagram.personal.clustering import LocalClusterEngine
 
 _log = logging.getLogger(__name__)
 
@@ -27,6 +28,20 @@ def _enumValue(val):
     return val.value if hasattr(val, "value") else val
 
 
+# Event properties that are sent for detection.
+CLUSTER_PROPERTIES = {
+    "dateTime",
+    "kind",
+    "symptom",
+    "anxiety",
+    "relationship",
+    "functioning",
+    "description",
+    "notes",
+    "person",
+}
+
+
 class ClusterModel(QObject):
     changed = pyqtSignal()  # Emitted when cluster data changes
     selectionChanged = pyqtSignal()  # Emitted when selected cluster changes
@@ -50,6 +65,9 @@ class ClusterModel(QObject):
         self._detecting = False
         self._cacheDir: Path | None = None
         self._showClusters: bool = True
+        self._localEngine = LocalClusterEngine()
+        self._isLocal = False  # clusters came from the local engine
+        self._localSynced = False  # engine has every scene edit since detect
 
     @property
     def scene(self) -> Scene | None:
@@ -60,17 +78,19 @@ class ClusterModel(QObject):
         if self._scene == value:
             return
         if self._scene:
-            self._scene.eventAdded.disconnect(self._onSceneChanged)
-            self._scene.eventRemoved.disconnect(self._onSceneChanged)
-            self._scene.eventChanged.disconnect(self._onSceneChanged)
+            self._scene.eventAdded.disconnect(self._onEventAdded)
+            self._scene.eventRemoved.disconnect(self._onEventRemoved)
+            self._scene.eventChanged.disconnect(self._onEventChanged)
         self._scene = value
         if self._scene:
-            self._scene.eventAdded.connect(self._onSceneChanged)
-            self._scene.eventRemoved.connect(self._onSceneChanged)
-            self._scene.eventChanged.connect(self._onSceneChanged)
+            self._scene.eventAdded.connect(self._onEventAdded)
+            self._scene.eventRemoved.connect(self._onEventRemoved)
+            self._scene.eventChanged.connect(self._onEventChanged)
         self._clusters = []
         self._eventToCluster = {}
         self._cacheKey = None
+        self._isLocal = False
+        self._localSynced = False
         self.changed.emit()
 
     @property
@@ -87,8 +107,26 @@ class ClusterModel(QObject):
     def deinit(self):
         self.scene = None
 
-    def _onSceneChanged(self, *args):
-        pass
+    def _onEventAdded(self, event: Event):
+        self._updateLocal(event)
+
+    def _onEventRemoved(self, event: Event):
+        self._updateLocal(event, removed=True)
+
+    def _onEventChanged(self, prop: Property):
+        if prop.name() in CLUSTER_PROPERTIES:
+            self._updateLocal(prop.item)
+
+    def _updateLocal(self, event: Event, removed=False):
+        """Local clusters track edits one event at a time."""
+        if not self._isLocal or self._detecting:
+            self._localSynced = False
+            return
+        if not self._localSynced:
+            self.detectLocal()
+            return
+        eventData = None if removed else self._eventDict(event)
+        self._setLocalClusters(self._localEngine.update(event.id, eventData))
 
     def _cacheFilePath(self) -> Path | None:
         if not self._cacheDir or not self._diagramId:
@@ -104,6 +142,8 @@ class ClusterModel(QObject):
                 data = json.load(f)
             self._clusters = data.get("clusters", [])
             self._cacheKey = data.get("cacheKey")
+            self._isLocal = self._areLocal(self._clusters)
+            self._localSynced = False
             if "showClusters" in data:
                 self._showClusters = data["showClusters"]
                 self.showClustersChanged.emit()
@@ -140,31 +180,109 @@ class ClusterModel(QObject):
             for eventId in c.get("eventIds", []):
                 self._eventToCluster[eventId] = c.get("id")
 
+    @staticmethod
+    def _areLocal(clusters: list[dict]) -> bool:
+        return bool(clusters) and all(c.get("source") == "local" for c in clusters)
+
     def _sortClustersByDate(self):
         self._clusters.sort(key=lambda c: c.get("startDate", ""))
 
     @staticmethod
     def _computeLocalCacheKey(events_data: list[dict]) -> str:
-        return hash_sarf_dicts([
-            {
-                "id": e.get("id"),
-                "dateTime": e.get("dateTime"),
-                "symptom": e.get("symptom"),
-                "anxiety": e.get("anxiety"),
-                "relationship": e.get("relationship"),
-                "functioning": e.get("functioning"),
-            }
-            for e in events_data
-        ])
+        return hash_sarf_dicts(
+            [
+                {
+                    "id": e.get("id"),
+                    "dateTime": e.get("dateTime"),
+                    "symptom": e.get("symptom"),
+                    "anxiety": e.get("anxiety"),
+                    "relationship": e.get("relationship"),
+                    "functioning": e.get("functioning"),
+                }
+                for e in events_data
+            ]
+        )
 
     def setCacheDir(self, path: Path):
         self._cacheDir = path
+        self._localEngine.setCacheDir(path)
         self._loadCache()
 
+    @staticmethod
+    def _eventDict(event: Event) -> dict | None:
+        if not event.dateTime():
+            return None
+        kind = event.kind()
+        symptom = event.symptom()
+        anxiety = event.anxiety()
+        relationship = event.relationship()
+        functioning = event.functioning()
+        notes = event.notes()
+        person = event.person()
+
+        event_dict = {
+            "id": event.id,
+            "kind": kind.value if kind else "shift",
+            "dateTime": event.dateTime().toString("yyyy-MM-dd"),
+            "description": event.description() or "",
+        }
+        if symptom:
+            event_dict["symptom"] = _enumValue(symptom)
+        if anxiety:
+            event_dict["anxiety"] = _enumValue(anxiety)
+        if relationship:
+            event_dict["relationship"] = _enumValue(relationship)
+        if functioning:
+            event_dict["functioning"] = _enumValue(functioning)
+        if notes:
+            event_dict["notes"] = notes
+        if person:
+            event_dict["person"] = person.id
+        return event_dict
+
+    def _eventsData(self) -> list[dict]:
+        events = self._scene.events(onlyDated=True)
+        return [
+            self._eventDict(event)
+            for event in sorted(events, key=lambda e: e.dateTime().toMSecsSinceEpoch())
+        ]
+
+    def _setLocalClusters(self, clusters: list[dict]):
+        if clusters == self._clusters and self._isLocal:
+            return
+        self._clusters = clusters
+        self._cacheKey = None  # server cache keys only
+        self._isLocal = True
+        self._sortClustersByDate()
+        self._buildEventMapping()
+        self._saveCache()
+        self.changed.emit()
+        self.clustersDetected.emit()
+        _log.info(f"Detected {len(self._clusters)} clusters locally")
+
+    @pyqtSlot()
+    def detectLocal(self):
+        """Detect clusters on-device without a server round trip."""
+        if not self._scene:
+            _log.warning("Cannot detect clusters: missing scene")
+            return
+        clusters = self._localEngine.detect(self._eventsData())
+        self._localSynced = True
+        self._setLocalClusters(clusters)
+
     @pyqtSlot()
     def detect(self):
-        if not self._scene or not self._diagramId or not self._session:
-            _log.warning("Cannot detect clusters: missing scene, diagramId, or session")
+        """
+        Ask the server for clusters, falling back to the local engine when
+        the diagram is not on the server yet or the request fails.
+        """
+        if not self._scene:
+            _log.warning("Cannot detect clusters: missing scene")
+            return
+
+        if not self._diagramId or not self._session:
+            _log.info("No server diagram, detecting clusters locally")
+            self.detectLocal()
             return
 
         if self._detecting:
@@ -179,40 +297,14 @@ class ClusterModel(QObject):
             self.changed.emit()
             return
 
-        events_data = []
-        for event in sorted(events, key=lambda e: e.dateTime().toMSecsSinceEpoch()):
-            kind = event.kind()
-            symptom = event.symptom()
-            anxiety = event.anxiety()
-            relationship = event.relationship()
-            functioning = event.functioning()
-            notes = event.notes()
-            person = event.person()
-
-            event_dict = {
-                "id": event.id,
-                "kind": kind.value if kind else "shift",
-                "dateTime": event.dateTime().toString("yyyy-MM-dd"),
-                "description": event.description() or "",
-            }
-            if symptom:
-                event_dict["symptom"] = _enumValue(symptom)
-            if anxiety:
-                event_dict["anxiety"] = _enumValue(anxiety)
-            if relationship:
-                event_dict["relationship"] = _enumValue(relationship)
-            if functioning:
-                event_dict["functioning"] = _enumValue(functioning)
-            if notes:
-                event_dict["notes"] = notes
-            if person:
-                event_dict["person"] = person.id
-            events_data.append(event_dict)
+        events_data = self._eventsData()
 
         # Skip re-detection if events haven't changed (idempotency)
         local_cache_key = self._computeLocalCacheKey(events_data)
         if local_cache_key == self._cacheKey and self._cacheKey is not None:
-            _log.info(f"Skipping cluster detection: cache key unchanged ({local_cache_key})")
+            _log.info(
+                f"Skipping cluster detection: cache key unchanged ({local_cache_key})"
+            )
             return
 
         self._detecting = True
@@ -225,6 +317,7 @@ class ClusterModel(QObject):
             self.detectingChanged.emit()
             self._clusters = data.get("clusters", [])
             self._cacheKey = data.get("cacheKey")
+            self._isLocal = False
             self._sortClustersByDate()
             self._buildEventMapping()
             self._saveCache()
@@ -236,8 +329,9 @@ class ClusterModel(QObject):
             self._detecting = False
             self.detectingChanged.emit()
             error = reply.errorString() if reply else "Unknown error"
-            _log.error(f"Cluster detection failed: {error}")
+            _log.error(f"Cluster detection failed, detecting locally: {error}")
             self.errorOccurred.emit(error)
+            self.detectLocal()
 
         reply = self._session.server().nonBlockingRequest(
             "POST",
@@ -339,6 +433,8 @@ class ClusterModel(QObject):
             return
         self._clusters = clusters
         self._cacheKey = cacheKey
+        self._isLocal = self._areLocal(clusters)
+        self._localSynced = False
         self._sortClustersByDate()
         self._buildEventMapping()
         self.changed.emit()
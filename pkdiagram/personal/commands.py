@@ -1,8 +1,9 @@
 import enum
 from copy import deepcopy
+from dataclasses import dataclass, field
 
 from pkdiagram.pyqt import QUndoCommand
-from btcopilot.schema import DiagramData
+from btcopilot.schema import DiagramData, PDP
 
 
 class PDPAction(enum.Enum):
@@ -10,15 +11,125 @@ class PDPAction(enum.Enum):
     Reject = "reject"
 
 
+PDP_ATTRS = ("people", "events", "pair_bonds")
+
+
+def pendingPDPIds(diagramData: DiagramData, ids: list[int]) -> list[int]:
+    """The `ids` still in the PDP, i.e. not yet accepted or rejected."""
+    if not diagramData.pdp:
+        return []
+    pdp = diagramData.pdp
+    existing = {x.id for attr in PDP_ATTRS for x in getattr(pdp, attr)}
+    return [x for x in ids if x in existing]
+
+
+@dataclass
+class PDPCommit:
+    """
+    What accepting or rejecting PDP items did to a DiagramData.
+
+    The first apply() commits or rejects for real and records the result.
+    Later calls write that same result instead, so replaying on the server's
+    copy after a conflict doesn't allocate new item ids. revert() undoes it
+    on any copy. Both are idempotent, as DiagramSaveQueue requires.
+    """
+
+    action: PDPAction
+    ids: list[int]
+    applied: bool = False
+    lastItemId: int = 0
+    removed: dict = field(default_factory=lambda: {x: [] for x in PDP_ATTRS})
+    added: dict = field(default_factory=lambda: {x: [] for x in PDP_ATTRS})
+
+    def apply(self, diagramData: DiagramData, lastItemId: int = 0) -> DiagramData:
+        if self.applied:
+            return self._replay(diagramData)
+        ids = pendingPDPIds(diagramData, self.ids)
+        if not ids:
+            return diagramData
+        pdp = diagramData.pdp
+        pdpBefore = {attr: list(getattr(pdp, attr)) for attr in PDP_ATTRS}
+        idsBefore = {
+            attr: {x["id"] for x in getattr(diagramData, attr)} for attr in PDP_ATTRS
+        }
+        if self.action == PDPAction.Accept:
+            # Scene's lastItemId includes internal layers; server's may not
+            diagramData.lastItemId = max(diagramData.lastItemId, lastItemId)
+            diagramData.commit_pdp_items(ids)
+        else:
+            for id in ids:
+                diagramData.reject_pdp_item(id)
+        pdp = diagramData.pdp
+        for attr in PDP_ATTRS:
+            remaining = {x.id for x in getattr(pdp, attr)} if pdp else set()
+            self.removed[attr] = [
+                (i, deepcopy(x))
+                for i, x in enumerate(pdpBefore[attr])
+                if x.id not in remaining
+            ]
+            self.added[attr] = [
+                deepcopy(x)
+                for x in getattr(diagramData, attr)
+                if x["id"] not in idsBefore[attr]
+            ]
+        self.lastItemId = diagramData.lastItemId
+        self.applied = True
+        return diagramData
+
+    def _replay(self, diagramData: DiagramData) -> DiagramData:
+        pdp = diagramData.pdp
+        for attr in PDP_ATTRS:
+            if pdp:
+                removedIds = {x.id for i, x in self.removed[attr]}
+                setattr(
+                    pdp,
+                    attr,
+                    [x for x in getattr(pdp, attr) if x.id not in removedIds],
+                )
+            chunks = getattr(diagramData, attr)
+            existing = {x["id"] for x in chunks}
+            chunks.extend(
+                deepcopy(x) for x in self.added[attr] if x["id"] not in existing
+            )
+        diagramData.lastItemId = max(diagramData.lastItemId, self.lastItemId)
+        return diagramData
+
+    def revert(self, diagramData: DiagramData) -> DiagramData:
+        if not self.applied:
+            return diagramData
+        if diagramData.pdp is None:
+            diagramData.pdp = PDP()
+        pdp = diagramData.pdp
+        for attr in PDP_ATTRS:
+            addedIds = {x["id"] for x in self.added[attr]}
+            setattr(
+                diagramData,
+                attr,
+                [x for x in getattr(diagramData, attr) if x["id"] not in addedIds],
+            )
+            items = getattr(pdp, attr)
+            existing = {x.id for x in items}
+            for i, item in self.removed[attr]:
+                if item.id not in existing:
+                    items.insert(i, deepcopy(item))
+        return diagramData
+
+
 class HandlePDPItem(QUndoCommand):
     def __init__(
-        self, action: PDPAction, personal, item_id: int, prev_diagramData: DiagramData
+        self,
+        action: PDPAction,
+        personal,
+        item_id: int,
+        prev_diagramData: DiagramData,
+        commit: PDPCommit = None,
     ):
         super().__init__()
         self.action = action
         self.personal = personal
         self.item_id = item_id
         self.prev_diagramData = deepcopy(prev_diagramData)
+        self.commit = commit
         self.setText(f"Accept PDP Item {item_id}")
         self._initial_run = True
 
@@ -26,11 +137,16 @@ class HandlePDPItem(QUndoCommand):
         if self._initial_run:
             self._initial_run = False
             return
+        self.commit = PDPCommit(self.action, [self.item_id])
         if self.action == PDPAction.Accept:
-            self.personal._doAcceptPDPItem(self.item_id)
+            self.personal._doAcceptPDPItem(self.item_id, self.commit)
         else:
-            self.personal._doRejectPDPItem(self.item_id)
+            self.personal._doRejectPDPItem(self.item_id, self.commit)
 
     def undo(self):
         self.personal._diagram.setDiagramData(self.prev_diagramData)
+        if self.commit and self.commit.applied:
+            # Also revert the server's copy, even if the change is still
+            # queued or gets replayed after a conflict.
+            self.personal._revertPDPCommit(self.commit)
         self.personal.pdpChanged.emit()
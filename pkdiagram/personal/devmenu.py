@@ -1,4 +1,10 @@
-from pkdiagram.pyqt import QMenuBar, QMenu, QAction, QKeySequence
+import logging
+
+from pkdiagram.pyqt import QMenuBar, QMenu, QAction, QKeySequence, QApplication
+from pkdiagram.scene import updateprofiler
+
+
+_log = logging.getLogger(__name__)
 
 
 class PersonalDevMenu:
@@ -14,3 +20,27 @@ class PersonalDevMenu:
         shakeAction.setShortcut(QKeySequence("Ctrl+Z"))
         shakeAction.triggered.connect(self.controller.undo)
         deviceMenu.addAction(shakeAction)
+
+        debugMenu = self.menuBar.addMenu("Debug")
+
+        profileAction = QAction("Profile Scene Updates", self.menuBar)
+        profileAction.setCheckable(True)
+        profileAction.toggled[bool].connect(self._onProfileSceneUpdates)
+        debugMenu.addAction(profileAction)
+
+        dumpAction = QAction("Dump Scene Update Profile", self.menuBar)
+        dumpAction.triggered.connect(self._onDumpSceneUpdateProfile)
+        debugMenu.addAction(dumpAction)
+
+    def _onProfileSceneUpdates(self, on):
+        if on:
+            updateprofiler.reset()
+            scene = self.controller.scene
+            updateprofiler.enable([scene] if scene else [])
+        else:
+            updateprofiler.disable()
+
+    def _onDumpSceneUpdateProfile(self):
+        text = updateprofiler.dump()
+        _log.info(f"Scene update profile:\n{text}")
+        QApplication.clipboard().setText(text)
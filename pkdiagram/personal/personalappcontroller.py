@@ -18,7 +18,12 @@ from btcopilot.schema import (
 )
 from PyQt5.QtTextToSpeech import QTextToSpeech, QVoice
 from PyQt5.QtMultimedia import QAudioRecorder, QAudioEncoderSettings
-from pkdiagram.personal.commands import HandlePDPItem, PDPAction
+from pkdiagram.personal.commands import (
+    HandlePDPItem,
+    PDPAction,
+    PDPCommit,
+    pendingPDPIds,
+)
 from pkdiagram.personal.settings import Settings
 from _pkdiagram import CUtil
 from pkdiagram import pepper, util
@@ -44,6 +49,7 @@ from PyQt5.QtCore import QLocale, QByteArray
 from pkdiagram.app import Session, Analytics
 from pkdiagram.personal.models import Discussion
 from pkdiagram.server_types import Diagram
+from pkdiagram.savequeue import DiagramSaveQueue
 from pkdiagram.scene import Scene, Person, Event, Marriage, Emotion
 from pkdiagram.models import SceneModel, PeopleModel
 from pkdiagram.views import EventForm
@@ -110,14 +116,14 @@ class PersonalAppController(QObject):
         self.peopleModel = PeopleModel(self)
         self.sarfGraphModel = SARFGraphModel(self)
         self.clusterModel = ClusterModel(self.session, self)
-        self.pdpChanged.connect(self.sarfGraphModel.refresh)
         self.diagramChanged.connect(self._onDiagramChanged)
         self.clusterModel.clustersDetected.connect(self._onClustersDetected)
         self.eventForm = None  # EventForm (from PersonalContainer drawer)
         self.shakeDetector = ShakeDetector(self)
         self.shakeDetector.shakeDetected.connect(self.undo)
-        self._saving = False
-        self._saveQueue = []
+        self.diagramSaveQueue = DiagramSaveQueue(
+            lambda: self.session.server(), parent=self
+        )
         self._settings = Settings(self.app.prefs(), self)
         self._tts = QTextToSpeech(self)
         self._ttsPlayingIndex = -1
@@ -205,7 +211,6 @@ class PersonalAppController(QObject):
 
     def deinit(self):
         self.shakeDetector.stop()
-        self.pdpChanged.disconnect(self.sarfGraphModel.refresh)
         self.diagramChanged.disconnect(self._onDiagramChanged)
         self.clusterModel.clustersDetected.disconnect(self._onClustersDetected)
         self.sarfGraphModel.deinit()
@@ -255,47 +260,53 @@ class PersonalAppController(QObject):
             self.scene.undo()
             self.saveDiagram()
 
-    def _withSaveGuard(self, fn):
-        if self._saving:
-            self._saveQueue.append(fn)
-            return None
-        self._saving = True
-        try:
-            return fn()
-        finally:
-            self._saving = False
-            if self._saveQueue:
-                self._withSaveGuard(self._saveQueue.pop(0))
+    def _queueSave(self, applyChange, failureMessage: str, key=None):
+        """
+        Apply `applyChange` to the local diagram now and queue it for the
+        server. It must be idempotent, see DiagramSaveQueue.
+        """
+        diagram = self._diagram
+
+        def finished(success):
+            if not success and diagram is self._diagram:
+                _log.warning(failureMessage)
+                self.serverError.emit(failureMessage)
+
+        self.diagramSaveQueue.save(
+            diagram, applyChange, finished=finished, key=key, applyLocally=True
+        )
 
     def saveDiagram(self):
+        """Queue a save of the scene; repeated calls coalesce into one PUT."""
         if not self._diagram or not self.scene:
             return
 
-        def _do():
-            def applyChange(diagramData: DiagramData):
-                sceneDiagramData = self.scene.diagramData()
-                diagramData.people = sceneDiagramData.people
-                diagramData.events = sceneDiagramData.events
-                diagramData.pair_bonds = sceneDiagramData.pair_bonds
-                diagramData.emotions = sceneDiagramData.emotions
-                diagramData.multipleBirths = sceneDiagramData.multipleBirths
-                diagramData.layers = sceneDiagramData.layers
-                diagramData.layerItems = sceneDiagramData.layerItems
-                diagramData.items = sceneDiagramData.items
-                diagramData.pruned = sceneDiagramData.pruned
-                diagramData.version = sceneDiagramData.version
-                diagramData.versionCompat = sceneDiagramData.versionCompat
-                diagramData.name = sceneDiagramData.name
-                diagramData.lastItemId = max(diagramData.lastItemId, sceneDiagramData.lastItemId)
-                diagramData.clusters = self.clusterModel.clusters
-                diagramData.clusterCacheKey = self.clusterModel.cacheKey
-                return diagramData
-
-            self._diagram.save(
-                self.session.server(), applyChange, lambda d: True, useJson=True
+        def applyChange(diagramData: DiagramData):
+            sceneDiagramData = self.scene.diagramData()
+            diagramData.people = sceneDiagramData.people
+            diagramData.events = sceneDiagramData.events
+            diagramData.pair_bonds = sceneDiagramData.pair_bonds
+            diagramData.emotions = sceneDiagramData.emotions
+            diagramData.multipleBirths = sceneDiagramData.multipleBirths
+            diagramData.layers = sceneDiagramData.layers
+            diagramData.layerItems = sceneDiagramData.layerItems
+            diagramData.items = sceneDiagramData.items
+            diagramData.pruned = sceneDiagramData.pruned
+            diagramData.version = sceneDiagramData.version
+            diagramData.versionCompat = sceneDiagramData.versionCompat
+            diagramData.name = sceneDiagramData.name
+            diagramData.lastItemId = max(
+                diagramData.lastItemId, sceneDiagramData.lastItemId
             )
+            diagramData.clusters = self.clusterModel.clusters
+            diagramData.clusterCacheKey = self.clusterModel.cacheKey
+            return diagramData
+
+        self.diagramSaveQueue.save(self._diagram, applyChange, key="scene")
 
-        self._withSaveGuard(_do)
+    @pyqtProperty(QObject, constant=True)
+    def saveQueue(self):
+        return self.diagramSaveQueue
 
     def setScene(self, scene: Scene):
         self.scene = scene
@@ -962,17 +973,15 @@ class PersonalAppController(QObject):
             _log.error(f"acceptPDPItem called with non-PDP id {id}, ignoring")
             return False
 
-        def _do():
-            prev_data = self._diagram.getDiagramData() if undo else None
-            success = self._doAcceptPDPItem(id)
-            if success:
-                self.clusterModel.detect()
-                if undo:
-                    cmd = HandlePDPItem(PDPAction.Accept, self, id, prev_data)
-                    self._undoStack.push(cmd)
-            return success
-
-        return self._withSaveGuard(_do)
+        prev_data = self._diagram.getDiagramData() if undo else None
+        commit = PDPCommit(PDPAction.Accept, [id])
+        success = self._doAcceptPDPItem(id, commit)
+        if success:
+            self.clusterModel.detect()
+            if undo:
+                cmd = HandlePDPItem(PDPAction.Accept, self, id, prev_data, commit)
+                self._undoStack.push(cmd)
+        return success
 
     @pyqtSlot(int, result=bool)
     def rejectPDPItem(self, id: int, undo=True):
@@ -980,61 +989,35 @@ class PersonalAppController(QObject):
             _log.error(f"rejectPDPItem called with non-PDP id {id}, ignoring")
             return False
 
-        def _do():
-            prev_data = self._diagram.getDiagramData() if undo else None
-            success = self._doRejectPDPItem(id)
-            if success and undo:
-                cmd = HandlePDPItem(PDPAction.Reject, self, id, prev_data)
-                self._undoStack.push(cmd)
-            return success
-
-        return self._withSaveGuard(_do)
-
-    def _doAcceptPDPItem(self, id: int) -> bool:
-        _log.info(f"Accepting PDP item with id: {id}")
-
-        committedItems = {"people": [], "events": [], "pair_bonds": [], "emotions": []}
-
-        def applyChange(diagramData: DiagramData):
-            _log.info(f"Applying accept PDP item change for id: {id}")
-            # Scene's lastItemId includes internal layers; server's may not
-            diagramData.lastItemId = max(
-                diagramData.lastItemId, self.scene.lastItemId()
-            )
-            # Capture IDs before commit to identify what was added
-            prevPeopleIds = {p["id"] for p in diagramData.people}
-            prevEventIds = {e["id"] for e in diagramData.events}
-            prevPairBondIds = {pb["id"] for pb in diagramData.pair_bonds}
-
-            diagramData.commit_pdp_items([id])
-
-            # Find newly committed items
-            committedItems["people"] = [
-                p for p in diagramData.people if p["id"] not in prevPeopleIds
-            ]
-            committedItems["events"] = [
-                e for e in diagramData.events if e["id"] not in prevEventIds
-            ]
-            committedItems["pair_bonds"] = [
-                pb for pb in diagramData.pair_bonds if pb["id"] not in prevPairBondIds
-            ]
+        prev_data = self._diagram.getDiagramData() if undo else None
+        commit = PDPCommit(PDPAction.Reject, [id])
+        success = self._doRejectPDPItem(id, commit)
+        if success and undo:
+            cmd = HandlePDPItem(PDPAction.Reject, self, id, prev_data, commit)
+            self._undoStack.push(cmd)
+        return success
 
-            return diagramData
+    def _queuePDPCommit(self, commit: PDPCommit, failureMessage: str):
+        """Apply `commit` locally now and queue it, see PDPCommit."""
+        lastItemId = self.scene.lastItemId() if self.scene else 0
+        self._queueSave(lambda x: commit.apply(x, lastItemId), failureMessage)
 
-        def stillValidAfterRefresh(diagramData: DiagramData):
-            return True
+    def _revertPDPCommit(self, commit: PDPCommit):
+        ids = ", ".join(str(x) for x in commit.ids)
+        self._queueSave(commit.revert, f"Failed to undo PDP item(s) {ids}")
 
-        success = self._diagram.save(
-            self.session.server(), applyChange, stillValidAfterRefresh, useJson=True
-        )
+    def _doAcceptPDPItem(self, id: int, commit: PDPCommit = None) -> bool:
+        _log.info(f"Accepting PDP item with id: {id}")
 
-        if success:
-            self._addCommittedItemsToScene(committedItems)
-            self.pdpChanged.emit()
-        else:
-            _log.warning(f"Failed to accept PDP item after retries")
+        if not pendingPDPIds(self._diagram.getDiagramData(), [id]):
+            _log.warning(f"PDP item {id} not found")
+            return False
 
-        return success
+        commit = commit or PDPCommit(PDPAction.Accept, [id])
+        self._queuePDPCommit(commit, f"Failed to accept PDP item {id}")
+        self._addCommittedItemsToScene(commit.added)
+        self.pdpChanged.emit()
+        return True
 
     def _addCommittedItemsToScene(self, committedItems: dict):
         if (
@@ -1091,29 +1074,17 @@ class PersonalAppController(QObject):
             self.scene.isInitializing = False
             self.scene.setBatchAddingRemovingItems(False)
 
-    def _doRejectPDPItem(self, id: int) -> bool:
+    def _doRejectPDPItem(self, id: int, commit: PDPCommit = None) -> bool:
         _log.info(f"Rejecting PDP item with id: {id}")
 
-        def applyChange(diagramData: DiagramData):
-            if not diagramData.pdp:
-                _log.warning("No PDP data available")
-                return diagramData
-            diagramData.reject_pdp_item(id)
-            return diagramData
-
-        def stillValidAfterRefresh(diagramData: DiagramData):
-            return True
-
-        success = self._diagram.save(
-            self.session.server(), applyChange, stillValidAfterRefresh, useJson=True
-        )
-
-        if success:
-            self.pdpChanged.emit()
-        else:
-            _log.warning(f"Failed to reject PDP item after retries")
+        if not pendingPDPIds(self._diagram.getDiagramData(), [id]):
+            _log.warning(f"PDP item {id} not found")
+            return False
 
-        return success
+        commit = commit or PDPCommit(PDPAction.Reject, [id])
+        self._queuePDPCommit(commit, f"Failed to reject PDP item {id}")
+        self.pdpChanged.emit()
+        return True
 
     @pyqtProperty("QVariantMap", notify=pdpChanged)
     def pdp(self):
@@ -1236,108 +1207,59 @@ class PersonalAppController(QObject):
         if not self._diagram:
             return
 
-        def _do():
-            diagramData = self._diagram.getDiagramData()
-            if not diagramData.pdp:
-                return
-
-            allIds = []
-            for person in diagramData.pdp.people:
-                if person.id is not None and person.id < 0:
-                    allIds.append(person.id)
-            for event in diagramData.pdp.events:
-                if event.id < 0:
-                    allIds.append(event.id)
-            for pair_bond in diagramData.pdp.pair_bonds:
-                if pair_bond.id is not None and pair_bond.id < 0:
-                    allIds.append(pair_bond.id)
-
-            if not allIds:
-                return
-
-            _log.info(f"Accepting all PDP items: {allIds}")
-
-            committedItems = {
-                "people": [],
-                "events": [],
-                "pair_bonds": [],
-                "emotions": [],
-            }
-
-            def applyChange(diagramData: DiagramData):
-                # Scene's lastItemId includes internal layers; server's may not
-                diagramData.lastItemId = max(
-                    diagramData.lastItemId, self.scene.lastItemId()
-                )
-                prevPeopleIds = {p["id"] for p in diagramData.people}
-                prevEventIds = {e["id"] for e in diagramData.events}
-                prevPairBondIds = {pb["id"] for pb in diagramData.pair_bonds}
-
-                diagramData.commit_pdp_items(allIds)
-
-                committedItems["people"] = [
-                    p for p in diagramData.people if p["id"] not in prevPeopleIds
-                ]
-                committedItems["events"] = [
-                    e for e in diagramData.events if e["id"] not in prevEventIds
-                ]
-                committedItems["pair_bonds"] = [
-                    pb
-                    for pb in diagramData.pair_bonds
-                    if pb["id"] not in prevPairBondIds
-                ]
-
-                return diagramData
+        diagramData = self._diagram.getDiagramData()
+        if not diagramData.pdp:
+            return
 
-            success = self._diagram.save(
-                self.session.server(), applyChange, lambda d: True, useJson=True
-            )
+        allIds = []
+        for person in diagramData.pdp.people:
+            if person.id is not None and person.id < 0:
+                allIds.append(person.id)
+        for event in diagramData.pdp.events:
+            if event.id < 0:
+                allIds.append(event.id)
+        for pair_bond in diagramData.pdp.pair_bonds:
+            if pair_bond.id is not None and pair_bond.id < 0:
+                allIds.append(pair_bond.id)
+
+        if not allIds:
+            return
 
-            if success:
-                self._addCommittedItemsToScene(committedItems)
-                self.pdpChanged.emit()
-                self.clusterModel.detect()
-            else:
-                _log.warning("Failed to accept all PDP items after retries")
+        _log.info(f"Accepting all PDP items: {allIds}")
 
-        self._withSaveGuard(_do)
+        commit = PDPCommit(PDPAction.Accept, allIds)
+        self._queuePDPCommit(commit, "Failed to accept all PDP items")
+        self._addCommittedItemsToScene(commit.added)
+        self.pdpChanged.emit()
+        self.clusterModel.detect()
 
     @pyqtSlot(int, str, "QVariant")
     def updatePDPItem(self, id: int, field: str, value):
         if not self._diagram:
             return
 
-        def _do():
-            _log.info(f"Updating PDP item {id}: {field} = {value}")
-
-            def applyChange(diagramData: DiagramData):
-                if not diagramData.pdp:
-                    return diagramData
-
-                for event in diagramData.pdp.events:
-                    if event.id == id:
-                        if hasattr(event, field):
-                            setattr(event, field, value)
-                        break
-
-                for person in diagramData.pdp.people:
-                    if person.id == id:
-                        if hasattr(person, field):
-                            setattr(person, field, value)
-                        break
+        _log.info(f"Updating PDP item {id}: {field} = {value}")
 
+        def applyChange(diagramData: DiagramData):
+            if not diagramData.pdp:
                 return diagramData
 
-            success = self._diagram.save(
-                self.session.server(), applyChange, lambda d: True, useJson=True
-            )
+            for event in diagramData.pdp.events:
+                if event.id == id:
+                    if hasattr(event, field):
+                        setattr(event, field, value)
+                    break
 
-            if success:
-                self.pdpChanged.emit()
-            else:
-                _log.warning(f"Failed to update PDP item {id} after retries")
+            for person in diagramData.pdp.people:
+                if person.id == id:
+                    if hasattr(person, field):
+                        setattr(person, field, value)
+                    break
 
-        self._withSaveGuard(_do)
+            return diagramData
+
+        self._queueSave(applyChange, f"Failed to update PDP item {id}", key=(id, field))
+        self.pdpChanged.emit()
 
     ## Clear Diagram Data
 
@@ -1346,47 +1268,37 @@ class PersonalAppController(QObject):
         if not self._diagram or not self.scene:
             return
 
-        def _do():
-            _log.info(f"Clearing diagram data (clearPeople={clearPeople})")
+        _log.info(f"Clearing diagram data (clearPeople={clearPeople})")
 
-            self.scene.setBatchAddingRemovingItems(True)
-            try:
-                for event in list(self.scene.events()):
-                    self.scene.removeItem(event)
-
-                if clearPeople:
-                    for emotion in list(self.scene.emotions()):
-                        self.scene.removeItem(emotion)
-                    for marriage in list(self.scene.marriages()):
-                        self.scene.removeItem(marriage)
-                    for person in list(self.scene.people()):
-                        if person.id not in (1, 2):
-                            self.scene.removeItem(person)
-            finally:
-                self.scene.setBatchAddingRemovingItems(False)
-
-            def applyChange(diagramData: DiagramData):
-                diagramData.events = []
-                diagramData.pdp = None
-                if clearPeople:
-                    diagramData.people = [
-                        p for p in diagramData.people if p.get("id") in (1, 2)
-                    ]
-                    diagramData.pair_bonds = []
-                    diagramData.emotions = []
-                return diagramData
-
-            success = self._diagram.save(
-                self.session.server(), applyChange, lambda d: True, useJson=True
-            )
+        self.scene.setBatchAddingRemovingItems(True)
+        try:
+            for event in list(self.scene.events()):
+                self.scene.removeItem(event)
+
+            if clearPeople:
+                for emotion in list(self.scene.emotions()):
+                    self.scene.removeItem(emotion)
+                for marriage in list(self.scene.marriages()):
+                    self.scene.removeItem(marriage)
+                for person in list(self.scene.people()):
+                    if person.id not in (1, 2):
+                        self.scene.removeItem(person)
+        finally:
+            self.scene.setBatchAddingRemovingItems(False)
 
-            if success:
-                self.pdpChanged.emit()
-                _log.info("Diagram data cleared successfully")
-            else:
-                _log.warning("Failed to clear diagram data")
+        def applyChange(diagramData: DiagramData):
+            diagramData.events = []
+            diagramData.pdp = PDP()
+            if clearPeople:
+                diagramData.people = [
+                    p for p in diagramData.people if p.get("id") in (1, 2)
+                ]
+                diagramData.pair_bonds = []
+                diagramData.emotions = []
+            return diagramData
 
-        self._withSaveGuard(_do)
+        self._queueSave(applyChange, "Failed to clear diagram data")
+        self.pdpChanged.emit()
 
     ## Journal Import
 
@@ -1,4 +1,8 @@
+import bisect
 import logging
+from array import array
+from itertools import accumulate
+
 from btcopilot.schema import EventKind, RelationshipKind, VariableShift
 from pkdiagram.pyqt import (
     QObject,
@@ -6,19 +10,240 @@ from pkdiagram.pyqt import (
     pyqtSignal,
     pyqtSlot,
 )
-from pkdiagram.scene import Scene, Event
+from pkdiagram.scene import Scene, Event, Property
 
 _log = logging.getLogger(__name__)
 
 
+# Event properties that show up in the graph. Changes to any other property
+# (itemPos, color, tags, ...) don't touch the table or emit `changed`.
+GRAPH_PROPERTIES = {
+    "dateTime",
+    "kind",
+    "symptom",
+    "anxiety",
+    "functioning",
+    "relationship",
+    "relationshipTargets",
+    "relationshipTriangles",
+    "description",
+    "notes",
+    "person",
+}
+
+SHIFT_DELTAS = {"up": 1, "down": -1}
+
+
+def _shiftValue(shift: VariableShift | None) -> str | None:
+    if shift is None:
+        return None
+    if isinstance(shift, str):
+        return shift
+    return shift.value
+
+
+def _relationshipValue(rel: RelationshipKind | None) -> str | None:
+    if rel is None:
+        return None
+    if isinstance(rel, str):
+        return rel
+    return rel.value
+
+
+class SARFEventTable:
+    """
+    Columnar, date-sorted storage for the dated events in a scene.
+
+    Numeric columns are typed arrays so the cumulative SARF sums can be
+    re-accumulated from the first changed row instead of rebuilt from scratch,
+    and a single event edit only touches its own row.
+
+    Rows are found by bisecting the sorted columns: by event id through the
+    row's date, or by year for the rows in a range of years.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.ids = array("q")
+        self.msecs = array("q")
+        self.years = array("i")
+        self.yearFracs = array("d")
+        self.deltas = {
+            "symptom": array("b"),
+            "anxiety": array("b"),
+            "functioning": array("b"),
+        }
+        self.sums = {
+            "symptom": array("i"),
+            "anxiety": array("i"),
+            "functioning": array("i"),
+        }
+        self.rows: list[dict] = []
+        self._msecsById: dict[int, int] = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def indexOf(self, eventId: int) -> int:
+        msecs = self._msecsById.get(eventId)
+        if msecs is None:
+            return -1
+        # Only events at the exact same time share a date.
+        i = bisect.bisect_left(self.msecs, msecs)
+        while self.ids[i] != eventId:
+            i += 1
+        return i
+
+    def yearRows(self, firstYear: int, lastYear: int | None = None) -> range:
+        """The rows dated from `firstYear` through `lastYear`, inclusive."""
+        if lastYear is None:
+            lastYear = firstYear
+        return range(
+            bisect.bisect_left(self.years, firstYear),
+            bisect.bisect_right(self.years, lastYear),
+        )
+
+    @staticmethod
+    def rowFor(event: Event) -> dict:
+        dt = event.dateTime()
+        date = dt.date()
+        year = date.year()
+        kind = event.kind()
+        if isinstance(kind, str):
+            kind = EventKind(kind)
+        person = event.person()
+        targets = event.relationshipTargets()
+        triangles = event.relationshipTriangles()
+        # Calculate fractional year for precise positioning (e.g., June 15 = ~0.45)
+        daysInYear = 366 if year % 4 == 0 else 365
+        return {
+            "id": event.id,
+            "year": year,
+            "yearFrac": year + (date.dayOfYear() / daysInYear),
+            "date": dt.toString("MMM d, yyyy"),
+            "kind": kind.value,
+            "symptom": _shiftValue(event.symptom()),
+            "anxiety": _shiftValue(event.anxiety()),
+            "functioning": _shiftValue(event.functioning()),
+            "relationship": _relationshipValue(event.relationship()),
+            "relationshipTargets": [p.name() for p in targets] if targets else [],
+            "relationshipTriangles": (
+                [p.name() for p in triangles] if triangles else []
+            ),
+            "description": event.description() or "",
+            "who": person.name() if person else "",
+            "notes": event.notes() or "",
+        }
+
+    def rebuild(self, events: list[Event]):
+        self.clear()
+        keyed = sorted(
+            ((e.dateTime().toMSecsSinceEpoch(), e) for e in events),
+            key=lambda x: x[0],
+        )
+        for msecs, event in keyed:
+            self._append(msecs, self.rowFor(event))
+        self._accumulate(0)
+
+    def insert(self, event: Event) -> int:
+        msecs = event.dateTime().toMSecsSinceEpoch()
+        i = bisect.bisect_right(self.msecs, msecs)
+        self._insertAt(i, msecs, self.rowFor(event))
+        self._accumulate(i)
+        return i
+
+    def remove(self, eventId: int) -> int:
+        i = self.indexOf(eventId)
+        if i == -1:
+            return i
+        for column in self._columns():
+            del column[i]
+        del self.rows[i]
+        del self._msecsById[eventId]
+        self._accumulate(i)
+        return i
+
+    def update(self, event: Event) -> int:
+        """Re-read one event. Rows only move when the date changes."""
+        i = self.indexOf(event.id)
+        if i == -1:
+            return i
+        msecs = event.dateTime().toMSecsSinceEpoch()
+        if msecs != self.msecs[i]:
+            self.remove(event.id)
+            return self.insert(event)
+        row = self.rowFor(event)
+        self.rows[i] = row
+        changed = False
+        for attr, column in self.deltas.items():
+            delta = SHIFT_DELTAS.get(row[attr], 0)
+            if column[i] != delta:
+                column[i] = delta
+                changed = True
+        if changed:
+            self._accumulate(i)
+        return i
+
+    def cumulativeRow(self, i: int) -> dict:
+        return {
+            "year": self.years[i],
+            "yearFrac": self.yearFracs[i],
+            "symptom": self.sums["symptom"][i],
+            "anxiety": self.sums["anxiety"][i],
+            "functioning": self.sums["functioning"][i],
+            "relationship": self.rows[i]["relationship"],
+        }
+
+    def yearRange(self) -> tuple[int, int] | None:
+        if not self.years:
+            return None
+        # Sorted by date, so also by year.
+        return self.years[0], self.years[-1]
+
+    def _columns(self):
+        return (
+            self.ids,
+            self.msecs,
+            self.years,
+            self.yearFracs,
+            *self.deltas.values(),
+            *self.sums.values(),
+        )
+
+    def _append(self, msecs: int, row: dict):
+        self._insertAt(len(self.ids), msecs, row)
+
+    def _insertAt(self, i: int, msecs: int, row: dict):
+        self.ids.insert(i, row["id"])
+        self.msecs.insert(i, msecs)
+        self.years.insert(i, row["year"])
+        self.yearFracs.insert(i, row["yearFrac"])
+        for attr, column in self.deltas.items():
+            column.insert(i, SHIFT_DELTAS.get(row[attr], 0))
+        for column in self.sums.values():
+            column.insert(i, 0)  # filled in by _accumulate()
+        self.rows.insert(i, row)
+        self._msecsById[row["id"]] = msecs
+
+    def _accumulate(self, start: int):
+        """Recompute the running sums from row `start` to the end."""
+        for attr, deltas in self.deltas.items():
+            sums = self.sums[attr]
+            initial = sums[start - 1] if start > 0 else 0
+            sums[start:] = array("i", accumulate(deltas[start:], initial=initial))[1:]
+
+
 class SARFGraphModel(QObject):
     changed = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._scene: Scene | None = None
-        self._events: list[dict] = []
-        self._cumulative: list[dict] = []
+        self._table = SARFEventTable()
+        self._events: list[dict] | None = None
+        self._cumulative: list[dict] | None = None
         self._yearRange: tuple[int, int] = (1920, 1980)
 
     @property
@@ -30,153 +255,103 @@ class SARFGraphModel(QObject):
         if self._scene == value:
             return
         if self._scene:
-            self._scene.eventAdded.disconnect(self._onSceneChanged)
-            self._scene.eventRemoved.disconnect(self._onSceneChanged)
-            self._scene.eventChanged.disconnect(self._onSceneChanged)
+            self._scene.eventAdded.disconnect(self._onEventAdded)
+            self._scene.eventRemoved.disconnect(self._onEventRemoved)
+            self._scene.eventChanged.disconnect(self._onEventChanged)
+            self._scene.finishedBatchAddingRemovingItems.disconnect(self.refresh)
         self._scene = value
         if self._scene:
-            self._scene.eventAdded.connect(self._onSceneChanged)
-            self._scene.eventRemoved.connect(self._onSceneChanged)
-            self._scene.eventChanged.connect(self._onSceneChanged)
+            self._scene.eventAdded.connect(self._onEventAdded)
+            self._scene.eventRemoved.connect(self._onEventRemoved)
+            self._scene.eventChanged.connect(self._onEventChanged)
+            # eventAdded/eventRemoved are not emitted while batch adding.
+            self._scene.finishedBatchAddingRemovingItems.connect(self.refresh)
         self.refresh()
 
-    def _onSceneChanged(self, *args):
-        self.refresh()
+    def _onEventAdded(self, event: Event):
+        if not event.dateTime():
+            return
+        self._table.insert(event)
+        self._onTableChanged()
+
+    def _onEventRemoved(self, event: Event):
+        if self._table.remove(event.id) != -1:
+            self._onTableChanged()
+
+    def _onEventChanged(self, prop: Property):
+        if prop.name() not in GRAPH_PROPERTIES:
+            return
+        event = prop.item
+        isListed = self._table.indexOf(event.id) != -1
+        if not event.dateTime():
+            if not isListed:
+                return
+            self._table.remove(event.id)
+        elif isListed:
+            self._table.update(event)
+        else:
+            self._table.insert(event)
+        self._onTableChanged()
 
     def deinit(self):
         self.scene = None
 
     def refresh(self):
-        self._buildEventData()
-        self._calculateCumulative()
+        if self._scene:
+            self._table.rebuild(self._scene.events(onlyDated=True))
+        else:
+            self._table.clear()
+        self._onTableChanged()
+
+    def _onTableChanged(self):
+        self._events = None
+        self._cumulative = None
         self._calculateYearRange()
         self.changed.emit()
 
-    def _buildEventData(self):
-        self._events = []
-        if not self._scene:
-            return
-
-        events = self._scene.events(onlyDated=True)
-        events = sorted(events, key=lambda e: e.dateTime().toMSecsSinceEpoch())
-
-        for event in events:
-            dt = event.dateTime()
-            year = dt.date().year()
-            dateStr = dt.toString("MMM d, yyyy")
-
-            kind = event.kind()
-            if isinstance(kind, str):
-                kind = EventKind(kind)
-
-            symptom = self._shiftValue(event.symptom())
-            anxiety = self._shiftValue(event.anxiety())
-            functioning = self._shiftValue(event.functioning())
-            relationship = self._relationshipValue(event.relationship())
-
-            person = event.person()
-            who = person.name() if person else ""
-
-            # Calculate fractional year for precise positioning (e.g., June 15 = ~0.45)
-            dayOfYear = dt.date().dayOfYear()
-            daysInYear = 366 if dt.date().year() % 4 == 0 else 365
-            yearFrac = year + (dayOfYear / daysInYear)
-
-            # Relationship targets and triangles as person names
-            targets = event.relationshipTargets()
-            triangles = event.relationshipTriangles()
-
-            self._events.append(
-                {
-                    "id": event.id,
-                    "year": year,
-                    "yearFrac": yearFrac,
-                    "date": dateStr,
-                    "kind": kind.value,
-                    "symptom": symptom,
-                    "anxiety": anxiety,
-                    "functioning": functioning,
-                    "relationship": relationship,
-                    "relationshipTargets": (
-                        [p.name() for p in targets] if targets else []
-                    ),
-                    "relationshipTriangles": (
-                        [p.name() for p in triangles] if triangles else []
-                    ),
-                    "description": event.description() or "",
-                    "who": who,
-                    "notes": event.notes() or "",
-                }
-            )
-
-    def _shiftValue(self, shift: VariableShift | None) -> str | None:
-        if shift is None:
-            return None
-        if isinstance(shift, str):
-            return shift
-        return shift.value
-
-    def _relationshipValue(self, rel: RelationshipKind | None) -> str | None:
-        if rel is None:
-            return None
-        if isinstance(rel, str):
-            return rel
-        return rel.value
-
-    def _calculateCumulative(self):
-        self._cumulative = []
-        cs, ca, cf = 0, 0, 0
-
-        for event in self._events:
-            s = event.get("symptom")
-            a = event.get("anxiety")
-            f = event.get("functioning")
-
-            if s == "up":
-                cs += 1
-            elif s == "down":
-                cs -= 1
-
-            if a == "up":
-                ca += 1
-            elif a == "down":
-                ca -= 1
-
-            if f == "up":
-                cf += 1
-            elif f == "down":
-                cf -= 1
-
-            self._cumulative.append(
-                {
-                    "year": event["year"],
-                    "yearFrac": event["yearFrac"],
-                    "symptom": cs,
-                    "anxiety": ca,
-                    "functioning": cf,
-                    "relationship": event.get("relationship"),
-                }
-            )
-
     def _calculateYearRange(self):
-        if not self._events:
+        yearRange = self._table.yearRange()
+        if yearRange is None:
             self._yearRange = (1920, 1980)
             return
 
-        years = [e["year"] for e in self._events]
-        minYear = min(years)
-        maxYear = max(years)
+        minYear, maxYear = yearRange
         padding = max(5, (maxYear - minYear) // 10)
         self._yearRange = (minYear - padding, maxYear + padding)
 
     @pyqtProperty("QVariantList", notify=changed)
     def events(self) -> list[dict]:
+        if self._events is None:
+            self._events = list(self._table.rows)
         return self._events
 
     @pyqtProperty("QVariantList", notify=changed)
     def cumulative(self) -> list[dict]:
+        if self._cumulative is None:
+            self._cumulative = [
+                self._table.cumulativeRow(i) for i in range(len(self._table))
+            ]
         return self._cumulative
 
+    # Typed series, one value per event in date order, for plotting without
+    # unpacking per-row maps.
+
+    @pyqtProperty("QVariantList", notify=changed)
+    def yearFracs(self) -> list[float]:
+        return self._table.yearFracs.tolist()
+
+    @pyqtProperty("QVariantList", notify=changed)
+    def symptomSeries(self) -> list[int]:
+        return self._table.sums["symptom"].tolist()
+
+    @pyqtProperty("QVariantList", notify=changed)
+    def anxietySeries(self) -> list[int]:
+        return self._table.sums["anxiety"].tolist()
+
+    @pyqtProperty("QVariantList", notify=changed)
+    def functioningSeries(self) -> list[int]:
+        return self._table.sums["functioning"].tolist()
+
     @pyqtProperty(int, notify=changed)
     def yearStart(self) -> int:
         return self._yearRange[0]
@@ -191,25 +366,30 @@ class SARFGraphModel(QObject):
 
     @pyqtProperty(bool, notify=changed)
     def hasData(self) -> bool:
-        return len(self._events) > 0
+        return len(self._table) > 0
 
     @pyqtSlot(int, result="QVariantMap")
     def eventAt(self, index: int) -> dict:
-        if 0 <= index < len(self._events):
-            return self._events[index]
+        if 0 <= index < len(self._table):
+            return self._table.rows[index]
         return {}
 
+    @pyqtSlot(int, int, result="QVariantList")
+    def eventsInYears(self, firstYear: int, lastYear: int) -> list[dict]:
+        rows = self._table.yearRows(firstYear, lastYear)
+        return self._table.rows[rows.start : rows.stop]
+
     @pyqtSlot(int, result="QVariantMap")
     def cumulativeAt(self, index: int) -> dict:
-        if 0 <= index < len(self._cumulative):
-            return self._cumulative[index]
+        if 0 <= index < len(self._table):
+            return self._table.cumulativeRow(index)
         return {}
 
     @pyqtSlot(int, result=str)
     def primaryColor(self, index: int) -> str:
-        if index < 0 or index >= len(self._events):
+        if index < 0 or index >= len(self._table):
             return "#ffffff"
-        event = self._events[index]
+        event = self._table.rows[index]
         if event.get("relationship"):
             return "#5080d0"
         if event.get("symptom"):
@@ -146,35 +146,51 @@ var _serverRequests = {}
 
 function server(util, session, method, path, data, callback) {
 
+    _lastServerId += 1;
+    var requestId = _lastServerId;
+
     function onHTTPFinished(id, response) {
-        var entry = _serverRequests[id];        
-        if(!entry) {
-            // called multiple times per request; once for each request still in progress
-            // but only one will match
+        // Every pending request's handler sees every response; only the
+        // one for this request may consume it and disconnect itself.
+        if(id !== requestId) {
             return
         }
         util.jsServerHttpFinished.disconnect(onHTTPFinished);
-        if(response._data) {
-            response.data = JSON.parse(response._data);
-        };
-        if(entry !== undefined) {
-            _serverRequests[id].callback.call(undefined, response);
-            delete _serverRequests[id];    
+        var entry = _serverRequests[id];
+        if(entry === undefined) {
+            return
         }
+        delete _serverRequests[id];
+        // response.data arrives as native objects and arrays
+        entry.callback.call(undefined, response);
     }
 
-    _lastServerId += 1;
     util.jsServerHttpFinished.connect(onHTTPFinished);
-    _serverRequests[_lastServerId] = {
+    _serverRequests[requestId] = {
         method: method,
         path: path,
-        callback: callback
+        callback: callback,
+        util: util,
+        onFinished: onHTTPFinished
     };
     if(data === null) {
-        util.jsServerHttp(session, _lastServerId, method, path);
+        util.jsServerHttp(session, requestId, method, path);
     } else {
-        util.jsServerHttp(session, _lastServerId, method, path, data);
+        util.jsServerHttp(session, requestId, method, path, data);
+    }
+    return requestId;
+}
+
+// Abort a request returned from server(); its callback is never called.
+function serverCancel(util, id) {
+    var entry = _serverRequests[id];
+    if(!entry) {
+        return;
     }
+    // Only this request's handler; the others are still waiting on theirs.
+    entry.util.jsServerHttpFinished.disconnect(entry.onFinished);
+    delete _serverRequests[id];
+    util.jsServerHttpCancel(id);
 }
 
 // for tests because requests were lingering after the QQmlWidget source was
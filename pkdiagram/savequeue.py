@@ -0,0 +1,211 @@
+"""
+Asynchronous, coalescing saves of server diagrams.
+
+Diagram.save() blocks in a nested event loop for each PUT and conflict
+retry. DiagramSaveQueue instead sends one Diagram.saveAsync() at a time per
+diagram. Changes queued while a save is waiting or in flight are folded
+into the next PUT, so a burst of edits becomes one or two requests. Each
+change's `finished(success)` callback is called once its PUT completes.
+Changes saved with the same `key` replace each other while still queued.
+
+Changes saved with `applyLocally=True` are also applied to the diagram's
+local copy right away so the UI doesn't wait for the server. Each PUT
+replaces the local copy with what was sent or with the server's copy on a
+conflict, so queued local changes are applied again after every PUT. Their
+`applyChange` must therefore be idempotent.
+"""
+
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import Callable
+
+from btcopilot.schema import DiagramData
+from pkdiagram.pyqt import QObject, QTimer, pyqtSignal, pyqtSlot
+
+_log = logging.getLogger(__name__)
+
+
+FD_SAVE_COALESCE_MS = int(os.getenv("FD_SAVE_COALESCE_MS", 250))
+
+
+@dataclass
+class _Change:
+    applyChange: Callable[[DiagramData], DiagramData]
+    stillValidAfterRefresh: Callable[[DiagramData], bool] | None = None
+    finished: list[Callable[[bool], None]] = field(default_factory=list)
+    key: object = None
+    applyLocally: bool = False
+
+
+@dataclass
+class _DiagramQueue:
+    diagram: object  # server_types.Diagram
+    useJson: bool
+    pending: list[_Change] = field(default_factory=list)
+    sending: list[_Change] = field(default_factory=list)
+    reply: object = None  # QNetworkReply of the PUT in flight
+    canceled: bool = False
+
+
+class DiagramSaveQueue(QObject):
+
+    saveStarted = pyqtSignal(int, arguments=["diagramId"])
+    saveProgress = pyqtSignal(
+        int, "qint64", "qint64", arguments=["diagramId", "sent", "total"]
+    )
+    saveFinished = pyqtSignal(int, bool, arguments=["diagramId", "success"])
+    busyChanged = pyqtSignal()
+
+    def __init__(self, server: Callable, coalesceMs=None, parent=None):
+        """`server` returns the Server to send with, e.g. Session.server."""
+        super().__init__(parent)
+        self._server = server
+        self._queues = {}  # diagram id: _DiagramQueue
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(
+            FD_SAVE_COALESCE_MS if coalesceMs is None else coalesceMs
+        )
+        self._timer.timeout.connect(self._sendPending)
+
+    def save(
+        self,
+        diagram,
+        applyChange: Callable[[DiagramData], DiagramData],
+        stillValidAfterRefresh: Callable[[DiagramData], bool] = None,
+        finished: Callable[[bool], None] = None,
+        useJson: bool = True,
+        key=None,
+        applyLocally: bool = False,
+    ):
+        """
+        Queue `applyChange` to be saved with the next PUT for `diagram`. A
+        queued change with the same `key` is replaced, e.g. a newer value for
+        the same field or a newer snapshot of the same scene.
+        """
+        if applyLocally:
+            diagram.setDiagramData(applyChange(diagram.getDiagramData()))
+        queue = self._queues.get(diagram.id)
+        if queue is not None and queue.diagram is not diagram:
+            self.cancel(diagram.id)  # diagram was reloaded from the server
+            queue = None
+        if queue is None:
+            queue = self._queues[diagram.id] = _DiagramQueue(diagram, useJson)
+        wasBusy = self.isBusy()
+        callbacks = [finished] if finished else []
+        for change in queue.pending if key is not None else ():
+            if change.key == key:
+                change.applyChange = applyChange
+                change.stillValidAfterRefresh = stillValidAfterRefresh
+                change.finished.extend(callbacks)
+                change.applyLocally = change.applyLocally or applyLocally
+                break
+        else:
+            queue.pending.append(
+                _Change(
+                    applyChange, stillValidAfterRefresh, callbacks, key, applyLocally
+                )
+            )
+        if not self._timer.isActive():
+            self._timer.start()
+        if not wasBusy:
+            self.busyChanged.emit()
+
+    def isBusy(self, diagramId: int = None) -> bool:
+        if diagramId is not None:
+            queues = [self._queues[diagramId]] if diagramId in self._queues else []
+        else:
+            queues = self._queues.values()
+        return any(x.pending or x.sending for x in queues)
+
+    @pyqtSlot(int)
+    def cancel(self, diagramId: int):
+        """Abort the PUT in flight and drop the queued changes for `diagramId`."""
+        queue = self._queues.pop(diagramId, None)
+        if not queue:
+            return
+        queue.canceled = True
+        changes = queue.sending + queue.pending
+        queue.sending, queue.pending = [], []
+        if queue.reply:
+            queue.reply.abort()
+            queue.reply = None
+        for change in changes:
+            for callback in change.finished:
+                callback(False)
+        self.saveFinished.emit(diagramId, False)
+        self.busyChanged.emit()
+
+    def cancelAll(self):
+        for diagramId in list(self._queues):
+            self.cancel(diagramId)
+
+    def _sendPending(self):
+        for queue in list(self._queues.values()):
+            if queue.pending and not queue.sending:
+                self._send(queue)
+
+    def _reapplyLocally(self, queue: _DiagramQueue):
+        """The finished PUT replaced the local copy without queued changes."""
+        local = [x for x in queue.pending if x.applyLocally]
+        if local:
+            diagramData = queue.diagram.getDiagramData()
+            for change in local:
+                diagramData = change.applyChange(diagramData)
+            queue.diagram.setDiagramData(diagramData)
+
+    def _send(self, queue: _DiagramQueue):
+        changes = queue.sending = queue.pending
+        queue.pending = []
+        diagramId = queue.diagram.id
+
+        def applyChange(diagramData):
+            for change in changes:
+                diagramData = change.applyChange(diagramData)
+            return diagramData
+
+        def stillValidAfterRefresh(diagramData):
+            return all(
+                x.stillValidAfterRefresh(diagramData)
+                for x in changes
+                if x.stillValidAfterRefresh
+            )
+
+        def sent(reply):
+            queue.reply = reply
+            reply.uploadProgress.connect(
+                lambda sent, total: self.saveProgress.emit(diagramId, sent, total)
+            )
+
+        def finished(success):
+            queue.reply = None
+            if queue.canceled:
+                return  # already reported by cancel()
+            queue.sending = []
+            if not success:
+                _log.warning(
+                    f"Failed to save {len(changes)} change(s) to diagram {diagramId}"
+                )
+            for change in changes:
+                for callback in change.finished:
+                    callback(success)
+            self._reapplyLocally(queue)
+            self.saveFinished.emit(diagramId, success)
+            if queue.pending:
+                self._send(queue)  # changes that came in while this was in flight
+            elif self._queues.get(diagramId) is queue:
+                del self._queues[diagramId]
+            if not self.isBusy():
+                self.busyChanged.emit()
+
+        _log.debug(f"Saving {len(changes)} change(s) to diagram {diagramId}")
+        self.saveStarted.emit(diagramId)
+        queue.diagram.saveAsync(
+            self._server(),
+            applyChange,
+            stillValidAfterRefresh,
+            finished,
+            useJson=queue.useJson,
+            sent=sent,
+        )
@@ -7,6 +7,7 @@ from .emotionalunit import EmotionalUnit
 from .triangle import Triangle
 from .item import Item
 from .event import Event
+from .spatialindex import SpatialIndex
 from .pathitem import PathItem
 from .itemdetails import ItemDetails
 from .layeritem import LayerItem
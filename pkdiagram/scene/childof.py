@@ -13,6 +13,8 @@ from pkdiagram.scene import PathItem
 
 class ChildOf(PathItem):
 
+    SPATIALLY_INDEXED = True
+
     @staticmethod
     def personConnectionPoint(person):
         rect = QRectF(util.PERSON_RECT)
@@ -1,105 +1,225 @@
 """
-Currently unused but keeping for future.
+Copy/paste and import of diagram items.
+
+Items are copied as the same chunks that Scene.write() produces, so that the
+clipboard is detached from the source scene and can be pasted any number of
+times, even after the original items were deleted or the source scene closed.
+Pasting mirrors Scene.read(): new ids are assigned up front, the chunks' id
+references are rewritten through a dict, and the new items are read and then
+added in one batch so that the scene updates once instead of once per item.
 """
 
-from pkdiagram.pyqt import QUndoCommand
+import copy
+import logging
+
+from btcopilot.schema import EventKind
+from pkdiagram.pyqt import QPointF, QUndoCommand
 from pkdiagram import util
+from pkdiagram.scene import (
+    Event,
+    Person,
+    Marriage,
+    Emotion,
+    MultipleBirth,
+    PencilStroke,
+    Callout,
+)
 from pkdiagram.scene.commands import RemoveItems
 
 
+_log = logging.getLogger(__name__)
+
+
+# In the order that they are read, same as Scene.read()
+SECTIONS = (
+    "events",
+    "people",
+    "pair_bonds",
+    "emotions",
+    "layerItems",
+    "multipleBirths",
+)
+
+# Chunk attributes that hold the id of another item.
+REFS = {
+    "events": ("person", "spouse", "child"),
+    "people": ("parents", "childOfMultipleBirth"),
+    "pair_bonds": ("person_a", "person_b", "custody"),
+    "emotions": ("person", "target", "event"),
+    "layerItems": ("parentId",),
+    "multipleBirths": ("parents",),
+}
+
+# Chunk attributes that hold a list of item ids.
+LIST_REFS = {
+    "events": ("relationshipTargets", "relationshipTriangles"),
+    "people": ("marriages", "layers"),
+    "emotions": ("layers",),
+    "layerItems": ("layers",),
+    "multipleBirths": ("children",),
+}
+
+# Value for a reference to an item that was not copied, default is None.
+REF_DEFAULTS = {"custody": -1}
+
+# Sections with a scene position to offset on paste.
+OFFSET_SECTIONS = ("people", "layerItems")
+
+
 class Clipboard:
-    """Represents a remaped hiarchy of Items in the clipboard.
-    Seperates out the copy action from UndoCommand."""
+    """
+    A detached snapshot of `items` and everything that depends only on them,
+    i.e. the pair bonds between copied people and the events and emotions
+    that refer only to copied people.
+    """
 
     def __init__(self, items):
-        """Clone them in memory only, so they are all set up to register.
-        That way PasteItems() can clone the clones over and over again
-        even if the original items have been deleted. Hence `Clipboard`."""
-        self.map = {}
-        self.items = list(items)
-        for item in self.items:
-            item._cloned_was_selected = True  # just leave the attribute there...
-            assert item.isSelected()
+        self.chunks = {section: [] for section in SECTIONS}
+        items = [x for x in items if x.isPathItem]
+        if not items:
+            return
+        scene = items[0].scene()
+        peopleIds = {x.id for x in items if x.isPerson}
 
-    def copy(self, scene):
-        self.map = {}
-        clones = []
-        for item in self.items:
-            clone = item.clone(scene)
-            self.map[item.id] = clone
-            clones.append(clone)
-            if clone.isPerson and not item.childOf in self.items:
-                # Ensure childItem is added to the map even if not selected
-                childClone = item.childOf.clone(scene)
-                self.map[clone._cloned_childOf_id] = childClone
-                clones.append(childClone)
-        childOfs = []
-        others = []
-        people = []
-        for clone in clones:
-            if clone.isPerson:
-                people.append(clone)
-            elif clone.isChildOf:
-                childOfs.append(clone)
-            else:
-                others.append(clone)
-        # First remap non-people to weed out incomplete emotions|marriages,
-        # ChildOfs after marriages.
-        for clone in others + childOfs:
-            if clone.remap(self) is False:
-                clones.remove(clone)  # when emotions|marriage can't find a person
-                scene.removeItem(
-                    clone
-                )  # this is messy, maybe clone(scene) shouldn't call register() if it won't be used?
-                for k, v in dict(self.map).items():
-                    if v == clone:
-                        del self.map[k]
-        # then remap people with accurate list of emotions|marriages
-        for clone in people:
-            clone.remap(self)
-        # hack-messy, but preoccupied
-        for childOf in childOfs:
-            if childOf.parents():
-                childOf.parents().onAddChild(childOf.person)
-        return clones
-
-    def find(self, id):
-        """'item' will be the original object, and self.map has the clone."""
-        if id is not None:
-            return self.map.get(id)
+        def write(section, item, kind):
+            chunk = {"kind": kind}
+            item.write(chunk)
+            self.chunks[section].append(chunk)
+
+        multipleBirths = {}
+        for person in scene.people():
+            if person.id in peopleIds:
+                write("people", person, "Person")
+                if person.childOf and person.childOf.multipleBirth:
+                    multipleBirth = person.childOf.multipleBirth
+                    multipleBirths[multipleBirth.id] = multipleBirth
+        marriageIds = set()
+        for marriage in scene.marriages():
+            if {marriage.personA().id, marriage.personB().id} <= peopleIds:
+                marriageIds.add(marriage.id)
+                write("pair_bonds", marriage, "Marriage")
+        eventIds = set()
+        for event in scene.events():
+            if event.person() and {x.id for x in event.people()} <= peopleIds:
+                eventIds.add(event.id)
+                write("events", event, "Event")
+        for emotion in scene.emotions():
+            if scene._isTriangleSymbol(emotion):
+                continue
+            refs = (emotion.person(), emotion.target())
+            if any(x and x.id not in peopleIds for x in refs):
+                continue
+            if emotion.sourceEvent() and emotion.sourceEvent().id not in eventIds:
+                continue
+            write("emotions", emotion, emotion.kind())
+        for item in items:
+            if item.isPencilStroke:
+                write("layerItems", item, "PencilStroke")
+            elif item.isCallout:
+                write("layerItems", item, "Callout")
+        for item in multipleBirths.values():
+            if item.parents() and item.parents().id in marriageIds:
+                write("multipleBirths", item, "MultipleBirth")
+
+    def copy(self, scene, offset=util.PASTE_OFFSET) -> list:
+        """
+        Returns new, unadded items for `scene`, read from a copy of the chunks
+        with new ids.
+        """
+        idMap = {}
+        nextId = scene.lastItemId()
+        for section in SECTIONS:
+            for chunk in self.chunks[section]:
+                nextId += 1
+                idMap[chunk["id"]] = nextId
+        scene.setLastItemId(nextId)
+
+        itemChunks = []
+        for section in SECTIONS:
+            refs = REFS.get(section, ())
+            listRefs = LIST_REFS.get(section, ())
+            for chunk in copy.deepcopy(self.chunks[section]):
+                chunk["id"] = idMap[chunk["id"]]
+                for attr in refs:
+                    if chunk.get(attr) is not None:
+                        chunk[attr] = idMap.get(chunk[attr], REF_DEFAULTS.get(attr))
+                for attr in listRefs:
+                    if attr in chunk:
+                        chunk[attr] = [idMap[x] for x in chunk[attr] if x in idMap]
+                if section == "multipleBirths" and len(chunk["children"]) < 2:
+                    continue
+                if offset and section in OFFSET_SECTIONS:
+                    pos = chunk.get("itemPos")
+                    if isinstance(pos, QPointF):
+                        chunk["itemPos"] = pos + QPointF(offset, offset)
+                item = self._newItem(section, chunk)
+                if item:
+                    item.id = chunk["id"]
+                    itemChunks.append((item, chunk))
+
+        itemMap = {item.id: item for item, chunk in itemChunks}
+        for item, chunk in itemChunks:
+            if item.read(chunk, itemMap.get) == False:
+                _log.warning(f"Could not read pasted item: {chunk}")
+        return [item for item, chunk in itemChunks]
+
+    def _newItem(self, section, chunk):
+        """Placeholders, same as in Scene.read()."""
+        if section == "events":
+            return Event(kind=EventKind.Shift, person=None)
+        elif section == "people":
+            return Person()
+        elif section == "pair_bonds":
+            return Marriage()
+        elif section == "emotions":
+            kind = Emotion.kindForKindSlug(chunk["kind"])
+            return Emotion(kind=kind, target=None, event=None)
+        elif section == "layerItems":
+            if chunk["kind"] == "PencilStroke":
+                return PencilStroke()
+            elif chunk["kind"] == "Callout":
+                return Callout()
+        elif section == "multipleBirths":
+            return MultipleBirth()
 
 
 class PasteItems(QUndoCommand):
+    """
+    Adds `items` from Clipboard.copy() in one batch. Undo removes them with a
+    single RemoveItems, which redo then reverses.
+    """
+
     def __init__(self, scene, items):
         super().__init__("Paste items")
         self.scene = scene
-        self.items = {}
-        for item in items:
-            self.items[item] = {"pos_was": item.pos()}
+        self.items = list(items)
+        self._removeItems = None
 
     def redo(self):
         for item in self.scene.selectedItems():
             item.setSelected(False)
-        for item, info in self.items.items():
-            if item.scene() != self.scene:  # scene set on copy()
-                item.setParentItem(None)
-                self.scene.addItem(item)
-            if item.isLayerItem:
-                item.setLayers([layer.id for layer in self.scene.activeLayers()])
-            pos = info["pos_was"]
-            item.setPos(pos.x() + util.PASTE_OFFSET, pos.y() + util.PASTE_OFFSET)
-            item.updateGeometry()
-            item.updateDetails()
-        # Do it again for dependents.
-        # Still required after optimizing Person.updateDependents?
-        for item, info in self.items.items():
-            item.updateGeometry()
-            item.updateDetails()
-            item.setSelected(True)
+        with self.scene.macro(self.text(), undo=False, batchAddRemove=True):
+            if self._removeItems is None:
+                for item in self.items:
+                    self.scene.addItem(item)
+                layerIds = [
+                    x.id for x in self.scene.activeLayers(includeInternal=False)
+                ]
+                if layerIds:
+                    for item in self.items:
+                        if item.isPerson or item.isLayerItem:
+                            item.setLayers(layerIds)
+            else:
+                self._removeItems.undo()
+        for item in self.items:
+            if item.isPathItem:
+                item.setSelected(True)
 
     def undo(self):
-        for item in self.items:
-            self.scene.removeItem(item)
+        if self._removeItems is None:
+            self._removeItems = RemoveItems(self.scene, list(self.items))
+        with self.scene.macro(self.text(), undo=False, batchAddRemove=True):
+            self._removeItems.redo()
 
 
 class ImportItems(PasteItems):
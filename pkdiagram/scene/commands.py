@@ -8,10 +8,12 @@ directly. If `undo=True`, then an UndoCommand is created to store any necessary
 state from the object required to undo the underlying api call.
 """
 
-import os, shutil, logging
+import os, sys, shutil, logging
+from dataclasses import dataclass, field
 
 from pkdiagram.pyqt import QUndoCommand
 from pkdiagram.scene import (
+    Item,
     Event,
     Emotion,
     Person,
@@ -87,12 +89,45 @@ class RemoveItems(QUndoCommand):
             "layerProperties": {},
         }
 
+        # Keyed on id(), so that each dependency is mapped once in O(1) even
+        # when thousands of items are removed together, i.e. undoing a paste.
+        mapped = set()
+
+        def isMapped(kind, item):
+            key = (kind, id(item))
+            if key in mapped:
+                return True
+            mapped.add(key)
+            return False
+
+        # Index the events and emotions once instead of scanning all of them
+        # for each removed person.
+        eventsByPerson = {}
+        emotionsByItem = {}
+        if sum(1 for x in self.items if x.isPerson) > 1:
+            for event in scene.events():
+                for person in event.people():
+                    eventsByPerson.setdefault(person, []).append(event)
+            for emotion in scene.emotions():
+                for x in (emotion.person(), emotion.target(), emotion.sourceEvent()):
+                    if x is not None:
+                        emotionsByItem.setdefault(id(x), []).append(emotion)
+
+            def eventsFor(person):
+                return sorted(eventsByPerson.get(person, []), key=Event.sortKey)
+
+            def emotionsFor(item):
+                return list(dict.fromkeys(emotionsByItem.get(id(item), [])))
+
+        else:
+            eventsFor = scene.eventsFor
+            emotionsFor = scene.emotionsFor
+
         def mapChildOf(item):
             if item.multipleBirth and item.multipleBirth.isSelected():
                 return  # Handled in mapMultipleBirth
-            for entry in self._unmapped["children"]:
-                if entry["person"] is item.person:
-                    return
+            if isMapped("children", item.person):
+                return
             item._undo_mapping = {
                 "person": item.person,
                 "birthPartners": item.multipleBirth
@@ -103,9 +138,8 @@ class RemoveItems(QUndoCommand):
             self._unmapped["children"].append(item._undo_mapping)
 
         def mapMultipleBirth(item):
-            for entry in self._unmapped["multipleBirths"]:
-                if entry["multipleBirth"] is item:
-                    return
+            if isMapped("multipleBirths", item):
+                return
             item._undo_mapping = {
                 "multipleBirth": item,
                 "parents": item.parents(),
@@ -114,9 +148,8 @@ class RemoveItems(QUndoCommand):
             self._unmapped["multipleBirths"].append(item._undo_mapping)
 
         def mapMarriage(item):
-            for entry in self._unmapped["marriages"]:
-                if entry["marriage"] is item:
-                    return
+            if isMapped("marriages", item):
+                return
             self._unmapped["marriages"].append(
                 {"marriage": item, "people": list(item.people)}
             )
@@ -124,9 +157,8 @@ class RemoveItems(QUndoCommand):
                 mapChildOf(child.childOf)
 
         def mapEvent(item: Event):
-            for entry in self._unmapped["events"]:
-                if entry["event"] is item:
-                    return
+            if isMapped("events", item):
+                return
             # Store IDs, not object references
             mapping = {
                 "event": item,
@@ -138,13 +170,12 @@ class RemoveItems(QUndoCommand):
                 "dateTime": item.dateTime(),
             }
             self._unmapped["events"].append(mapping)
-            for emotion in self.scene.emotionsFor(item):
+            for emotion in emotionsFor(item):
                 mapEmotion(emotion)
 
         def mapEmotion(item: Emotion):
-            for entry in self._unmapped["emotions"]:
-                if entry["emotion"] is item:
-                    return
+            if isMapped("emotions", item):
+                return
             mapping = {
                 "emotion": item,
                 "eventId": item.sourceEvent().id if item.sourceEvent() else None,
@@ -176,9 +207,9 @@ class RemoveItems(QUndoCommand):
             if item.isPerson:
                 for marriage in list(item.marriages):
                     mapMarriage(marriage)
-                for emotion in list(scene.emotionsFor(item)):
+                for emotion in list(emotionsFor(item)):
                     mapEmotion(emotion)
-                for event in list(scene.eventsFor(item)):
+                for event in list(eventsFor(item)):
                     mapEvent(event)
                 if item.childOf:
                     mapChildOf(item.childOf)
@@ -560,8 +591,11 @@ class RemoveEventProperty(QUndoCommand):
                 continue
             attrEntries = {}
             for event in scene.events():
+                value = event.dynamicProperty(attr).get()
+                if value is None:
+                    continue  # nothing to restore, so don't keep an entry
                 attrEntries[event.id] = {
-                    "value": event.dynamicProperty(attr).get(),
+                    "value": value,
                     "event": event,
                 }
             ret.append((attr, attrEntries))
@@ -644,3 +678,187 @@ class SetLayerOrder(QUndoCommand):
 
     def undo(self):
         self.scene._do_setLayerOrder(self.was_layers)
+
+
+## Undo memory accounting
+
+
+UNDO_MAX_BYTES = 256 * 1024 * 1024
+UNDO_MAX_COMMANDS = 1000
+
+# Rough cost of a detached item beyond its property values (QGraphicsItem,
+# paths, animation helpers, etc).
+ITEM_BASE_BYTES = 4096
+POINTER_BYTES = 8
+
+
+def estimateBytes(value, seen=None) -> int:
+    """
+    Rough estimate of the memory that `value` keeps alive.
+
+    Items still in a scene are owned by the scene and only cost a pointer.
+    Items not in a scene (i.e. removed items held only for undo) cost their
+    properties plus ITEM_BASE_BYTES. Other objects are not walked.
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return POINTER_BYTES
+    seen.add(id(value))
+    if isinstance(value, Item):
+        if value.scene() is not None:
+            return POINTER_BYTES
+        return ITEM_BASE_BYTES + sum(
+            estimateBytes(prop.get(), seen) for prop in value.props
+        )
+    size = sys.getsizeof(value, POINTER_BYTES)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimateBytes(k, seen) + estimateBytes(v, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for x in value:
+            size += estimateBytes(x, seen)
+    return size
+
+
+def estimateCommandBytes(cmd: QUndoCommand) -> int:
+    seen = set()
+    size = sys.getsizeof(cmd, POINTER_BYTES)
+    for name, value in cmd.__dict__.items():
+        if name == "scene":
+            continue
+        size += estimateBytes(value, seen)
+    return size
+
+
+class EvictedCommand(QUndoCommand):
+    """
+    What a command becomes once it is evicted from the undo history. Its
+    state is released and undo/redo do nothing, which is consistent because
+    eviction is oldest-first and so nothing older is ever undone again.
+    """
+
+    def redo(self):
+        pass
+
+    def undo(self):
+        pass
+
+
+@dataclass
+class UndoEntry:
+    """One top-level entry on the QUndoStack, i.e. a command or a macro."""
+
+    commands: list = field(default_factory=list)
+    bytes: int = 0
+    evicted: bool = False
+    deferNotifications: bool = False  # see Scene.macro()
+
+
+class UndoHistory:
+    """
+    Memory accounting for a QUndoStack with a byte and command cap.
+
+    QUndoStack can't drop commands from the bottom once it has any, so
+    evicted commands stay on the stack as empty EvictedCommand's. Entries are
+    kept index-aligned with the stack's top-level commands.
+    """
+
+    def __init__(self, stack, maxBytes=UNDO_MAX_BYTES, maxCommands=UNDO_MAX_COMMANDS):
+        self._stack = stack
+        self._maxBytes = maxBytes
+        self._maxCommands = maxCommands
+        self._entries: list[UndoEntry] = []
+        self._macro: UndoEntry | None = None
+        self._macroLevel = 0
+        self.nEvicted = 0
+
+    def setLimits(self, maxBytes=None, maxCommands=None):
+        """None means no limit."""
+        self._maxBytes = maxBytes
+        self._maxCommands = maxCommands
+        self._sync(self._stack.count())
+        self._evict()
+
+    def limits(self) -> tuple:
+        return self._maxBytes, self._maxCommands
+
+    def _sync(self, count: int):
+        """Match the stack after pushes dropped redo commands or a clear()."""
+        del self._entries[count:]
+        while len(self._entries) < count:
+            self._entries.append(UndoEntry())
+
+    def beginMacro(self, deferNotifications=False):
+        if self._macroLevel == 0:
+            self._macro = UndoEntry()
+        self._macro.deferNotifications |= deferNotifications
+        self._macroLevel += 1
+
+    def endMacro(self):
+        self._macroLevel -= 1
+        if self._macroLevel == 0:
+            entry, self._macro = self._macro, None
+            self._append(entry)
+
+    def record(self, cmd: QUndoCommand):
+        """Call after the command was pushed."""
+        if self._macroLevel:
+            self._macro.commands.append(cmd)
+            self._macro.bytes += estimateCommandBytes(cmd)
+        else:
+            self._append(UndoEntry(commands=[cmd], bytes=estimateCommandBytes(cmd)))
+
+    def _append(self, entry: UndoEntry):
+        self._sync(self._stack.count() - 1)
+        self._entries.append(entry)
+        self._evict()
+
+    def defersNotifications(self, index: int) -> bool:
+        """Whether the stack command at `index` came from a deferring macro."""
+        self._sync(self._stack.count())
+        return (
+            0 <= index < len(self._entries) and self._entries[index].deferNotifications
+        )
+
+    def canUndo(self) -> bool:
+        """Like QUndoStack.canUndo() but false once the next command down was
+        evicted, since evicted commands are only kept as stack padding."""
+        if not self._stack.canUndo():
+            return False
+        self._sync(self._stack.count())
+        return not self._entries[self._stack.index() - 1].evicted
+
+    def totalBytes(self) -> int:
+        self._sync(self._stack.count())
+        return sum(x.bytes for x in self._entries)
+
+    def count(self) -> int:
+        """The number of commands that can still be undone."""
+        self._sync(self._stack.count())
+        return sum(1 for x in self._entries if not x.evicted)
+
+    def _evict(self):
+        live = [i for i, x in enumerate(self._entries) if not x.evicted]
+        nLive = len(live)
+        nBytes = sum(self._entries[i].bytes for i in live)
+        # Always keep the newest entry, even if it alone is over the cap, and
+        # never evict at or above the stack index since those can be redone.
+        for iEntry in live[:-1]:
+            overCommands = self._maxCommands is not None and nLive > self._maxCommands
+            overBytes = self._maxBytes is not None and nBytes > self._maxBytes
+            if iEntry >= self._stack.index() or not (overCommands or overBytes):
+                break
+            entry = self._entries[iEntry]
+            nLive -= 1
+            nBytes -= entry.bytes
+            for cmd in entry.commands:
+                cmd.__dict__.clear()
+                cmd.__class__ = EvictedCommand
+            entry.commands = []
+            entry.bytes = 0
+            entry.evicted = True
+            self.nEvicted += 1
+            if 0 <= self._stack.cleanIndex() <= iEntry:
+                # Undoing can no longer get back to the saved state.
+                self._stack.resetClean()
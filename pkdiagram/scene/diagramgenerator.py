@@ -0,0 +1,258 @@
+"""
+Deterministic generator for large synthetic family diagrams.
+
+Used by the benchmark suite (pkdiagram.benchmark) and by tests that need more
+than a handful of items. The same DiagramSpec always produces the same
+diagram, item for item, so timings can be compared between commits.
+"""
+
+import random
+from dataclasses import dataclass, asdict
+
+from btcopilot.schema import EventKind, RelationshipKind, VariableShift
+from pkdiagram.pyqt import QPointF
+from pkdiagram import util
+from pkdiagram.scene.random_names import LAST_NAMES, MALE_NAMES, FEMALE_NAMES
+
+
+GENERATION_GAP = 300
+SIBLING_GAP = 180
+FIRST_BIRTH_YEAR = 1850
+GENERATION_YEARS = 25
+
+SHIFT_VARIABLES = ("symptom", "anxiety", "functioning")
+SHIFTS = (VariableShift.Up, VariableShift.Down, VariableShift.Same)
+RELATIONSHIPS = (
+    RelationshipKind.Conflict,
+    RelationshipKind.Distance,
+    RelationshipKind.Cutoff,
+    RelationshipKind.Fusion,
+    RelationshipKind.Projection,
+    RelationshipKind.Overfunctioning,
+    RelationshipKind.Underfunctioning,
+)
+
+
+@dataclass(frozen=True)
+class DiagramSpec:
+    """What to generate. Counts are targets; people is exact."""
+
+    people: int = 100
+    pairBondRate: float = 0.7  # chance that a child gets a partner married in
+    maxChildren: int = 4
+    eventsPerPerson: int = 3  # variable shifts, not counting births/marriages
+    emotions: int = 50  # relationship shift events, each creating an Emotion
+    layers: int = 3
+    tags: int = 5
+    seed: int = 0
+
+    def toDict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class GeneratedDiagram:
+    people: list
+    marriages: list
+    events: list
+    layers: list
+    tags: list
+
+
+class _Generator:
+    def __init__(self, spec: DiagramSpec, scene):
+        self.spec = spec
+        self.scene = scene
+        self.rng = random.Random(spec.seed)
+        self.tags = [f"tag-{i}" for i in range(spec.tags)]
+        self.people = []
+        self.marriages = []
+        self.events = []
+        self.birthYears = {}  # Person: int
+
+    def _date(self, year):
+        return util.Date(year, self.rng.randint(1, 12), self.rng.randint(1, 28))
+
+    def _someTags(self):
+        if not self.tags or self.rng.random() < 0.5:
+            return []
+        return self.rng.sample(self.tags, self.rng.randint(1, min(2, len(self.tags))))
+
+    def _addPerson(self, gender, lastName, generation, x):
+        from pkdiagram.scene import Person
+
+        names = MALE_NAMES if gender == util.PERSON_KIND_MALE else FEMALE_NAMES
+        person = Person(
+            name=self.rng.choice(names),
+            lastName=lastName,
+            gender=gender,
+            itemPos=QPointF(x, generation * GENERATION_GAP),
+            tags=self._someTags(),
+        )
+        self.people.append(person)
+        self.birthYears[person] = (
+            FIRST_BIRTH_YEAR + generation * GENERATION_YEARS + self.rng.randint(-5, 5)
+        )
+        return person
+
+    def _gender(self):
+        return self.rng.choice((util.PERSON_KIND_MALE, util.PERSON_KIND_FEMALE))
+
+    def buildFamilies(self):
+        """
+        Returns [(personA, personB)] couples and [(child, (personA, personB))].
+        Generations are filled breadth-first until spec.people is reached.
+        """
+        couples = []
+        children = []
+        generation = 0
+        lastName = self.rng.choice(LAST_NAMES)
+        father = self._addPerson(util.PERSON_KIND_MALE, lastName, generation, 0)
+        mother = self._addPerson(
+            util.PERSON_KIND_FEMALE,
+            self.rng.choice(LAST_NAMES),
+            generation,
+            SIBLING_GAP,
+        )
+        couples.append((father, mother))
+        current = [(father, mother)]
+        x = 0
+        while current and len(self.people) < self.spec.people:
+            generation += 1
+            nextCouples = []
+            for personA, personB in current:
+                for _ in range(self.rng.randint(1, self.spec.maxChildren)):
+                    if len(self.people) >= self.spec.people:
+                        break
+                    gender = self._gender()
+                    child = self._addPerson(gender, personA.lastName(), generation, x)
+                    x += SIBLING_GAP
+                    children.append((child, (personA, personB)))
+                    if (
+                        len(self.people) < self.spec.people
+                        and self.rng.random() < self.spec.pairBondRate
+                    ):
+                        otherGender = (
+                            util.PERSON_KIND_FEMALE
+                            if gender == util.PERSON_KIND_MALE
+                            else util.PERSON_KIND_MALE
+                        )
+                        spouse = self._addPerson(
+                            otherGender, self.rng.choice(LAST_NAMES), generation, x
+                        )
+                        x += SIBLING_GAP
+                        couple = (child, spouse)
+                        couples.append(couple)
+                        nextCouples.append(couple)
+            if not nextCouples and len(self.people) < self.spec.people:
+                # Dead end; start a new family line so the target is still met.
+                lastName = self.rng.choice(LAST_NAMES)
+                a = self._addPerson(util.PERSON_KIND_MALE, lastName, generation, x)
+                b = self._addPerson(
+                    util.PERSON_KIND_FEMALE,
+                    self.rng.choice(LAST_NAMES),
+                    generation,
+                    x + SIBLING_GAP,
+                )
+                x += SIBLING_GAP * 2
+                couples.append((a, b))
+                nextCouples.append((a, b))
+            current = nextCouples
+        return couples, children
+
+    def build(self) -> GeneratedDiagram:
+        from pkdiagram.scene import Marriage, Event, Layer
+
+        couples, children = self.buildFamilies()
+        self.scene.addItems(*self.people, batch=True)
+
+        marriagesFor = {}
+        for personA, personB in couples:
+            marriage = Marriage(personA, personB)
+            marriagesFor[(personA, personB)] = marriage
+            self.marriages.append(marriage)
+        self.scene.addItems(*self.marriages, batch=True)
+        for child, parents in children:
+            child.setParents(marriagesFor[parents])
+
+        for child, (personA, personB) in children:
+            self.events.append(
+                Event(
+                    EventKind.Birth,
+                    personA,
+                    spouse=personB,
+                    child=child,
+                    dateTime=self._date(self.birthYears[child]),
+                )
+            )
+        for personA, personB in couples:
+            year = max(self.birthYears[personA], self.birthYears[personB]) + 22
+            self.events.append(
+                Event(
+                    EventKind.Married,
+                    personA,
+                    spouse=personB,
+                    dateTime=self._date(year + self.rng.randint(0, 6)),
+                )
+            )
+        for person in self.people:
+            birthYear = self.birthYears[person]
+            for _ in range(self.spec.eventsPerPerson):
+                variable = self.rng.choice(SHIFT_VARIABLES)
+                self.events.append(
+                    Event(
+                        EventKind.Shift,
+                        person,
+                        dateTime=self._date(birthYear + self.rng.randint(1, 70)),
+                        description=f"{variable.capitalize()} shift",
+                        tags=self._someTags(),
+                        **{variable: self.rng.choice(SHIFTS)},
+                    )
+                )
+        if len(self.people) > 1:
+            for _ in range(self.spec.emotions):
+                personA, personB = self.rng.sample(self.people, 2)
+                year = max(self.birthYears[personA], self.birthYears[personB])
+                self.events.append(
+                    Event(
+                        EventKind.Shift,
+                        personA,
+                        dateTime=self._date(year + self.rng.randint(5, 60)),
+                        relationship=self.rng.choice(RELATIONSHIPS),
+                        relationshipTargets=[personB],
+                        tags=self._someTags(),
+                    )
+                )
+        self.scene.addItems(*self.events, batch=True)
+
+        for tag in self.tags:
+            self.scene.addTag(tag)
+        layers = [
+            Layer(name=f"View {i + 1}", tags=self._someTags())
+            for i in range(self.spec.layers)
+        ]
+        self.scene.addItems(*layers, batch=True)
+        for layer in layers:
+            # Move a slice of the people so that layers have stored values.
+            for person in self.rng.sample(self.people, len(self.people) // 4):
+                pos = person.itemPos()
+                layer.setItemProperty(
+                    person.id,
+                    "itemPos",
+                    QPointF(
+                        pos.x() + self.rng.randint(-50, 50),
+                        pos.y() + self.rng.randint(-50, 50),
+                    ),
+                )
+        return GeneratedDiagram(
+            people=self.people,
+            marriages=self.marriages,
+            events=self.events,
+            layers=layers,
+            tags=self.tags,
+        )
+
+
+def generate(spec: DiagramSpec, scene) -> GeneratedDiagram:
+    """Populate `scene`, which should be empty, with the diagram for `spec`."""
+    return _Generator(spec, scene).build()
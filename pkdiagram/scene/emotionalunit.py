@@ -8,6 +8,7 @@ class EmotionalUnit:
     def __init__(self, marriage):
         self._marriage = marriage
         self._layer = None
+        self._members = set()  # people that were added to the layer
 
     def marriage(self):
         return self._marriage
@@ -18,22 +19,49 @@ class EmotionalUnit:
     def setLayer(self, layer):
         self._layer = layer
 
+    def members(self) -> set:
+        return set(self._members)
+
+    def _isLayerInScene(self) -> bool:
+        scene = self._marriage.scene()
+        return bool(
+            self._layer
+            and scene
+            and scene.itemRegistry.get(self._layer.id) is self._layer
+        )
+
+    def _addMember(self, person):
+        layers = person.layers()
+        if self._layer.id not in layers:
+            person.setLayers(layers + [self._layer.id])
+        self._members.add(person)
+
+    def _removeMember(self, person):
+        layers = person.layers()
+        if self._layer.id in layers:
+            person.setLayers([x for x in layers if x != self._layer.id])
+        self._members.discard(person)
+
     def update(self):
         """
-        Ensure all the people are added to the layer.
+        Ensure all the people are added to the layer, or removed from it when
+        the layer is no longer in the scene.
         """
         if not self._layer:
             return
-        for person in self.people():
-            if (
-                self._layer
-                and self._marriage.scene()
-                and self._layer in self._marriage.scene().layers()  # removing
-            ):
-                if self._layer.id not in person.layers():
-                    person.setLayers(list(set(person.layers() + [self._layer.id])))
-            else:
-                person.setLayers(x for x in person.layers() if x != self._layer.id)
+        people = set(self.people()) if self._isLayerInScene() else set()
+        for person in self._members.union(self.people()) - people:
+            self._removeMember(person)
+        for person in people - self._members:
+            self._addMember(person)
+
+    def onChildAdded(self, person):
+        if self._isLayerInScene():
+            self._addMember(person)
+
+    def onChildRemoved(self, person):
+        if self._layer:
+            self._removeMember(person)
 
     def name(self) -> str:
         return self._marriage.itemName()
@@ -480,6 +480,15 @@ class FannedBox(QGraphicsObject):
         self._toRemoveAfterAnim = []
 
 
+def pathFor_Simple(personA, personB=None, pointB=None, **kwargs):
+    """A straight line between the two people for zoomed-out views."""
+    jig = Jig(personA, personB, pointB)
+    path = QPainterPath()
+    path.moveTo(jig.aP)
+    path.lineTo(jig.bP)
+    return path
+
+
 def pathFor_Conflict(
     personA, personB=None, pointB=None, withClip=False, intensity=1, **kwargs
 ):
@@ -1250,6 +1259,7 @@ class Emotion(PathItem):
         self._target: "Person | None" = target
         self._person: "Person | None" = person  # Drawing mode
         self._event: Event | None = event  # Dated mode
+        self._sortKey = None  # (event sort key, id, sort key)
         self.setEvent(event)
         self._layers = []  # cache for &.prop('layers')
         # self.hoverTimer = QTimer(self)
@@ -1280,25 +1290,25 @@ class Emotion(PathItem):
     def __lt__(self, other):
         if other.isEvent:
             return False
-        # Compare by event dateTime if events exist
-        self_dt = self._event.dateTime() if self._event else None
-        other_dt = other.sourceEvent().dateTime() if other.sourceEvent() else None
+        return self.sortKey() < other.sortKey()
 
-        if self_dt and not other_dt:
-            return True
-        elif not self_dt and other_dt:
-            return False
-        elif self_dt and other_dt:
-            return self_dt < other_dt
-        else:  # neither has dateTime
-            if self.id and not other.id:
-                return True
-            elif not self.id and other.id:
-                return False
-            elif not self.id and not other.id:
-                return True
-            else:
-                return self.id < other.id
+    def sortKey(self) -> tuple:
+        """
+        By event dateTime, then undated emotions by id. Derived from the
+        event's cached sort key, so cached until that is invalidated.
+        """
+        eventKey = self._event.sortKey() if self._event else None
+        cached = self._sortKey
+        if cached and cached[0] is eventKey and cached[1] == self.id:
+            return cached[2]
+        if eventKey and eventKey[0] == 0:
+            key = (0, eventKey[1], 0)
+        elif self.id:
+            key = (1, 0, self.id)
+        else:
+            key = (2, 0, 0)
+        self._sortKey = (eventKey, self.id, key)
+        return key
 
     def sourceEvent(self) -> Event:
         return self._event
@@ -1592,12 +1602,19 @@ class Emotion(PathItem):
             scale = util.scaleForPersonSize(size)
             if self.isDyadic():
                 self.setScale(scale)
-            path = self.pathFor(
-                self.kind(),
-                personA=self.person(),
-                personB=self.target(),
-                intensity=self.intensity(),
-            )
+            if (
+                self.isDyadic()
+                and self.scene()
+                and self.scene().levelOfDetail() < util.LOD_FULL
+            ):
+                path = pathFor_Simple(personA=self.person(), personB=self.target())
+            else:
+                path = self.pathFor(
+                    self.kind(),
+                    personA=self.person(),
+                    personB=self.target(),
+                    intensity=self.intensity(),
+                )
             if self.isDyadic():  # cutoff stays @ (0, 0)
                 if self.fannedBox:
                     offset = self.fannedBox.currentOffsetFor(self)
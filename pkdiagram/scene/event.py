@@ -15,6 +15,18 @@ if TYPE_CHECKING:
 _log = logging.getLogger(__name__)
 
 
+# Same-day events sort birth -> adopted -> death and married -> separated ->
+# divorced, everything else in between.
+KIND_SORT_RANK = {
+    EventKind.Birth.value: 0,
+    EventKind.Married.value: 0,
+    EventKind.Adopted.value: 1,
+    EventKind.Separated.value: 1,
+    EventKind.Death.value: 2,
+    EventKind.Divorced.value: 2,
+}
+
+
 class Event(Item):
     """
     Canonical way to add:
@@ -27,8 +39,12 @@ class Event(Item):
     Item.registerProperties(
         (
             # Core fields
-            {"attr": "kind", "default": EventKind.Shift.value},  # EventKind
-            {"attr": "dateTime", "type": QDateTime},
+            {
+                "attr": "kind",
+                "default": EventKind.Shift.value,
+                "onchange": "_invalidateSortKey",
+            },  # EventKind
+            {"attr": "dateTime", "type": QDateTime, "onchange": "_invalidateSortKey"},
             {"attr": "endDateTime", "type": QDateTime},
             {"attr": "dateCertainty", "type": DateCertainty, "default": None},
             {"attr": "unsure", "default": True},  # DEPRECATED: Use dateCertainty
@@ -95,6 +111,7 @@ class Event(Item):
         self._aliasParentName = None
         self._onShowAliases = False
         self._updatingDescription = False
+        self._sortKey = None
 
         # Cache person references
         self._person = person
@@ -159,71 +176,29 @@ class Event(Item):
                 prop.set(value, notify=False)
 
     def __lt__(self, other):
-        if self.dateTime() and not other.dateTime():
-            return True
-        elif not self.dateTime() and other.dateTime():
-            return False
-        elif self.dateTime() and other.dateTime():
-            return self.dateTime() < other.dateTime()
-        elif self.person() == other.person:
-            if self.person() is None:
-                return False
-            elif self.person().isPerson:
-                if self.kind() == EventKind.Birth and other.kind() == EventKind.Adopted:
-                    return True
-                elif self.kind() == EventKind.Birth and other.kind() == EventKind.Death:
-                    return True
-                elif (
-                    self.kind() == EventKind.Adopted and other.kind() == EventKind.Birth
-                ):
-                    return False
-                elif (
-                    self.kind() == EventKind.Adopted and other.kind() == EventKind.Death
-                ):
-                    return True
-                elif self.kind() == EventKind.Death and other.kind() == EventKind.Birth:
-                    return False
-                elif (
-                    self.kind() == EventKind.Death and other.kind() == EventKind.Adopted
-                ):
-                    return False
-            elif self.person().isMarriage:
-                if (
-                    self.kind() == EventKind.Married
-                    and other.kind() == EventKind.Separated
-                ):
-                    return True
-                elif (
-                    self.kind() == EventKind.Married
-                    and other.kind() == EventKind.Divorced
-                ):
-                    return True
-                elif (
-                    self.kind() == EventKind.Separated
-                    and other.kind() == EventKind.Married
-                ):
-                    return False
-                elif (
-                    self.kind() == EventKind.Separated
-                    and other.kind() == EventKind.Divorced
-                ):
-                    return True
-                elif (
-                    self.kind() == EventKind.Divorced
-                    and other.kind() == EventKind.Married
-                ):
-                    return False
-                elif (
-                    self.kind() == EventKind.Divorced
-                    and other.kind() == EventKind.Separated
-                ):
-                    return False
-        if self.kind() and not other.kind():
-            return True
-        elif not self.kind() and other.kind():
-            return True
-        else:
-            return False
+        # Without the id tiebreak, so simultaneous events still compare equal.
+        return self.sortKey()[:-1] < other.sortKey()[:-1]
+
+    def sortKey(self) -> tuple:
+        """
+        Dated events first by dateTime, then by KIND_SORT_RANK, then by id.
+        Cached until dateTime or kind change.
+        """
+        key = self._sortKey
+        if key is None or key[-1] != self.id:
+            dateTime = self.dateTime()
+            rank = KIND_SORT_RANK.get(self.prop("kind").get(), 1)
+            if dateTime:
+                key = (0, dateTime.toMSecsSinceEpoch(), rank, self.id)
+            else:
+                key = (1, 0, rank, self.id)
+            if self.id is None:
+                return key[:-1] + (-1,)
+            self._sortKey = key
+        return key
+
+    def _invalidateSortKey(self):
+        self._sortKey = None
 
     def _do_setPerson(self, person: "Person"):
         was = self.person()
@@ -232,6 +207,7 @@ class Event(Item):
         if person:
             person.onEventAdded()
         self.prop("person").set(person.id)
+        self._onPeopleChanged()
         wasDescription = self.description()
         wasNotes = self.notes()
         self.updateDescription()  # Anonymize
@@ -521,10 +497,12 @@ class Event(Item):
         self.prop("spouse").set(person.id, notify=notify, undo=undo)
         self._spouse = person
         self._marriage = self.scene().marriageFor(self._person, self._spouse)
+        self._onPeopleChanged()
 
     def setChild(self, person: "Person", notify=True, undo=False):
         self.prop("child").set(person.id, notify=notify, undo=undo)
         self._child = person
+        self._onPeopleChanged()
 
     def setRelationshipTargets(self, targets: list["Person"], notify=True, undo=False):
         if not isinstance(targets, list):
@@ -533,6 +511,7 @@ class Event(Item):
             [x.id for x in targets], notify=notify, undo=undo
         )
         self._relationshipTargets = targets
+        self._onPeopleChanged()
 
     def setRelationshipTriangles(self, triangles: list, notify=True, undo=False):
         if not isinstance(triangles, list):
@@ -541,3 +520,8 @@ class Event(Item):
         self.prop("relationshipTriangles").set(
             [x.id for x in triangles], notify=notify, undo=undo
         )
+        self._onPeopleChanged()
+
+    def _onPeopleChanged(self):
+        if self.scene():
+            self.scene().onEventPeopleChanged(self)
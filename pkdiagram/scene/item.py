@@ -4,9 +4,12 @@ import copy
 from pkdiagram.pyqt import QDateTime, QColor
 from pkdiagram import util
 from pkdiagram.scene import Property
+from pkdiagram.scene.property import PropertySpec
 
 
 CLASS_PROPERTIES = {}
+CLASS_SCHEMAS = {}  # class: [(PropertySpec, getterName, setterName, resetterName)]
+RESERVED_ATTRS = ("properties", "opacity")
 
 
 class Item:
@@ -42,6 +45,30 @@ class Item:
                 ret.append(args)
         return ret
 
+    @staticmethod
+    def classSchema(kind):
+        """
+        The compiled property declarations for `kind`, built on first use. The
+        accessor names are None where the class already defines that method.
+        """
+        schema = CLASS_SCHEMAS.get(kind)
+        if schema is None:
+            schema = []
+            for kwargs in Item.classProperties(kind):
+                attr = kwargs["attr"]
+                if attr in RESERVED_ATTRS:
+                    raise ValueError("`%s` is a reserved method name for Item" % attr)
+                Attr = attr[0].upper() + attr[1:]
+                names = [attr, "set" + Attr, "reset" + Attr]
+                schema.append(
+                    (
+                        PropertySpec(kwargs),
+                        *(None if hasattr(kind, x) else x for x in names),
+                    )
+                )
+            CLASS_SCHEMAS[kind] = schema
+        return schema
+
     @staticmethod
     def adjustedClassProperties(kind, newEntries):
         """Return a copy of the property meta data dict with newEntries added or updated."""
@@ -77,8 +104,7 @@ class Item:
         self.propertyListeners = []
         self.props = []
         self._propCache = {}
-        propAttrs = self.classProperties(self.__class__)
-        self.addProperties(propAttrs)
+        self._addSchemaProperties(self.classSchema(self.__class__))
         self._readChunk = {}  # forward compat
         self._hasDeinit = False
         #
@@ -176,6 +202,22 @@ class Item:
         """Virtual"""
         return self.__class__.__name__
 
+    def _addSchemaProperties(self, schema):
+        instanceAttrs = self.__dict__
+        for spec, getterName, setterName, resetterName in schema:
+            p = Property(self, spec)
+            if getterName and getterName not in instanceAttrs:
+                if spec.layered or spec.isEnum:
+                    instanceAttrs[getterName] = p.get
+                else:
+                    instanceAttrs[getterName] = p.getValue
+            if setterName and setterName not in instanceAttrs:
+                instanceAttrs[setterName] = p.set
+            if resetterName and resetterName not in instanceAttrs:
+                instanceAttrs[resetterName] = p.reset
+            self.props.append(p)
+            self._propCache[spec.attr] = p
+
     def addProperties(self, meta):
         """append to property list: [
             { 'attr': 'married', 'type': bool, 'default': True, 'update': True },
@@ -138,7 +138,7 @@ class ItemDetails(PathItem):
     def onVisibleSizeChanged(self, view, visibleSceneRectRatio):
         """Hiding here trumps all other conditions."""
         ratio = visibleSceneRectRatio * self.parentItem().scale()
-        if ratio <= 0.28:
+        if ratio <= util.HIDE_DETAILS_RATIO:
             self._shouldHideForSmallSize = True
         else:
             self._shouldHideForSmallSize = False
@@ -15,7 +15,7 @@ class Layer(Item):
 
     Item.registerProperties(
         (
-            {"attr": "name"},
+            {"attr": "name", "onchange": "_invalidateSortKey"},
             {"attr": "description"},
             {"attr": "order", "type": int, "default": -1},
             {"attr": "notes"},
@@ -33,6 +33,7 @@ class Layer(Item):
         self.isLayer = True
         self._emotionalUnit = None
         self._scene = kwargs.get("scene")
+        self._sortKey = None
         if not "itemProperties" in kwargs:  # avoid shared default value instance
             self.prop("itemProperties").set({}, notify=False)
         if not self.internal() and "storeGeometry" not in kwargs:
@@ -42,13 +43,17 @@ class Layer(Item):
         return super().__repr__(exclude="itemProperties")
 
     def __lt__(self, other):
-        if self.name() is not None and other.name() is None:
-            return True
-        elif self.name() is None and other.name() is not None:
-            return False
-        elif self.name() is None and other.name() is None:
-            return True
-        return self.name() < other.name()
+        return self.sortKey() < other.sortKey()
+
+    def sortKey(self) -> tuple:
+        """Named layers first, by name. Cached until name changes."""
+        if self._sortKey is None:
+            name = self.name()
+            self._sortKey = (1, "") if name is None else (0, name)
+        return self._sortKey
+
+    def _invalidateSortKey(self):
+        self._sortKey = None
 
     def setEmotionalUnit(self, emotionalUnit):
         self._emotionalUnit = emotionalUnit
@@ -92,6 +92,7 @@ class Marriage(PathItem):
     # eventChanged = pyqtSignal(Property)
 
     ITEM_Z = util.MARRIAGE_Z
+    SPATIALLY_INDEXED = True
 
     @staticmethod
     def personConnectionPoint(person):
@@ -145,6 +146,7 @@ class Marriage(PathItem):
         self.people = [personA, personB]
         self._emotionalUnit = EmotionalUnit(self)
         self._events = None
+        self._sortKey = None  # (birth event sort keys, sort key)
         self._aliasNotes = None
         self._onShowAliases = False
         self.children = (
@@ -166,14 +168,36 @@ class Marriage(PathItem):
 
     def __lt__(self, other) -> bool:
         """Sort by the older person's birthdate."""
-        if self.olderBirth() and other.olderBirth():
-            return self.olderBirth() < other.olderBirth()
-        elif self.olderBirth():
-            return False
-        elif other.olderBirth():
-            return True
-        else:
-            return False
+        return self.sortKey() < other.sortKey()
+
+    def sortKey(self) -> tuple:
+        """
+        Pair-bonds without any birth date sort first. Derived from the cached
+        sort keys of the birth events olderBirth() looks at, so cached until
+        one of those is invalidated or the birth events themselves change.
+        """
+
+        def birthKey(person):
+            event = person.birthEvent() if person else None
+            return event.sortKey() if event else None
+
+        def isDated(key):
+            return key is not None and key[0] == 0
+
+        births = [birthKey(x) for x in self.people]
+        if not any(isDated(x) for x in births):
+            births.extend(birthKey(x) for x in self.children)
+        cached = self._sortKey
+        if (
+            cached
+            and len(cached[0]) == len(births)
+            and all(a is b for a, b in zip(cached[0], births))
+        ):
+            return cached[1]
+        dated = [x[1] for x in births if isDated(x)]
+        key = (1, min(dated)) if dated else (0, 0)
+        self._sortKey = (births, key)
+        return key
 
     def olderBirth(self) -> QDateTime:
         personADT = self.people[0].birthDateTime()
@@ -420,10 +444,12 @@ class Marriage(PathItem):
             self.children = sorted(
                 self.children, key=lambda x: x.id is not None and x.id or 0
             )
+            self._emotionalUnit.onChildAdded(c)
 
     def _onRemoveChild(self, c):
         if c in self.children:
             self.children.remove(c)
+            self._emotionalUnit.onChildRemoved(c)
 
     def onProperty(self, prop):
         if prop.name() == "notes":
@@ -543,7 +569,8 @@ class Marriage(PathItem):
         # Compile Dates
         if not self.hideDates():
             all_events = sorted(
-                [event for events in self._events.values() for event in events]
+                [event for events in self._events.values() for event in events],
+                key=Event.sortKey,
             )
             for event in all_events:
                 kind = event.kind()
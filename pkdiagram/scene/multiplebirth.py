@@ -6,6 +6,8 @@ from .childof import ChildOf
 
 class MultipleBirth(PathItem):
 
+    SPATIALLY_INDEXED = True
+
     @staticmethod
     def pathFor(children, marriage):
         path = QPainterPath()
@@ -50,6 +50,9 @@ class PathItem(PathItemBase, Item, ItemAnimationHelper):
 
     # ITEM_Z = 0
 
+    # Kept in Scene.spatialIndex() for the typed Scene.*Under() queries.
+    SPATIALLY_INDEXED = False
+
     Item.registerProperties(
         (
             # `itemPos` is what is stored in the file. It has a different name
@@ -227,6 +230,21 @@ class PathItem(PathItemBase, Item, ItemAnimationHelper):
         #     #     # should only be when dragging.
         #     #     self.setItemPos(value, notify=False)
         #     #     self.here(value)
+        if self.SPATIALLY_INDEXED:
+            if change == QGraphicsItem.ItemSceneChange:
+                index = self._spatialIndex()
+                if index:
+                    index.remove(self)
+            elif change == QGraphicsItem.ItemSceneHasChanged:
+                index = self._spatialIndex()
+                if index:
+                    index.add(self)
+            elif change in (
+                QGraphicsItem.ItemPositionHasChanged,
+                QGraphicsItem.ItemScaleHasChanged,
+                QGraphicsItem.ItemParentHasChanged,
+            ):
+                self._markSpatiallyDirty()
         if change == QGraphicsItem.ItemSelectedHasChanged:
             # Disabled for performance
             # if value:
@@ -244,6 +262,20 @@ class PathItem(PathItemBase, Item, ItemAnimationHelper):
             #     self.setZValue(self.ITEM_Z)
         return super().itemChange(change, value)
 
+    def setPath(self, path):
+        super().setPath(path)
+        if self.SPATIALLY_INDEXED:
+            self._markSpatiallyDirty()
+
+    def _spatialIndex(self):
+        getter = getattr(self.scene(), "spatialIndex", None)
+        return getter() if getter else None
+
+    def _markSpatiallyDirty(self):
+        index = self._spatialIndex()
+        if index:
+            index.markDirty(self)
+
     ## Internal Data
 
     def notesIconPos(self):
@@ -312,6 +344,10 @@ class PathItem(PathItemBase, Item, ItemAnimationHelper):
         self._n_updatePen = 0
         self._n_updateDetails = 0
 
+    def onLevelOfDetailChanged(self):
+        """Virtual. The scene's levelOfDetail() crossed a threshold."""
+        self.updateGeometry()
+
     def onUpdateAll(self):
         """Virtual"""
         self._n_onUpdateAll += 1
@@ -383,11 +419,11 @@ class PathItem(PathItemBase, Item, ItemAnimationHelper):
 
     def updateDetails(self):
         """Virtual"""
-        self._n_updateDetails = 0
+        self._n_updateDetails += 1
 
     def updatePen(self):
         """Virtual"""
-        self._n_updatePen = 0
+        self._n_updatePen += 1
 
     def mouseReleaseEvent(self, e):
         """double click edit"""
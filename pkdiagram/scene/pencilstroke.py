@@ -1,3 +1,7 @@
+import sys
+import math
+from array import array
+
 from _pkdiagram import CUtil
 from pkdiagram.pyqt import (
     QGraphicsRectItem,
@@ -5,38 +9,102 @@ from pkdiagram.pyqt import (
     QGraphicsItem,
     Qt,
     QColor,
+    QImage,
     QMarginsF,
     QRectF,
     QPen,
     QPoint,
+    QPointF,
     QRect,
-    qAlpha,
+    QPainterPath,
 )
 from pkdiagram import util
 from pkdiagram.scene import LayerItem
 
 
 def bbox(p):
-    """bounding-box-of-an-image"""
-    l = p.width()
-    t = p.height()
+    """bounding-box-of-an-image
+
+    Scans the alpha channel a row at a time with bytes operations instead of
+    calling QImage.pixel() per pixel.
+    """
+    image = p.convertToFormat(QImage.Format_ARGB32)
+    width, height = image.width(), image.height()
+    stride = image.bytesPerLine()
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    data = ptr.asstring()
+    # ARGB32 is stored as native-endian 32-bit ints, i.e. BGRA on little-endian.
+    alphaOffset = 3 if sys.byteorder == "little" else 0
+    l = width
+    t = height
     r = 0
     b = 0
-
-    for y in range(p.height()):
-        rowFilled = False
-        for x in range(p.width()):
-            if qAlpha(p.pixel(x, y)):
-                rowFilled = True
-                r = max(r, x)
-                if l > x:
-                    l = x
-        if rowFilled:
-            t = min(t, y)
-            b = y
+    for y in range(height):
+        row = data[y * stride + alphaOffset : y * stride + width * 4 : 4]
+        filled = row.lstrip(b"\0")
+        if not filled:
+            continue
+        l = min(l, width - len(filled))
+        r = max(r, len(row.rstrip(b"\0")) - 1)
+        t = min(t, y)
+        b = y
     return QRect(QPoint(l, t), QPoint(r, b))
 
 
+def packPoints(points) -> array:
+    """Flatten QPointF's into a packed array of x, y doubles."""
+    ret = array("d")
+    for p in points:
+        ret.append(p.x())
+        ret.append(p.y())
+    return ret
+
+
+def unpackPoints(packed: array) -> list:
+    return [QPointF(packed[i], packed[i + 1]) for i in range(0, len(packed), 2)]
+
+
+def simplifyPoints(packed: array, tolerance: float) -> array:
+    """
+    Ramer-Douglas-Peucker simplification of packed x, y pairs, keeping the
+    points that are further than `tolerance` from the line between their
+    kept neighbors. Iterative so that long strokes don't hit the recursion
+    limit.
+    """
+    n = len(packed) // 2
+    if n < 3:
+        return array("d", packed)
+    keep = bytearray(n)
+    keep[0] = keep[n - 1] = 1
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        x1, y1 = packed[2 * first], packed[2 * first + 1]
+        x2, y2 = packed[2 * last], packed[2 * last + 1]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        maxDist, index = 0.0, 0
+        for i in range(first + 1, last):
+            px, py = packed[2 * i], packed[2 * i + 1]
+            if length:
+                dist = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / length
+            else:
+                dist = math.hypot(px - x1, py - y1)
+            if dist > maxDist:
+                maxDist, index = dist, i
+        if maxDist > tolerance:
+            keep[index] = 1
+            stack.append((first, index))
+            stack.append((index, last))
+    ret = array("d")
+    for i in range(n):
+        if keep[i]:
+            ret.append(packed[2 * i])
+            ret.append(packed[2 * i + 1])
+    return ret
+
+
 class PencilStroke(LayerItem):
 
     class Canvas(QGraphicsRectItem):
@@ -65,6 +133,7 @@ class PencilStroke(LayerItem):
             if parentItem:
                 self.item.setParentItem(parentItem)
             self.scene().addItem(self.item, undo=True)
+            self.item.beginDrawing()
             self.item.addPoint(pos)
 
         def drawTo(self, pos, pressure):
@@ -73,6 +142,8 @@ class PencilStroke(LayerItem):
         def finish(self):
             ret = self.item
             self.item = None
+            if ret:
+                ret.endDrawing()
             return ret
 
         def setScale(self, x):
@@ -91,11 +162,15 @@ class PencilStroke(LayerItem):
         ({"attr": "points", "type": list, "onset": "updateGeometry"},)
     )
 
+    SIMPLIFY_TOLERANCE = 0.5  # item coordinates
+
     def __init__(self, **kwargs):
         super().__init__()
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
         self.isPencilStroke = True
         self.selectionOutline = None
+        self._samples = None  # packed x, y while drawing
+        self._drawPath = None
         self.setProperties(**kwargs)
         if not "points" in kwargs:  # avoid all scene using same default [] object
             self.setPoints([], notify=False, undo=False)
@@ -116,9 +191,54 @@ class PencilStroke(LayerItem):
     def itemName(self):
         return "Pencil Stroke"
 
+    def isDrawing(self):
+        return self._samples is not None
+
+    def beginDrawing(self):
+        """
+        Collect points in a packed array and extend the path one segment at
+        a time until endDrawing() instead of rebuilding the spline per point.
+        """
+        self._samples = packPoints(self.points())
+        self._drawPath = QPainterPath()
+        for i in range(0, len(self._samples), 2):
+            self._extendDrawPath(i)
+
+    def endDrawing(self):
+        """Simplify the drawn points and build the final spline once."""
+        if self._samples is None:
+            return
+        samples = simplifyPoints(self._samples, self.SIMPLIFY_TOLERANCE)
+        self._samples = None
+        self._drawPath = None
+        self.setPoints(unpackPoints(samples), notify=False, undo=False)
+        self.updateGeometry()
+
+    def _extendDrawPath(self, i):
+        """Smooth through midpoints so each new sample only adds one quad."""
+        samples = self._samples
+        p = QPointF(samples[i], samples[i + 1])
+        if i == 0:
+            self._drawPath.moveTo(p)
+            return
+        prev = QPointF(samples[i - 2], samples[i - 1])
+        mid = (prev + p) / 2
+        if i == 2:
+            self._drawPath.lineTo(mid)
+        else:
+            self._drawPath.quadTo(prev, mid)
+
     def addPoint(self, p):
         if self.parentItem() or self.scale() != 1.0:
             p = self.mapFromScene(p)
+        if self._samples is not None:
+            self._samples.append(p.x())
+            self._samples.append(p.y())
+            self._extendDrawPath(len(self._samples) - 2)
+            path = QPainterPath(self._drawPath)
+            path.lineTo(p)
+            self.setPath(path)
+            return
         self.points().append(p)
         self.updateGeometry()
 
@@ -152,6 +272,8 @@ class PencilStroke(LayerItem):
         return super().itemChange(change, variant)
 
     def updateGeometry(self):
+        if self._samples is not None:
+            return  # path is built incrementally by addPoint()
         super().updateGeometry()
         path = CUtil.splineFromPoints(self.points())
         # if self.isSelected():
@@ -274,6 +274,7 @@ class Person(PathItem):
     fileAdded = pyqtSignal(str)
 
     ITEM_Z = util.PERSON_Z
+    SPATIALLY_INDEXED = True
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -1232,7 +1233,12 @@ class Person(PathItem):
             currentDateTime = self.scene().currentDateTime()
         else:
             currentDateTime = QDateTime()
-        if self.scene() and self.scene().hideSARFGraphics():
+        simple = self.scene() and self.scene().levelOfDetail() < util.LOD_FULL
+        # Zoomed out, paint from a pixmap so that panning only blits.
+        self.setCacheMode(
+            QGraphicsItem.DeviceCoordinateCache if simple else QGraphicsItem.NoCache
+        )
+        if simple or (self.scene() and self.scene().hideSARFGraphics()):
             anxiety = None
             functioning = None
             symptom = None
@@ -1582,22 +1588,18 @@ class Person(PathItem):
                     * self.mouseDownSceneBoundingRect.height()
                 )
                 snapTo = None
-                diffs = []
-                for other in self.scene().people():
-                    if (
+                # TODO: don't use Person.boundingRect() because we want to ignore the outer shape when `primary`
+                nearest = self.scene().spatialIndex().nearestTop(
+                    rectWouldBe.y(),
+                    Person,
+                    accept=lambda other: (
                         other is not self
                         and not other.isSelected()
                         and other.isVisible()
-                    ):
-                        # TODO: don't use Person.boundingRect() because we want to ignore the outer shape when `primary`
-                        _otherSceneRect = other.mapToScene(
-                            other.boundingRect()
-                        ).boundingRect()
-                        diff = abs(_otherSceneRect.y() - rectWouldBe.y())
-                        diffs.append((other, _otherSceneRect, diff))
-                if diffs:
-                    diffs = sorted(diffs, key=lambda x: x[2])
-                    other, _otherSceneRect, diff = diffs[0]
+                    ),
+                )
+                if nearest:
+                    other, _otherSceneRect, diff = nearest
                     if diff < THRESHOLD:
                         otherSceneRect = _otherSceneRect
                         snapTo = other  # sync frames after pos has changed
@@ -1,60 +1,144 @@
 import copy
+import math
+import itertools
 from enum import Enum
 
+from pkdiagram.pyqt import QDate, QDateTime
 
-class Property:
-    """Track changes and automatically write to file."""
 
-    _nextId = 0
+def sortKeyFor(value):
+    """Dates as numbers, everything else as is."""
+    if isinstance(value, QDateTime):
+        return value.toMSecsSinceEpoch() if value else -math.inf
+    elif isinstance(value, QDate):
+        return value.toJulianDay() if value else -math.inf
+    return value
 
-    @staticmethod
-    def sortBy(stuff, attr):
-        default = 0
-        for item in stuff:
-            x = getattr(item, attr)()
-            if x is not None:
-                default = type(x)()
-                break
 
-        def getKey(x):
-            y = getattr(x, attr)()
-            if y is not None:
-                return y
-            else:
-                return default
+class PropertySpec:
+    """
+    The parts of a Property that are the same for every instance of a class,
+    worked out once per property declaration instead of once per item.
+    """
 
-        return sorted(stuff, key=getKey)
+    __slots__ = (
+        "kwargs",
+        "attr",
+        "onset",
+        "onchange",
+        "default",
+        "callDefault",
+        "copyDefault",
+        "isDynamic",
+        "strip",
+        "layered",
+        "notify",
+        "type",
+        "isEnum",
+        "enumMembers",
+        "layerIgnoreAttr",
+    )
 
-    def __init__(self, item, **kwargs):
-        super().__init__()
-        self._kwargs = kwargs
-        self._id = Property._nextId
-        Property._nextId = Property._nextId + 1
-        self.item = item
-        self.isDynamic = False
+    def __init__(self, kwargs):
+        kwargs = dict(kwargs)
+        self.kwargs = kwargs
         self.attr = kwargs["attr"]
         self.onset = kwargs.get("onset", None)
+        # Called whenever the stored value changes, even with notify=False,
+        # e.g. to drop values cached on the item.
+        self.onchange = kwargs.get("onchange", None)
         self.default = kwargs.get("default", None)
-        if callable(self.default):
-            self.default = self.default()
-        if isinstance(self.default, (list, dict)):
-            self.default = copy.deepcopy(self.default)
+        self.callDefault = callable(self.default)
+        default = self.default
+        if self.callDefault and "type" not in kwargs:
+            default = self.default()
+        self.copyDefault = isinstance(default, (list, dict))
         self.isDynamic = kwargs.get("dynamic", False)
-        self._value = None
-        self._currentLayerValue = None
-        self._usingLayer = False  # updated on activeLayersChanged
-        self._activeLayers = []
-        self._isResetting = False
         self.strip = kwargs.get("strip", False)
         self.layered = kwargs.get("layered", False)
         self.notify = kwargs.get("notify", True)
         if "type" in kwargs:
             self.type = kwargs["type"]
         else:
-            self.type = "default" in kwargs and type(self.default) or str
+            self.type = "default" in kwargs and type(default) or str
             kwargs["type"] = self.type
         # Detect if type is an Enum subclass - store as string, convert on get/set
-        self._isEnum = isinstance(self.type, type) and issubclass(self.type, Enum)
+        self.isEnum = isinstance(self.type, type) and issubclass(self.type, Enum)
+        self.enumMembers = self.type._value2member_map_ if self.isEnum else None
+        self.layerIgnoreAttr = kwargs.get("layerIgnoreAttr")
+
+    def newDefault(self):
+        """A default value that the new property can own."""
+        if self.callDefault:
+            default = self.default()
+            if isinstance(default, (list, dict)):
+                default = copy.deepcopy(default)
+            return default
+        default = self.default
+        if self.copyDefault:
+            default = copy.deepcopy(default) if default else type(default)()
+        return default
+
+
+class Property:
+    """Track changes and automatically write to file."""
+
+    __slots__ = (
+        "_spec",
+        "_id",
+        "item",
+        "attr",
+        "onset",
+        "default",
+        "type",
+        "isDynamic",
+        "strip",
+        "layered",
+        "notify",
+        "_isEnum",
+        "_value",
+        "_currentLayerValue",
+        "_usingLayer",
+        "_activeLayers",
+        "_isResetting",
+    )
+
+    _ids = itertools.count()
+
+    @staticmethod
+    def sortBy(stuff, attr):
+        """Sort by the value of each item's `attr` getter, called once per item."""
+        stuff = list(stuff)
+        values = [getattr(item, attr)() for item in stuff]
+        default = 0
+        for x in values:
+            if x is not None:
+                default = type(x)()
+                break
+        keys = [sortKeyFor(default if x is None else x) for x in values]
+        order = sorted(range(len(stuff)), key=keys.__getitem__)
+        return [stuff[i] for i in order]
+
+    def __init__(self, item, spec=None, **kwargs):
+        if spec is None:
+            spec = PropertySpec(kwargs)
+        self._spec = spec
+        self._id = next(Property._ids)
+        self.item = item
+        self.attr = spec.attr
+        self.onset = spec.onset
+        self.default = spec.newDefault()
+        self.type = spec.type
+        self.isDynamic = spec.isDynamic
+        self.strip = spec.strip
+        self.layered = spec.layered
+        self.notify = spec.notify
+        self._isEnum = spec.isEnum
+        self._value = None
+        self._currentLayerValue = None
+        self._usingLayer = False  # updated on activeLayersChanged
+        self._activeLayers = ()
+        self._isResetting = False
 
     def __repr__(self):
         s = str(self.get()).replace("PyQt5.QtCore.", "")
@@ -66,7 +150,7 @@ class Property:
         return self.attr
 
     def kwargs(self):
-        return self._kwargs
+        return self._spec.kwargs
 
     def deinit(self):
         """For circular refs."""
@@ -77,6 +161,10 @@ class Property:
 
     def setLayered(self, on):
         self.layered = on
+        if on and self.item is not None:
+            # Item.addProperties() may have bound the non-layered getter.
+            if getattr(self.item, self.attr, None) == self.getValue:
+                setattr(self.item, self.attr, self.get)
 
     def isset(self):
         return self.get() != self.default
@@ -135,9 +223,22 @@ class Property:
 
     def get(self, forLayers=None):
         """Get value, converting to enum if applicable."""
-        ret = self.getRaw(forLayers)
+        if self.layered and (forLayers or (self._usingLayer and forLayers != [])):
+            ret = self.getRaw(forLayers)
+        else:
+            ret = self._value
+            if ret is None:
+                ret = self.default
         if self._isEnum and ret is not None:
-            ret = self.type(ret)
+            member = self._spec.enumMembers.get(ret)
+            ret = member if member is not None else self.type(ret)
+        return ret
+
+    def getValue(self, forLayers=None):
+        """get() for properties that are neither layered nor enums."""
+        ret = self._value
+        if ret is None:
+            ret = self.default
         return ret
 
     def _do_set(self, x, notify=True, forLayers=None, force=False):
@@ -169,8 +270,8 @@ class Property:
                 layers = self._activeLayers
             else:
                 layers = forLayers
-            if layers and self._kwargs.get("layerIgnoreAttr"):
-                layerIgnoreAttr = self._kwargs.get("layerIgnoreAttr")
+            layerIgnoreAttr = self._spec.layerIgnoreAttr
+            if layers and layerIgnoreAttr:
                 layers = [
                     layer for layer in layers if getattr(layer, layerIgnoreAttr)()
                 ]
@@ -186,10 +287,10 @@ class Property:
             else:
                 self._value = y
                 appliesRightNow = True
+            if appliesRightNow and self._spec.onchange:
+                getattr(self.item, self._spec.onchange)()
             if self.notify and notify and appliesRightNow:
-                self.item.onProperty(self)
-                if self.onset and hasattr(self.item, self.onset):
-                    getattr(self.item, self.onset)()
+                self._notify()
             return True
         else:
             return False
@@ -214,12 +315,25 @@ class Property:
             self._usingLayer = False
         else:
             self._value = None
+        if self._spec.onchange:
+            getattr(self.item, self._spec.onchange)()
         if self.notify and notify:
-            self.item.onProperty(self)
-            if self.onset and hasattr(self.item, self.onset):
-                getattr(self.item, self.onset)()
+            self._notify()
         self._isResetting = False
 
+    def _notify(self):
+        scene = self.scene()
+        if scene and scene.isDeferringNotifications():
+            scene.deferNotification(self)
+        else:
+            self.notifyChanged()
+
+    def notifyChanged(self):
+        """Called by Scene for deferred notifications."""
+        self.item.onProperty(self)
+        if self.onset and hasattr(self.item, self.onset):
+            getattr(self.item, self.onset)()
+
     def reset(self, notify=True, undo=False):
         if undo:
             from pkdiagram.scene.commands import ResetProperty
@@ -62,6 +62,7 @@ from pkdiagram.scene import (
     Callout,
     ItemGarbage,
     ItemDetails,
+    SpatialIndex,
     clipboard,
 )
 from pkdiagram.scene.commands import (
@@ -74,7 +75,9 @@ from pkdiagram.scene.commands import (
     RemoveEventProperty,
     SetItemPos,
     SetLayerOrder,
+    UndoHistory,
 )
+from pkdiagram.scene import updateprofiler
 
 
 AUTO_PENCIL_MODE = True
@@ -160,6 +163,7 @@ class Scene(QGraphicsScene, Item):
     showNotes = pyqtSignal(PathItem)
     itemDoubleClicked = pyqtSignal(PathItem)
     finishedBatchAddingRemovingItems = pyqtSignal()
+    canUndoChanged = pyqtSignal(bool)
 
     Item.registerProperties(
         (
@@ -238,6 +242,9 @@ class Scene(QGraphicsScene, Item):
         self.isDeinitializing = False
         self.isInitializing = True
         self._batchAddRemoveStackLevel = 0
+        self._deferNotificationsLevel = 0
+        self._deferredProps = {}  # id(prop): prop, in order of first change
+        self._deferredCalls = {}  # (func, args): None
         self._updatingAll = (
             False  # indicates a static update is occuring, i.e. no animations, etc
         )
@@ -247,6 +254,10 @@ class Scene(QGraphicsScene, Item):
         #
         self._isUndoRedoing = False
         self._undoStack = QUndoStack(self)
+        self._undoHistory = UndoHistory(self._undoStack)
+        self._canUndo = False
+        self._undoStack.indexChanged.connect(self._updateCanUndo)
+        self._undoStack.canUndoChanged.connect(self._updateCanUndo)
         #
         self.dragStartItem = None
         self.dragCreateItem = None
@@ -260,10 +271,13 @@ class Scene(QGraphicsScene, Item):
         self.itemRegistry = {}
         self._people = []
         self._events = []
+        self._eventsByPerson = None  # Person: [Event], built by eventsFor()
+        self._indexedPeople = {}  # Event: the people it is indexed under
         self._marriages = []
         self._emotions = []
         self._layerItems = []
         self._itemDetails = []
+        self._spatialIndex = SpatialIndex()
         self._layers = []
         self._activeLayers = []
         self._activeTags = []
@@ -275,6 +289,7 @@ class Scene(QGraphicsScene, Item):
         self._isDraggingSomething = False
         self.clipboard = None
         self._printRect = QRectF()
+        self._levelOfDetail = util.LOD_FULL
 
         # snap
         self.canSnapDrag = False
@@ -344,6 +359,32 @@ class Scene(QGraphicsScene, Item):
         else:
             return False
 
+    def levelOfDetail(self) -> int:
+        return self._levelOfDetail
+
+    def setLevelOfDetail(self, lod: int):
+        """Set by the view as it zooms across util.LOD_SIMPLE_RATIO."""
+        if lod == self._levelOfDetail:
+            return
+        self._levelOfDetail = lod
+        for item in self.people() + self.emotions():
+            item.onLevelOfDetailChanged()
+
+    @contextlib.contextmanager
+    def fullDetail(self):
+        """Full detail for the duration, whatever the view's zoom."""
+        was = self._levelOfDetail
+        self.setLevelOfDetail(util.LOD_FULL)
+        try:
+            yield
+        finally:
+            self.setLevelOfDetail(was)
+
+    def render(self, *args, **kwargs):
+        """Exports and printing always get full detail."""
+        with self.fullDetail():
+            super().render(*args, **kwargs)
+
     def setScaleFactor(self, *args, **kwargs):
         if self.activeTriangle():
             return
@@ -443,6 +484,7 @@ class Scene(QGraphicsScene, Item):
                 item.parents().emotionalUnit().update()
         elif item.isEvent:
             self._events.append(item)
+            self._indexEvent(item)
             if firstTimeAdding and item.relationshipTargets():
                 peopleToUpdate = set()
                 for target in item.relationshipTargets():
@@ -669,6 +711,7 @@ class Scene(QGraphicsScene, Item):
 
             if event in self._events:
                 self._events.remove(event)
+                self._unindexEvent(event)
                 removed_events.append(event)
                 # Deregister from itemRegistry
                 _deregisterItem(event)
@@ -772,14 +815,8 @@ class Scene(QGraphicsScene, Item):
                 # If no children remain, remove the MultipleBirth
                 elif len(remainingChildren) == 0:
                     self.removeItem(multipleBirth)
-            marriage = item.parents()
-            if marriage.scene():  # Marriage might already be removed
-                layer = marriage.emotionalUnit().layer()
-                item.person.setLayers(
-                    [x for x in item.person.layers() if x != layer.id]
-                )
-                marriage.emotionalUnit().update()
-            # Remove the person from the marriage's children list
+            # Remove the person from the marriage's children list, which also
+            # removes them from its emotional unit's layer.
             item.parents()._onRemoveChild(item.person)
             # Clear the person's childOf reference
             item.person.childOf = None
@@ -788,7 +825,13 @@ class Scene(QGraphicsScene, Item):
             _removeFromGraphicsScene(item)
         elif item.isLayer:
             # Remove layer from all items that reference it
-            for sceneItem in self.itemRegistry.values():
+            if item.emotionalUnit():
+                # Only the people in an emotional unit are on its layer.
+                emotionalUnit = item.emotionalUnit()
+                referrers = emotionalUnit.members() | set(emotionalUnit.people())
+            else:
+                referrers = list(self.itemRegistry.values())
+            for sceneItem in referrers:
                 if hasattr(sceneItem, "layers") and callable(sceneItem.layers):
                     layersList = sceneItem.layers()
                     if item.id in layersList:
@@ -2017,12 +2060,12 @@ class Scene(QGraphicsScene, Item):
         without them.
         """
         if isinstance(item, Person):
-            events = [x for x in self._events if item in x.people()]
+            events = list(self._eventsIndex().get(item, ()))
         elif isinstance(item, Marriage):
             personA, personB = item.personA(), item.personB()
             events = [
                 x
-                for x in self._events
+                for x in self._eventsIndex().get(personA, ())
                 if x.kind().isPairBond()
                 and {x.person(), x.spouse()} == {personA, personB}
             ]
@@ -2035,7 +2078,42 @@ class Scene(QGraphicsScene, Item):
             else:
                 events = [e for e in events if e.kind() == kinds]
 
-        return sorted(events)
+        return sorted(events, key=Event.sortKey)
+
+    def _eventsIndex(self) -> dict:
+        """
+        The events for each person, kept up to date as events are added,
+        removed, and change their people.
+        """
+        if self._eventsByPerson is None:
+            self._eventsByPerson = {}
+            self._indexedPeople = {}
+            for event in self._events:
+                self._indexEvent(event)
+        return self._eventsByPerson
+
+    def _indexEvent(self, event: Event):
+        if self._eventsByPerson is not None:
+            people = event.people()
+            self._indexedPeople[event] = people
+            for person in people:
+                self._eventsByPerson.setdefault(person, []).append(event)
+
+    def _unindexEvent(self, event: Event):
+        if self._eventsByPerson is not None:
+            # The people it was indexed under, which may no longer be its own.
+            for person in self._indexedPeople.pop(event, ()):
+                events = self._eventsByPerson.get(person)
+                if events and event in events:
+                    events.remove(event)
+                    if not events:
+                        del self._eventsByPerson[person]
+
+    def onEventPeopleChanged(self, event: Event):
+        """Called by Event when the people it refers to change."""
+        if event in self._indexedPeople:
+            self._unindexEvent(event)
+            self._indexEvent(event)
 
     def marriageFor(self, personA: Person, personB: Person) -> Marriage | None:
         for m in self._marriages:
@@ -2100,34 +2178,31 @@ class Scene(QGraphicsScene, Item):
             if item.flags() & QGraphicsItem.ItemIsSelectable:
                 return item
 
+    def spatialIndex(self) -> SpatialIndex:
+        return self._spatialIndex
+
     def itemUnder(self, pos, type=None, types=None):
         if type is not None:
             types = (type,)
         else:
             types = tuple(types)
+        if all(getattr(x, "SPATIALLY_INDEXED", False) for x in types):
+            return self._spatialIndex.itemAt(pos, types)
         for item in self.items(pos):
             if isinstance(item, types):
                 return item
 
     def personUnder(self, pos):
-        for item in self.items(pos):
-            if isinstance(item, Person):
-                return item
+        return self._spatialIndex.itemAt(pos, Person)
 
     def marriageUnder(self, pos):
-        for item in self.items(pos):
-            if isinstance(item, Marriage):
-                return item
+        return self._spatialIndex.itemAt(pos, Marriage)
 
     def childOfUnder(self, pos):
-        for item in self.items(pos):
-            if isinstance(item, ChildOf):
-                return item
+        return self._spatialIndex.itemAt(pos, ChildOf)
 
     def multipleBirthUnder(self, pos):
-        for item in self.items(pos):
-            if isinstance(item, MultipleBirth):
-                return item
+        return self._spatialIndex.itemAt(pos, MultipleBirth)
 
     def selectedPeople(self):
         return [i for i in self.selectedItems() if isinstance(i, Person)]
@@ -2179,16 +2254,39 @@ class Scene(QGraphicsScene, Item):
     def stack(self) -> QUndoStack:
         return self._undoStack
 
+    def undoHistory(self) -> UndoHistory:
+        return self._undoHistory
+
+    def setUndoLimits(self, maxBytes=None, maxCommands=None):
+        self._undoHistory.setLimits(maxBytes=maxBytes, maxCommands=maxCommands)
+        self._updateCanUndo()
+
+    def canUndo(self) -> bool:
+        """Use instead of stack().canUndo(), which counts evicted commands."""
+        return self._canUndo
+
+    def _updateCanUndo(self, *args):
+        canUndo = self._undoHistory.canUndo()
+        if canUndo != self._canUndo:
+            self._canUndo = canUndo
+            self.canUndoChanged.emit(canUndo)
+
     def push(self, cmd: QUndoCommand):
         with self._undoRedoing():
             self._undoStack.push(cmd)
+        self._undoHistory.record(cmd)
+        self._updateCanUndo()
 
     def undo(self):
-        with self._undoRedoing():
+        if not self.canUndo():
+            return
+        defer = self._undoHistory.defersNotifications(self._undoStack.index() - 1)
+        with self._undoRedoing(), self.deferringNotifications(defer):
             self._undoStack.undo()
 
     def redo(self):
-        with self._undoRedoing():
+        defer = self._undoHistory.defersNotifications(self._undoStack.index())
+        with self._undoRedoing(), self.deferringNotifications(defer):
             self._undoStack.redo()
 
     @contextlib.contextmanager
@@ -2211,14 +2309,22 @@ class Scene(QGraphicsScene, Item):
         return self._isUndoRedoing
 
     @contextlib.contextmanager
-    def macro(self, text, undo=True, batchAddRemove=False):
+    def macro(self, text, undo=True, batchAddRemove=False, deferNotifications=False):
+        """
+        `deferNotifications`: Deliver property notifications once per
+        property when the macro ends, for bulk edits on many items. See
+        deferringNotifications().
+        """
         if batchAddRemove:
             was = self.isBatchAddingRemovingItems()
             self.setBatchAddingRemovingItems(True)
         else:
             was = None
+        if deferNotifications:
+            self._deferNotificationsLevel += 1
         if undo:
             self._undoStack.beginMacro(text)
+            self._undoHistory.beginMacro(deferNotifications)
         _e = None
 
         try:
@@ -2228,11 +2334,67 @@ class Scene(QGraphicsScene, Item):
 
         if undo:
             self._undoStack.endMacro()
+            self._undoHistory.endMacro()
+            self._updateCanUndo()
+        if deferNotifications:
+            self._deferNotificationsLevel -= 1
+            if self._deferNotificationsLevel == 0:
+                self._flushNotifications()
         if batchAddRemove:
             self.setBatchAddingRemovingItems(was)
         if _e:
             raise _e
 
+    @contextlib.contextmanager
+    def deferringNotifications(self, on=True):
+        """
+        Hold Property notifications (Item.onProperty() and everything
+        downstream of it) until the outermost block exits, then deliver them
+        once per property in the order they first changed. Listeners that
+        refresh on every notification can use deferCall() to refresh once
+        after all of them have been delivered.
+        """
+        if not on:
+            yield
+            return
+        self._deferNotificationsLevel += 1
+        try:
+            yield
+        finally:
+            self._deferNotificationsLevel -= 1
+            if self._deferNotificationsLevel == 0:
+                self._flushNotifications()
+
+    def isDeferringNotifications(self) -> bool:
+        return self._deferNotificationsLevel > 0
+
+    def deferNotification(self, prop: Property):
+        self._deferredProps.setdefault(id(prop), prop)
+
+    def deferCall(self, func, *args):
+        """Call func(*args) once after deferred notifications are delivered."""
+        if self.isDeferringNotifications():
+            self._deferredCalls[(func, args)] = None
+        else:
+            func(*args)
+
+    def _flushNotifications(self):
+        # Still deferring so that props set from onProperty() and deferCall()
+        # from listeners are coalesced into this same flush.
+        self._deferNotificationsLevel += 1
+        try:
+            while self._deferredProps:
+                props = list(self._deferredProps.values())
+                self._deferredProps = {}
+                for prop in props:
+                    if prop.item is not None:  # not deinit'd in the meantime
+                        prop.notifyChanged()
+        finally:
+            self._deferNotificationsLevel -= 1
+        calls, self._deferredCalls = self._deferredCalls, {}
+        for func, args in calls:
+            func(*args)
+
     # Event Handlers
 
     def onProperty(self, prop):
@@ -2243,13 +2405,14 @@ class Scene(QGraphicsScene, Item):
             self.deactivateTriangle()
             # TODO: Figure out why this is calling being and end update frame.
             # Is this just a synonym for updateAll()?
-            updateGraph = self.getUpdateGraph()
-            for item in updateGraph:
-                item.beginUpdateFrame()
-            for item in updateGraph:
-                item.onCurrentDateTime()
-            for item in updateGraph:
-                item.endUpdateFrame()
+            with updateprofiler.frame("currentDateTime"):
+                updateGraph = self.getUpdateGraph()
+                for item in updateGraph:
+                    item.beginUpdateFrame()
+                for item in updateGraph:
+                    item.onCurrentDateTime()
+                for item in updateGraph:
+                    item.endUpdateFrame()
         elif prop.name() == "useRealNames":
             if not prop.get():
                 self.setRequirePasswordForRealNames(False)
@@ -2377,16 +2540,17 @@ class Scene(QGraphicsScene, Item):
         # this sometimes just runs when tags are changed.
         super().onActiveLayersChanged()
         #
-        updateGraph = self.getUpdateGraph()
-        for item in updateGraph:
-            item.beginUpdateFrame()
-        #
-        for id, item in self.itemRegistry.items():
-            if isinstance(item, Item):
-                item.onActiveLayersChanged()
-        #
-        for item in updateGraph:
-            item.endUpdateFrame()
+        with updateprofiler.frame("activeLayersAndTags"):
+            updateGraph = self.getUpdateGraph()
+            for item in updateGraph:
+                item.beginUpdateFrame()
+            #
+            for id, item in self.itemRegistry.items():
+                if isinstance(item, Item):
+                    item.onActiveLayersChanged()
+            #
+            for item in updateGraph:
+                item.endUpdateFrame()
 
     @contextlib.contextmanager
     def resettingSomeLayerProps(self):
@@ -2730,12 +2894,8 @@ class Scene(QGraphicsScene, Item):
         self.clipboardChanged.emit()
 
     def paste(self):
-        for item in self.selectedItems():
-            item.setSelected(False)
-        items = self.clipboard.copy(scene=self)
-        self.push(clipboard.PasteItems(items))
-        for item in items:
-            item.setSelected(True)
+        items = self.clipboard.copy(self)
+        self.push(clipboard.PasteItems(self, items))
         return items
 
     def ensureParentsFor(
@@ -2866,17 +3026,18 @@ class Scene(QGraphicsScene, Item):
     def updateAll(self):
         """The main call to visually update everything visual instantly, i.e. w/o animations."""
         self._updatingAll = True
-        updateGraph = self.getUpdateGraph()
-        for item in updateGraph:
-            item.beginUpdateFrame()
-        #
-        self.updateActiveLayers()
-        #
-        for item in self.find(types=[PathItem]):
-            item.updateAll()
-        #
-        for item in updateGraph:
-            item.endUpdateFrame()
+        with updateprofiler.frame("updateAll"):
+            updateGraph = self.getUpdateGraph()
+            for item in updateGraph:
+                item.beginUpdateFrame()
+            #
+            self.updateActiveLayers()
+            #
+            for item in self.find(types=[PathItem]):
+                item.updateAll()
+            #
+            for item in updateGraph:
+                item.endUpdateFrame()
         self.checkPrintRectChanged()
         self._updatingAll = False
 
@@ -0,0 +1,197 @@
+import bisect
+import itertools
+import math
+
+from pkdiagram.pyqt import QRectF
+
+
+class SpatialIndex:
+    """
+    A uniform grid over the scene bounding rects of the items that
+    Scene.*Under() and person snapping look for, bucketed by item class so
+    that a typed query never touches items of other types. Items are marked
+    dirty when they move or change shape and are re-bucketed lazily on the
+    next query, so a drag only costs a dict update per moved item.
+
+    Also keeps each class's items sorted by the top of their scene rects for
+    nearestTop(), i.e. "snap to the person closest in y".
+    """
+
+    CELL_SIZE = 250.0  # scene units, about two people wide
+
+    def __init__(self, cellSize: float = CELL_SIZE):
+        self._cellSize = cellSize
+        self._cells = {}  # (class, col, row): {item}
+        self._entries = {}  # item: (rect, cells, topKey)
+        self._order = {}  # item: insertion count, the stacking tiebreak
+        self._tops = {}  # class: ([(top, order)], [item])
+        self._dirty = set()
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, item):
+        return item in self._order
+
+    def add(self, item):
+        if item not in self._order:
+            self._order[item] = next(self._counter)
+            self._dirty.add(item)
+
+    def remove(self, item):
+        if item not in self._order:
+            return
+        self._unbucket(item)
+        self._dirty.discard(item)
+        del self._order[item]
+
+    def markDirty(self, item):
+        if item in self._order:
+            self._dirty.add(item)
+
+    def clear(self):
+        self.__init__(self._cellSize)
+
+    # Queries
+
+    def itemsAt(self, pos, types) -> list:
+        """Visible items of `types` whose shape contains `pos`, topmost first."""
+        self._flush()
+        key = self._cellKey(pos.x(), pos.y())
+        ret = []
+        for cls in self._classesFor(types):
+            for item in self._cells.get((cls, *key), ()):
+                rect = self._entries[item][0]
+                if (
+                    rect.contains(pos)
+                    and self._isShown(item)
+                    and item.contains(item.mapFromScene(pos))
+                ):
+                    ret.append(item)
+        return self._stacked(ret)
+
+    def itemAt(self, pos, types):
+        items = self.itemsAt(pos, types)
+        return items[0] if items else None
+
+    def itemsIn(self, rect: QRectF, types) -> list:
+        """Visible items of `types` whose scene bounding rect intersects `rect`."""
+        self._flush()
+        left, top = self._cellKey(rect.left(), rect.top())
+        right, bottom = self._cellKey(rect.right(), rect.bottom())
+        found = set()
+        for cls in self._classesFor(types):
+            for col in range(left, right + 1):
+                for row in range(top, bottom + 1):
+                    found.update(self._cells.get((cls, col, row), ()))
+        ret = [
+            x
+            for x in found
+            if self._entries[x][0].intersects(rect) and self._isShown(x)
+        ]
+        return self._stacked(ret)
+
+    def nearestTop(self, y: float, types, accept=None):
+        """
+        The item whose scene rect top is closest to `y`, as
+        (item, sceneRect, distance), or None. `accept(item)` filters
+        candidates, e.g. to skip the item being dragged.
+        """
+        self._flush()
+        best = None
+        for cls in self._classesFor(types):
+            keys, items = self._tops.get(cls, ((), ()))
+            i = bisect.bisect_left(keys, (y, -1))
+            lo, hi = i - 1, i
+            while lo >= 0 or hi < len(keys):
+                dLo = y - keys[lo][0] if lo >= 0 else math.inf
+                dHi = keys[hi][0] - y if hi < len(keys) else math.inf
+                if best and min(dLo, dHi) >= best[2]:
+                    break
+                if dLo <= dHi:
+                    item, distance = items[lo], dLo
+                    lo -= 1
+                else:
+                    item, distance = items[hi], dHi
+                    hi += 1
+                if accept is None or accept(item):
+                    if not best or distance < best[2]:
+                        best = (item, QRectF(self._entries[item][0]), distance)
+                    break
+        return best
+
+    # Internal
+
+    def _classesFor(self, types):
+        if isinstance(types, type):
+            types = (types,)
+        else:
+            types = tuple(types)
+        return [cls for cls in self._tops if issubclass(cls, types)]
+
+    @staticmethod
+    def _isShown(item):
+        """What QGraphicsScene.items() skips: hidden or fully transparent."""
+        return item.isVisible() and item.effectiveOpacity() >= 0.001
+
+    def _stacked(self, items):
+        """Approximates QGraphicsScene's descending stacking order."""
+        if len(items) < 2:
+            return items
+        order = self._order
+
+        def key(item):
+            topLevel = item.topLevelItem()
+            return (
+                topLevel.zValue(),
+                order.get(topLevel, order[item]),
+                item is not topLevel,
+                item.zValue(),
+                order[item],
+            )
+
+        return sorted(items, key=key, reverse=True)
+
+    def _cellKey(self, x, y):
+        return (math.floor(x / self._cellSize), math.floor(y / self._cellSize))
+
+    def _unbucket(self, item):
+        entry = self._entries.pop(item, None)
+        if not entry:
+            return
+        rect, cells, topKey = entry
+        cls = item.__class__
+        for cell in cells:
+            bucket = self._cells[cell]
+            bucket.discard(item)
+            if not bucket:
+                del self._cells[cell]
+        keys, items = self._tops[cls]
+        i = bisect.bisect_left(keys, topKey)
+        del keys[i]
+        del items[i]
+
+    def _flush(self):
+        if not self._dirty:
+            return
+        for item in self._dirty:
+            self._unbucket(item)
+            cls = item.__class__
+            rect = item.sceneBoundingRect()
+            left, top = self._cellKey(rect.left(), rect.top())
+            right, bottom = self._cellKey(rect.right(), rect.bottom())
+            cells = [
+                (cls, col, row)
+                for col in range(left, right + 1)
+                for row in range(top, bottom + 1)
+            ]
+            for cell in cells:
+                self._cells.setdefault(cell, set()).add(item)
+            topKey = (rect.top(), self._order[item])
+            keys, items = self._tops.setdefault(cls, ([], []))
+            i = bisect.bisect_left(keys, topKey)
+            keys.insert(i, topKey)
+            items.insert(i, item)
+            self._entries[item] = (rect, cells, topKey)
+        self._dirty = set()
@@ -0,0 +1,246 @@
+"""
+Instrumentation for the scene's update paths.
+
+When enabled, the update methods of every Item subclass and Property.set are
+wrapped to collect call counts and cumulative time per item type, and the
+Scene's signals are counted. Everything is collected per frame, where a frame
+is one pass of Scene.updateAll(), a current date change, or a layer/tag
+change. Calls made outside of a frame are collected in an "idle" frame.
+
+When disabled the original methods are restored, so the only remaining cost
+is the frame() call at the start of each frame.
+"""
+
+import time
+import functools
+import contextlib
+from collections import deque
+from dataclasses import dataclass, field
+
+from pkdiagram.pyqt import pyqtSignal
+
+
+METHODS = (
+    "updateAll",
+    "updateGeometry",
+    "updatePen",
+    "updateDetails",
+    "onCurrentDateTime",
+    "onActiveLayersChanged",
+)
+MAX_FRAMES = 200
+
+
+@dataclass
+class Frame:
+    kind: str
+    start: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+    stats: dict = field(default_factory=dict)  # "Type.method": [calls, seconds]
+
+    def record(self, key: str, seconds: float):
+        entry = self.stats.get(key)
+        if entry is None:
+            self.stats[key] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def toDict(self) -> dict:
+        stats = {k: {"calls": v[0], "seconds": v[1]} for k, v in self.stats.items()}
+        return {"kind": self.kind, "duration": self.duration, "stats": stats}
+
+
+_enabled = False
+_frames = deque(maxlen=MAX_FRAMES)
+_frame = None
+_frameLevel = 0
+_idle = None
+_active = set()  # (id(obj), method) for calls in progress, to skip super() calls
+_wrapped = []  # (cls, name, original)
+_connections = []  # (signal, slot)
+
+
+def _record(key: str, seconds: float):
+    global _idle
+    frame = _frame
+    if frame is None:
+        if _idle is None:
+            _idle = Frame("idle")
+        frame = _idle
+    frame.record(key, seconds)
+
+
+def _timed(fn, name):
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        key = (id(self), name)
+        if key in _active:
+            return fn(self, *args, **kwargs)
+        _active.add(key)
+        start = time.perf_counter()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            _active.discard(key)
+            _record(f"{type(self).__name__}.{name}", time.perf_counter() - start)
+
+    return wrapper
+
+
+def _timedPropertySet(fn):
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        key = (id(self), "set")
+        if key in _active:
+            return fn(self, *args, **kwargs)
+        _active.add(key)
+        start = time.perf_counter()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            _active.discard(key)
+            itemType = type(self.item).__name__ if self.item else "None"
+            _record(f"{itemType}.Property.set", time.perf_counter() - start)
+
+    return wrapper
+
+
+def _subclasses(cls):
+    ret = [cls]
+    for sub in cls.__subclasses__():
+        for x in _subclasses(sub):
+            if x not in ret:
+                ret.append(x)
+    return ret
+
+
+def isEnabled() -> bool:
+    return _enabled
+
+
+def enable(scenes=()):
+    """Wrap the update paths and count the signals of `scenes`."""
+    global _enabled
+    from pkdiagram.scene import Item, Property
+
+    if not _enabled:
+        for cls in _subclasses(Item):
+            for name in METHODS:
+                fn = cls.__dict__.get(name)
+                if callable(fn):
+                    setattr(cls, name, _timed(fn, name))
+                    _wrapped.append((cls, name, fn))
+        _wrapped.append((Property, "set", Property.set))
+        Property.set = _timedPropertySet(Property.set)
+        _enabled = True
+    for scene in scenes:
+        watchScene(scene)
+
+
+def watchScene(scene):
+    if not _enabled:
+        return
+    for name in dir(type(scene)):
+        if not isinstance(getattr(type(scene), name, None), pyqtSignal):
+            continue
+        signal = getattr(scene, name)
+        key = f"Scene.{name}"
+        slot = lambda *args, key=key: _record(key, 0.0)
+        try:
+            signal.connect(slot)
+        except TypeError:
+            continue
+        _connections.append((signal, slot))
+
+
+def disable():
+    global _enabled
+    for cls, name, fn in reversed(_wrapped):
+        setattr(cls, name, fn)
+    _wrapped.clear()
+    for signal, slot in _connections:
+        try:
+            signal.disconnect(slot)
+        except (TypeError, RuntimeError):
+            pass  # scene already deleted
+    _connections.clear()
+    _active.clear()
+    _enabled = False
+
+
+def reset():
+    global _idle
+    _frames.clear()
+    _idle = None
+
+
+@contextlib.contextmanager
+def _frameContext(kind):
+    global _frame, _frameLevel, _idle
+    _frameLevel += 1
+    if _frameLevel == 1:
+        if _idle is not None:
+            _frames.append(_idle)
+            _idle = None
+        _frame = Frame(kind)
+    try:
+        yield _frame
+    finally:
+        _frameLevel -= 1
+        if _frameLevel == 0:
+            _frame.duration = time.perf_counter() - _frame.start
+            _frames.append(_frame)
+            _frame = None
+
+
+_nullFrame = contextlib.nullcontext()
+
+
+def frame(kind: str):
+    """Group the update calls made in this block. Nested frames are merged."""
+    if not _enabled:
+        return _nullFrame
+    return _frameContext(kind)
+
+
+def frames() -> list:
+    ret = [x.toDict() for x in _frames]
+    if _idle is not None:
+        ret.append(_idle.toDict())
+    return ret
+
+
+def summary() -> list:
+    """Stats summed over all recorded frames, most expensive first."""
+    totals = {}
+    for x in list(_frames) + ([_idle] if _idle else []):
+        for key, (calls, seconds) in x.stats.items():
+            entry = totals.setdefault(key, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+    return [
+        {"name": key, "calls": calls, "seconds": seconds}
+        for key, (calls, seconds) in sorted(
+            totals.items(), key=lambda x: (-x[1][1], -x[1][0], x[0])
+        )
+    ]
+
+
+def dump(limit=30) -> str:
+    lines = []
+    kinds = {}
+    for x in _frames:
+        entry = kinds.setdefault(x.kind, [0, 0.0])
+        entry[0] += 1
+        entry[1] += x.duration
+    lines.append(f"{'frame':<24}{'count':>8}{'total ms':>12}{'avg ms':>10}")
+    for kind, (count, seconds) in sorted(kinds.items()):
+        ms = seconds * 1000
+        lines.append(f"{kind:<24}{count:>8}{ms:>12.2f}{ms / count:>10.3f}")
+    lines.append("")
+    lines.append(f"{'call':<48}{'calls':>8}{'total ms':>12}{'avg ms':>10}")
+    for entry in summary()[:limit]:
+        calls, ms = entry["calls"], entry["seconds"] * 1000
+        lines.append(f"{entry['name']:<48}{calls:>8}{ms:>12.2f}{ms / calls:>10.3f}")
+    return "\n".join(lines)
@@ -10,6 +10,7 @@ import pickle
 import logging
 import json
 import enum
+import zlib
 import base64
 from datetime import datetime
 import hashlib
@@ -34,12 +35,68 @@ from pkdiagram.pyqt import (
 )
 from pkdiagram import version, util
 from pkdiagram.qnam import QNAM
+from pkdiagram.httpcache import HTTPCache
 
 
 log = logging.getLogger(__name__)
 
 FD_NETWORK_TIMEOUT_MS = int(os.getenv("FD_NETWORK_TIMEOUT_MS", 10000))
 
+# Request bodies at least this large are compressed once the server has said
+# that it accepts compressed requests, see Server.nonBlockingRequest().
+FD_COMPRESS_MIN_BYTES = int(os.getenv("FD_COMPRESS_MIN_BYTES", 16 * 1024))
+
+# Response encodings that we decode, in order of preference.
+ACCEPT_ENCODINGS = ("gzip", "deflate")
+
+# Request encodings that we can send, in order of preference.
+REQUEST_ENCODINGS = ("gzip",)
+
+BODY_CHUNK_SIZE = 256 * 1024
+
+
+def encodeBody(bdata: bytes, encoding: str = None) -> tuple[bytes, str]:
+    """
+    Return `bdata` encoded for the wire with `encoding` (None to send as is)
+    and the hex MD5 of the encoded bytes. Compressed output is hashed chunk
+    by chunk as it is produced rather than in a second pass.
+    """
+    if not encoding:
+        return bdata, hashlib.md5(bdata).hexdigest()
+    elif encoding != "gzip":
+        raise ValueError(f"Unsupported request encoding: {encoding}")
+    md5 = hashlib.md5()
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    view = memoryview(bdata)
+    chunks = []
+    for i in range(0, len(view), BODY_CHUNK_SIZE):
+        chunk = compressor.compress(view[i : i + BODY_CHUNK_SIZE])
+        if chunk:
+            md5.update(chunk)
+            chunks.append(chunk)
+    chunk = compressor.flush()
+    md5.update(chunk)
+    chunks.append(chunk)
+    return b"".join(chunks), md5.hexdigest()
+
+
+def decodeBody(bdata: bytes, encoding: str = None) -> bytes:
+    """Undo a response's Content-Encoding."""
+    if not encoding or encoding == "identity":
+        return bdata
+    elif encoding == "gzip":
+        return zlib.decompress(bdata, 16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        return zlib.decompress(bdata)
+    else:
+        log.warning(f"Ignoring unsupported response encoding: {encoding}")
+        return bdata
+
+
+def _encodingsIn(value: str) -> set[str]:
+    """Coding names from an Accept-Encoding or Content-Encoding header value."""
+    return {x.split(";")[0].strip().lower() for x in value.split(",") if x.strip()}
+
 
 @dataclass
 class Activation:
@@ -202,6 +259,60 @@ class Diagram:
         data = pickle.loads(response.body)
         return cls.create(data)
 
+    def _saveRequest(self, newData: bytes, useJson: bool) -> tuple:
+        """(endpoint, data, bdata, headers) to PUT `newData` as the next version."""
+        if useJson:
+            endpoint = f"/personal/diagrams/{self.id}"
+            data = {
+                "data": base64.b64encode(newData).decode("utf-8"),
+                "expected_version": self.version,
+            }
+            return endpoint, data, None, {"Content-Type": "application/json"}
+        else:
+            endpoint = f"/v1/diagrams/{self.id}"
+            bdata = pickle.dumps(
+                {
+                    "data": newData,
+                    "updated_at": datetime.utcnow(),
+                    "expected_version": self.version,
+                }
+            )
+            return endpoint, None, bdata, None
+
+    def _onSaveResponse(
+        self,
+        status_code: int,
+        body: bytes,
+        newData: bytes,
+        useJson: bool,
+        stillValidAfterRefresh: Callable[[DiagramData], bool],
+    ) -> bool | None:
+        """
+        Apply a 200 or 409 save response. Returns True when saved, None to
+        retry after a conflict, and False when the change no longer applies.
+        """
+        if useJson:
+            responseData = json.loads(body.decode("utf-8"))
+        else:
+            responseData = pickle.loads(body)
+
+        if status_code == 200:
+            self.version = responseData.get("version", self.version + 1)
+            self.data = newData
+            return True
+
+        log.info(f"Version conflict when saving diagram {self.id}")
+        self.version = responseData["version"]
+        conflictData = responseData["data"]
+        if useJson:
+            self.data = base64.b64decode(conflictData)
+        else:
+            self.data = conflictData
+        refreshedData = self.getDiagramData()
+        if not stillValidAfterRefresh(refreshedData):
+            return False
+        return None
+
     def save(
         self,
         server,
@@ -219,26 +330,7 @@ class Diagram:
 
             newData = pickle.dumps(asdict(diagramData))
 
-            if useJson:
-                endpoint = f"/personal/diagrams/{self.id}"
-                data = {
-                    "data": base64.b64encode(newData).decode("utf-8"),
-                    "expected_version": self.version,
-                }
-                bdata = None
-                headers = {"Content-Type": "application/json"}
-
-            else:
-                endpoint = f"/v1/diagrams/{self.id}"
-                bdata = pickle.dumps(
-                    {
-                        "data": newData,
-                        "updated_at": datetime.utcnow(),
-                        "expected_version": self.version,
-                    }
-                )
-                data = None
-                headers = None
+            endpoint, data, bdata, headers = self._saveRequest(newData, useJson)
 
             try:
                 response = server.blockingRequest(
@@ -260,36 +352,83 @@ class Diagram:
                 )
                 return False
 
-            if useJson:
-                responseData = json.loads(response.body.decode("utf-8"))
-            else:
-                responseData = pickle.loads(response.body)
-
-            if response.status_code == 200:
-                self.version = responseData.get("version", self.version + 1)
-                self.data = newData
-                return True
+            result = self._onSaveResponse(
+                response.status_code,
+                response.body,
+                newData,
+                useJson,
+                stillValidAfterRefresh,
+            )
+            if result is not None:
+                return result
+            log.info(f"Retrying save, attempt {attempt + 1} of {maxRetries}")
 
-            if response.status_code == 409:
-                log.info(
-                    f"Version conflict when saving diagram {self.id}, attempt {attempt + 1} of {maxRetries}"
-                )
-                self.version = responseData["version"]
-                conflictData = responseData["data"]
+        return False
 
-                if useJson:
-                    self.data = base64.b64decode(conflictData)
+    def saveAsync(
+        self,
+        server,
+        applyChange: Callable[[DiagramData], DiagramData],
+        stillValidAfterRefresh: Callable[[DiagramData], bool],
+        finished: Callable[[bool], None],
+        maxRetries: int = 3,
+        useJson: bool = False,
+        sent: Callable[[QNetworkReply], None] = None,
+    ):
+        """
+        Same as save() but without blocking: conflict retries are chained from
+        the reply callbacks and `finished(success)` is called exactly once.
+        `sent(reply)` is called for each PUT, e.g. to track progress or abort.
+        """
+        attempts = 0
+
+        def attempt():
+            nonlocal attempts
+            attempts += 1
+            newData = pickle.dumps(asdict(applyChange(self.getDiagramData())))
+
+            def onFinished(reply):
+                status_code = Server.statusCode(reply)
+                if reply.error() == QNetworkReply.OperationCanceledError:
+                    log.info(f"Canceled saving diagram {self.id}")
+                    finished(False)
+                    return
+                elif status_code not in (200, 409):
+                    log.error(
+                        f"Error saving diagram {self.id}: {util.qtHTTPReply2String(reply)}"
+                    )
+                    finished(False)
+                    return
+                try:
+                    result = self._onSaveResponse(
+                        status_code,
+                        bytes(reply._pk_body),
+                        newData,
+                        useJson,
+                        stillValidAfterRefresh,
+                    )
+                except (ValueError, KeyError, pickle.UnpicklingError) as e:
+                    log.error(f"Invalid save response for diagram {self.id}: {e}")
+                    result = False
+                if result is None and attempts < maxRetries:
+                    attempt()
                 else:
-                    self.data = conflictData
-
-                refreshedData = self.getDiagramData()
-
-                if not stillValidAfterRefresh(refreshedData):
-                    return False
+                    finished(bool(result))
+
+            endpoint, data, bdata, headers = self._saveRequest(newData, useJson)
+            reply = server.nonBlockingRequest(
+                "PUT",
+                endpoint,
+                data=data,
+                bdata=bdata,
+                headers=headers,
+                finished=onFinished,
+                from_root=True,
+            )
+            if sent:
+                sent(reply)
 
-                continue
-
-        return False
+        attempt()
 
     def getDiagramData(self) -> DiagramData:
         data = pickle.loads(self.data) if self.data else {}
@@ -355,11 +494,13 @@ class HTTPResponse:
     body: bytes = None
     status_code: int = None
     headers: dict[str, str] = None
+    notModified: bool = False  # body is from the HTTP cache after a 304
     _reply: InitVar[QNetworkReply] = None
 
     def __post_init__(self, _reply: QNetworkReply = None):
         if _reply:
-            self.status_code = _reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+            self.status_code = Server.statusCode(_reply)
+            self.notModified = getattr(_reply, "_pk_notModified", False)
             self.headers = {
                 bytes(name).decode(): bytes(_reply.rawHeader(name)).decode()
                 for name in _reply.rawHeaderList()
@@ -378,10 +519,45 @@ class Server(QObject):
     # the object has been deleted in tests.
     allRequestsFinished = pyqtSignal()
 
-    def __init__(self, parent=None, user=None):
+    def __init__(self, parent=None, user=None, cache=None):
         super().__init__(parent)
         self._user = user
         self._repliesInFlight = []
+        self._cache = cache if cache is not None else HTTPCache()
+        # Request encodings that the server has advertised via Accept-Encoding
+        # on its responses (RFC 7694). Empty until the first response.
+        self._requestEncodings = set()
+
+    def requestEncoding(self, bdata: bytes) -> str | None:
+        """The encoding to send `bdata` with, or None to send it as is."""
+        if not bdata or len(bdata) < FD_COMPRESS_MIN_BYTES:
+            return None
+        for encoding in REQUEST_ENCODINGS:
+            if encoding in self._requestEncodings:
+                return encoding
+
+    def _onReplyHeaders(self, reply):
+        accepted = bytes(reply.rawHeader(b"Accept-Encoding")).decode()
+        if accepted:
+            self._requestEncodings = _encodingsIn(accepted)
+
+    def _onCacheableReply(self, reply, bdata: bytes) -> bytes:
+        """Store a GET response, or swap in the cached body after a 304."""
+        key = reply._pk_cacheKey
+        status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status_code == 304:
+            cached = self._cache.body(key)
+            if cached is not None:
+                reply._pk_notModified = True
+                return cached
+        elif status_code == 200:
+            self._cache.put(
+                key,
+                bdata,
+                etag=bytes(reply.rawHeader(b"ETag")).decode() or None,
+                lastModified=bytes(reply.rawHeader(b"Last-Modified")).decode() or None,
+            )
+        return bdata
 
     def deinit(self):
         pass
@@ -398,6 +574,13 @@ class Server(QObject):
         if not self._repliesInFlight:
             self.allRequestsFinished.emit()
 
+    @staticmethod
+    def statusCode(reply):
+        """The HTTP status, where a 304 answered from the cache counts as 200."""
+        if getattr(reply, "_pk_notModified", False):
+            return 200
+        return reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+
     @staticmethod
     def checkHTTPReply(reply, statuses=None, quiet=True):
         """Generic http code handling."""
@@ -405,7 +588,7 @@ class Server(QObject):
             statuses = [200, 404]
         error = reply.error()
         failMessage = None
-        status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        status_code = Server.statusCode(reply)
         if status_code != 0 and status_code in statuses:
             pass
         if error == QNetworkReply.NoError and status_code in statuses:
@@ -457,6 +640,15 @@ class Server(QObject):
             bdata = json.dumps(data).encode("utf-8")
         elif data and not bdata:
             bdata = pickle.dumps(data)
+        if "Content-Encoding" not in _headers:
+            encoding = self.requestEncoding(bdata)
+            if encoding:
+                _headers["Content-Encoding"] = encoding
+        else:
+            encoding = None  # caller already encoded it
+        # Setting this ourselves turns off Qt's transparent decompression, so
+        # that responses are decoded the same way in onFinished() everywhere.
+        _headers.setdefault("Accept-Encoding", ", ".join(ACCEPT_ENCODINGS))
         full_url = util.serverUrl(path, from_root=from_root)
         ## Make a QNetworkRequest with the appropriate signature headers. """
 
@@ -480,7 +672,8 @@ class Server(QObject):
 
         # Do this like AWS
         # http://s3.amazonaws.com/doc/s3-developer-guide/RESTAuthentication.html
-        content_md5 = hashlib.md5(bdata).hexdigest()
+        # The signature covers the bytes on the wire, i.e. after compression.
+        bdata, content_md5 = encodeBody(bdata, encoding)
         # content_type = "text/html"
         request = QNetworkRequest(url)
 
@@ -506,6 +699,11 @@ class Server(QObject):
             b"FD-Client-App-Type",
             bytes(QApplication.instance().appType().value, "utf-8"),
         )
+        # Conditional GET; validators are not part of the signature.
+        cacheKey = f"{user}:{resource}" if verb == "GET" else None
+        if cacheKey:
+            for key, value in self._cache.validators(cacheKey).items():
+                request.setRawHeader(key.encode("utf-8"), value.encode("utf-8"))
         auth_header = btcopilot.httpAuthHeader(user, signature)
         request.setRawHeader(b"FD-Authentication", bytes(auth_header, "utf-8"))
         request.setAttribute(QNetworkRequest.FollowRedirectsAttribute, True)
@@ -526,7 +724,16 @@ class Server(QObject):
             # Read body first since QNetworkReply is a sequential QIODevice
             bdata = reply._pk_body = reply.readAll()
             try:
+                encoding = bytes(reply.rawHeader(b"Content-Encoding")).decode()
+                bdata = reply._pk_body = decodeBody(bytes(bdata), encoding.lower())
+                if reply._pk_cacheKey:
+                    bdata = reply._pk_body = server._onCacheableReply(reply, bdata)
+                server._onReplyHeaders(reply)
                 server.checkHTTPReply(reply)
+            except zlib.error as e:
+                log.error(f"Could not decode response body: {e}")
+                if error:
+                    error()
             except HTTPError:
                 if error:
                     error()
@@ -546,6 +753,7 @@ class Server(QObject):
                 self._checkRequestsComplete(reply)
 
         reply._pk_body = b""
+        reply._pk_cacheKey = cacheKey
         reply.setProperty("pk_success", success)
         reply.setProperty("pk_error", error)
         reply.setProperty("pk_finished", finished)
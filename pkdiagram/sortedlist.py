@@ -2,10 +2,17 @@ import bisect
 
 
 class SortedList:
-    """sortedcontainers.SortedList was throwing ValueError for items in the list."""
+    """sortedcontainers.SortedList was throwing ValueError for items in the list.
 
-    def __init__(self):
+    With `key`, each item's key is computed once when it is added and kept in a
+    parallel list so that bisecting compares plain keys instead of calling
+    __lt__ on the items.
+    """
+
+    def __init__(self, key=None):
         self._list = []
+        self._key = key
+        self._keys = [] if key else None
 
     def __repr__(self):
         return self._list.__repr__()
@@ -16,16 +23,37 @@ class SortedList:
     def __getitem__(self, i):
         return self._list[i]
 
+    def __delitem__(self, i):
+        del self._list[i]
+        if self._key:
+            del self._keys[i]
+
     def bisect_right(self, x):
+        if self._key:
+            return bisect.bisect_right(self._keys, self._key(x))
         return bisect.bisect_right(self._list, x)
 
     def add(self, x):
-        bisect.insort_right(self._list, x)
+        if self._key:
+            key = self._key(x)
+            i = bisect.bisect_right(self._keys, key)
+            self._keys.insert(i, key)
+            self._list.insert(i, x)
+        else:
+            bisect.insort_right(self._list, x)
 
     def remove(self, x):
-        self._list.remove(x)
+        del self[self.index(x)]
 
     def index(self, x):
+        if self._key:
+            key = self._key(x)
+            i = bisect.bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i] == key:
+                if self._list[i] == x:
+                    return i
+                i += 1
+            # The item's key changed since it was added, e.g. a new dateTime.
         return self._list.index(x)
 
     def to_list(self):
@@ -0,0 +1,178 @@
+"""
+Startup profiling.
+
+Set FD_STARTUP_TRACE to a file path to record how long every module import and
+QML component load takes until the first pass of the event loop, e.g.:
+
+    FD_STARTUP_TRACE=~/fd-startup.json python -m pkdiagram
+
+This module only uses the standard library so that it can be started before
+anything else in the package is imported.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import builtins
+import contextlib
+import importlib.util
+
+
+log = logging.getLogger(__name__)
+
+ENV_VAR = "FD_STARTUP_TRACE"
+
+
+class StartupTrace:
+    """
+    Times imports by wrapping builtins.__import__, and importlib.import_module
+    for lazy imports like the package's __getattr__. An import is recorded
+    only when it actually loaded new modules, and each entry's duration
+    includes the imports nested in it; `self` is the time spent outside of
+    those.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.t0 = time.perf_counter()
+        self.entries = []
+        self._stack = []  # child time per open entry
+        self._import = None
+        self._importModule = None
+
+    def install(self):
+        if self._import is None:
+            self._import = builtins.__import__
+            builtins.__import__ = self._tracedImport
+            self._importModule = importlib.import_module
+            importlib.import_module = self._tracedImportModule
+
+    def uninstall(self):
+        if self._import is not None:
+            builtins.__import__ = self._import
+            importlib.import_module = self._importModule
+            self._import = None
+            self._importModule = None
+
+    def _importName(self, name, globals, fromlist, level):
+        if level:
+            package = (globals or {}).get("__package__") or ""
+            try:
+                name = importlib.util.resolve_name("." * level + name, package)
+            except (ImportError, ValueError):
+                pass
+        if fromlist and name in sys.modules:
+            # from package import submodule
+            name = f"{name}.{','.join(fromlist)}"
+        return name
+
+    def _tracedImport(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if not level and not fromlist and name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        nModules = len(sys.modules)
+        label = self._importName(name, globals, fromlist, level)
+        with self._timed("import", label) as keep:
+            ret = self._import(name, globals, locals, fromlist, level)
+            keep[0] = len(sys.modules) > nModules
+        return ret
+
+    def _tracedImportModule(self, name, package=None):
+        if name in sys.modules:
+            return self._importModule(name, package)
+        nModules = len(sys.modules)
+        label = name
+        if name.startswith("."):
+            try:
+                label = importlib.util.resolve_name(name, package)
+            except (ImportError, ValueError):
+                pass
+        with self._timed("import", label) as keep:
+            ret = self._importModule(name, package)
+            keep[0] = len(sys.modules) > nModules
+        return ret
+
+    @contextlib.contextmanager
+    def _timed(self, kind, name):
+        keep = [True]
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield keep
+        finally:
+            duration = time.perf_counter() - start
+            childTime = self._stack.pop()
+            if keep[0]:
+                self.entries.append(
+                    {
+                        "kind": kind,
+                        "name": name,
+                        "start": start - self.t0,
+                        "duration": duration,
+                        "self": duration - childTime,
+                        "depth": len(self._stack),
+                    }
+                )
+                if self._stack:
+                    self._stack[-1] += duration
+            elif self._stack:
+                self._stack[-1] += childTime
+
+    def span(self, kind, name):
+        return self._timed(kind, name)
+
+    def write(self):
+        total = time.perf_counter() - self.t0
+        entries = sorted(self.entries, key=lambda x: x["start"])
+        data = {
+            "total": total,
+            "imports": sum(x["self"] for x in entries if x["kind"] == "import"),
+            "qml": sum(x["self"] for x in entries if x["kind"] == "qml"),
+            "entries": entries,
+        }
+        path = os.path.expanduser(self.path)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=1)
+        return data
+
+
+_trace = None
+
+
+def start(path):
+    global _trace
+    if _trace is None:
+        _trace = StartupTrace(path)
+        _trace.install()
+    return _trace
+
+
+def startFromEnvironment():
+    path = os.environ.get(ENV_VAR)
+    if path:
+        start(path)
+
+
+def isActive() -> bool:
+    return _trace is not None
+
+
+def span(kind, name):
+    """Time a block, i.e. loading a QML component, while the trace is active."""
+    if _trace is None:
+        return contextlib.nullcontext()
+    return _trace.span(kind, name)
+
+
+def finish():
+    """Stop tracing and write the trace file."""
+    global _trace
+    if _trace is None:
+        return
+    trace, _trace = _trace, None
+    trace.uninstall()
+    try:
+        return trace.write()
+    except OSError as e:
+        log.error(f"Could not write startup trace to {trace.path}: {e}")
@@ -0,0 +1,111 @@
+from btcopilot.schema import EventKind
+from pkdiagram import util
+from pkdiagram.scene import Person, Event
+from pkdiagram.scene.commands import EvictedCommand, RemoveEventProperty
+
+
+def test_remove_items_accounts_detached_items(scene):
+    people = scene.addItems(*[Person(name=f"p{i}") for i in range(10)])
+    before = scene.undoHistory().totalBytes()
+    scene.removeItems(*people, undo=True)
+    assert scene.undoHistory().totalBytes() - before > 10 * 4096
+
+
+def test_command_cap_evicts_oldest(scene):
+    scene.setUndoLimits(maxCommands=2)
+    people = [scene.addItem(Person(name=f"p{i}"), undo=True) for i in range(3)]
+    assert scene.undoHistory().count() == 2
+    assert scene.undoHistory().nEvicted == 1
+    assert isinstance(scene.stack().command(0), EvictedCommand)
+
+    for _ in range(3):
+        scene.undo()
+    assert scene.stack().index() == 1  # stops at the evicted command
+    assert not scene.canUndo()
+    assert scene.stack().canUndo()
+    assert people[0] in scene.people()
+    assert people[1] not in scene.people()
+    assert people[2] not in scene.people()
+
+    for _ in range(3):
+        scene.redo()
+    assert set(scene.people()) == set(people)
+
+
+def test_limits_keep_redo_commands(scene):
+    people = [scene.addItem(Person(name=f"p{i}"), undo=True) for i in range(3)]
+    scene.undo()
+    scene.undo()
+    scene.setUndoLimits(maxCommands=1)
+    assert scene.undoHistory().nEvicted == 1  # not the two that can be redone
+
+    scene.redo()
+    scene.redo()
+    assert set(scene.people()) == set(people)
+
+
+def test_can_undo_changed(scene):
+    changes = []
+    scene.canUndoChanged.connect(changes.append)
+    scene.setUndoLimits(maxCommands=1)
+    scene.addItem(Person(name="one"), undo=True)
+    scene.addItem(Person(name="two"), undo=True)  # evicts "one"
+    assert changes == [True]
+    scene.undo()
+    assert changes == [True, False]
+    scene.redo()
+    assert changes == [True, False, True]
+
+
+def test_byte_cap_evicts_oldest(scene):
+    scene.addItems(*[Person(name=f"p{i}") for i in range(10)])
+    first, second = scene.people()[:5], scene.people()[5:]
+    scene.removeItems(*first, undo=True)
+    nBytes = scene.undoHistory().totalBytes()
+    scene.setUndoLimits(maxBytes=nBytes + 1024)
+    scene.removeItems(*second, undo=True)
+    assert scene.undoHistory().count() == 1
+    assert scene.undoHistory().totalBytes() <= nBytes + 1024
+
+
+def test_macro_is_one_entry(scene):
+    scene.setUndoLimits(maxCommands=1)
+    with scene.macro("Add people"):
+        scene.addItem(Person(name="one"), undo=True)
+        scene.addItem(Person(name="two"), undo=True)
+    assert scene.undoHistory().count() == 1
+    assert scene.undoHistory().nEvicted == 0
+    scene.undo()
+    assert scene.people() == []
+
+
+def test_eviction_resets_clean(scene):
+    scene.setUndoLimits(maxCommands=2)
+    scene.addItem(Person(name="one"), undo=True)
+    scene.stack().setClean()
+    scene.addItem(Person(name="two"), undo=True)
+    scene.addItem(Person(name="three"), undo=True)  # evicts "one"
+    scene.undo()
+    scene.undo()
+    assert scene.stack().isClean()  # still reachable
+
+    scene.redo()
+    scene.redo()
+    scene.addItem(Person(name="four"), undo=True)  # evicts "two"
+    scene.undo()
+    scene.undo()
+    assert not scene.stack().isClean()
+
+
+def test_value_cache_skips_unset(scene):
+    person = scene.addItem(Person(name="p"))
+    scene.addEventProperty("var")
+    events = scene.addItems(
+        *[
+            Event(EventKind.Shift, person, dateTime=util.Date(2000 + i, 1, 1))
+            for i in range(3)
+        ]
+    )
+    events[0].dynamicProperty("var").set("x")
+    ((attr, entries),) = RemoveEventProperty.readValueCache(scene, onlyAttr="var")
+    assert list(entries) == [events[0].id]
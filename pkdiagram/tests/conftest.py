@@ -462,10 +462,12 @@ def qApp():
         if self._httpRequests:
 
             def _summarize(requests):
-                return ", ".join(x.reply.request().url() for x in requests)
+                return ", ".join(
+                    x.reply.request().url().toString() for x in requests.values()
+                )
 
             assert (
-                util.Condition(condition=lambda: self._httpRequests == []).wait()
+                util.Condition(condition=lambda: not self._httpRequests).wait()
                 == True
             ), f"Did not complete QmlUtil requests: {_summarize(self._httpRequests)}"
 
@@ -1,5 +1,6 @@
 import mock
 
+from pkdiagram import util
 from pkdiagram.pyqt import Qt
 from pkdiagram.scene import Scene, Person, Marriage, Layer
 from pkdiagram.models import EmotionalUnitsModel
@@ -118,3 +119,32 @@ def test_noPairBondsWithNames():
 
     scene.removeItem(marriage)
     assert model.noPairBondsWithNames == True
+
+
+def test_add_remove_rows_without_reset():
+    scene = Scene()
+    model = EmotionalUnitsModel()
+    model.scene = scene
+    marriages = [
+        Marriage(personA=Person(name=f"A-{i}"), personB=Person(name=f"B-{i}"))
+        for i in range(3)
+    ]
+    scene.addItems(*marriages)
+    modelReset = util.Condition(model.modelReset)
+    rowsInserted = util.Condition(model.rowsInserted)
+    rowsRemoved = util.Condition(model.rowsRemoved)
+
+    marriage = Marriage(personA=Person(name="C"), personB=Person(name="D"))
+    scene.addItem(marriage)
+    assert rowsInserted.callCount == 1
+    assert model.rowCount() == 4
+
+    scene.removeItem(marriages[1])
+    assert rowsRemoved.callCount == 1
+    assert model.rowCount() == 3
+    assert marriages[1].emotionalUnit().layer() not in model.layers()
+
+    scene.removeItems(marriages[0], marriage, batch=True)
+    assert rowsRemoved.callCount == 3
+    assert model.layers() == [marriages[2].emotionalUnit().layer()]
+    assert modelReset.callCount == 0
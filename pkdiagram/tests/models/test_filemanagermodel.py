@@ -0,0 +1,75 @@
+from pkdiagram import util
+from pkdiagram.models.filemanagermodel import FileManagerModel
+
+
+def _paths(model):
+    return [
+        model.data(model.index(row, 0), model.PathRole)
+        for row in range(model.rowCount())
+    ]
+
+
+def _model(sortBy="name"):
+    model = FileManagerModel()
+    model.initFileManagerModel()
+    model.sortByRoleName(sortBy)
+    return model
+
+
+def test_add_update_remove_row_signals(qApp):
+    model = _model()
+    rowsInserted = util.Condition(model.rowsInserted)
+    rowsMoved = util.Condition(model.rowsMoved)
+    dataChanged = util.Condition(model.dataChanged)
+    modelReset = util.Condition(model.modelReset)
+    model.addFileEntry("/b", name="b")
+    model.addFileEntry("/d", name="d")
+    model.addFileEntry("/a", name="a")
+    assert _paths(model) == ["/a", "/b", "/d"]
+    assert rowsInserted.callArgs[-1][1:] == (0, 0)
+
+    model.updateFileEntry("/a", name="c")
+    assert _paths(model) == ["/b", "/a", "/d"]
+    assert rowsMoved.callCount == 1
+    assert dataChanged.callArgs[-1][0].row() == 1
+
+    model.addFileEntry("/b", name="b", owner="someone")  # existing path updates
+    assert model.rowCount() == 3
+    assert model.rowForFilePath("/b") == 0
+    assert dataChanged.callCount == 2
+
+    model.removeFileEntry("/a")
+    assert _paths(model) == ["/b", "/d"]
+    assert model.rowForFilePath("/a") is None
+    assert modelReset.callCount == 0
+
+
+def test_modified_sorts_descending(qApp):
+    model = _model("modified")
+    model.addFileEntry("/old", name="old", modified=1.0)
+    model.addFileEntry("/new", name="new", modified=3.0)
+    model.addFileEntry("/mid", name="mid", modified=2.0)
+    assert _paths(model) == ["/new", "/mid", "/old"]
+    model.updateFileEntry("/old", modified=4.0)
+    assert _paths(model) == ["/old", "/new", "/mid"]
+    assert model.rowForFilePath("/mid") == 2
+
+
+def test_searchText_emits_row_diffs(qApp):
+    model = _model()
+    model.addFileEntry("/1", name="Apple", owner="x@example.com")
+    model.addFileEntry("/2", name="Banana", owner="y@example.com")
+    model.addFileEntry("/3", name="Cherry", owner="apple@example.com")
+    modelReset = util.Condition(model.modelReset)
+    rowsRemoved = util.Condition(model.rowsRemoved)
+    model.set("searchText", "APPLE")
+    assert _paths(model) == ["/1", "/3"]
+    assert rowsRemoved.callArgs[-1][1:] == (1, 1)
+
+    model.addFileEntry("/4", name="Applesauce")
+    model.addFileEntry("/5", name="Date")
+    assert _paths(model) == ["/1", "/4", "/3"]
+
+    model.reset("searchText")
+    assert _paths(model) == ["/1", "/4", "/2", "/3", "/5"]
+    assert modelReset.callCount == 0
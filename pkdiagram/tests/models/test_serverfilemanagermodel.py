@@ -244,6 +244,42 @@ def test_dont_clear_cache_on_restart(
     )
 
 
+def test_restart_reads_blobs_lazily(test_session, create_model):
+    model = create_model()
+    diagram_id = model.index(0, 0).data(model.IDRole)
+    picklePath = os.path.join(model.localPathForID(diagram_id), "diagram.pickle")
+    mtime = os.stat(picklePath).st_mtime_ns
+    model.deinit()
+
+    with open(model.metadataPath, "rb") as f:
+        index = pickle.load(f)
+    assert [x["data"] for x in index["diagrams"]] == [None]
+    assert list(index["blobs"]) == [diagram_id]
+
+    model2 = ServerFileManagerModel()
+    model2.init()
+    assert model2.diagramCache[diagram_id].data is None
+    assert os.stat(picklePath).st_mtime_ns == mtime
+
+    diagram = model2.findDiagram(diagram_id)
+    assert diagram.data == util.readWithHash(picklePath)
+    model2.deinit()
+    assert os.stat(picklePath).st_mtime_ns == mtime
+
+
+def test_missing_blob_refetched_from_server(test_session, create_model):
+    model = create_model()
+    diagram_id = model.index(0, 0).data(model.IDRole)
+    picklePath = os.path.join(model.localPathForID(diagram_id), "diagram.pickle")
+    expected = util.readWithHash(picklePath)
+    os.remove(picklePath)
+    model.diagramCache[diagram_id].data = None
+
+    diagram = model.findDiagram(diagram_id)
+    assert diagram.data == expected
+    assert util.readWithHash(picklePath) == expected
+
+
 def test_save_free_diagram_persists(test_session):
     # Read free diagram 1
     model = ServerFileManagerModel()
@@ -183,6 +183,50 @@ def test_set_searchModel(scene, model):
     assert model.rowCount() == 2
 
 
+def test_searchChanged_emits_row_diffs(scene, model):
+    person = scene.addItem(Person())
+    event1, event2, event3 = scene.addItems(
+        Event(EventKind.Shift, person, dateTime=util.Date(2001, 1, 1), tags=["here"]),
+        Event(EventKind.Shift, person, dateTime=util.Date(2002, 1, 1)),
+        Event(EventKind.Shift, person, dateTime=util.Date(2003, 1, 1), tags=["here"]),
+    )
+    model.searchModel = SearchModel()
+    model.searchModel.scene = scene
+    assert model.rowCount() == 3
+
+    modelReset = util.Condition(model.modelReset)
+    rowsRemoved = util.Condition(model.rowsRemoved)
+    rowsInserted = util.Condition(model.rowsInserted)
+    model.searchModel.tags = ["here"]
+    assert model.rowCount() == 2
+    assert model.eventForRow(0) == event1
+    assert model.eventForRow(1) == event3
+    assert rowsRemoved.callCount == 1
+    assert rowsRemoved.callArgs[0][1:] == (1, 1)
+    assert rowsInserted.callCount == 0
+
+    model.searchModel.tags = []
+    assert model.rowCount() == 3
+    assert model.eventForRow(1) == event2
+    assert rowsInserted.callCount == 1
+    assert rowsInserted.callArgs[0][1:] == (1, 1)
+    assert modelReset.callCount == 0
+
+
+def test_search_key_invalidated_on_event_change(scene, model):
+    person = scene.addItem(Person())
+    event = scene.addItem(
+        Event(EventKind.Shift, person, dateTime=util.Date(2001, 1, 1))
+    )
+    model.searchModel = SearchModel()
+    model.searchModel.scene = scene
+    model.searchModel.tags = ["here"]
+    assert model._shouldHide(TimelineRow(event)) == True
+
+    event.setTags(["here"])
+    assert model._shouldHide(TimelineRow(event)) == False
+
+
 def test_init_multiple_people(scene, model):
     personA, personB, personC = scene.addItems(Person(), Person(), Person())
     birthEventA = scene.addItem(
@@ -955,3 +999,63 @@ def test_person_column(scene, model, kind, has_spouse, has_child, expected):
 
     personCol = model.columnIndex(model.PERSON)
     assert model.index(0, personCol).data() == expected
+
+
+def test_display_cache_invalidated(scene, model):
+    person, spouse, child = scene.addItems(
+        Person(name="Person"), Person(name="Spouse"), Person(name="Child")
+    )
+    scene.addItem(Marriage(personA=person, personB=spouse))
+    shift = scene.addItem(
+        Event(
+            EventKind.Shift,
+            person,
+            description="Moved",
+            tags=["here"],
+            dateTime=util.Date(2000, 1, 1),
+        )
+    )
+    birth = scene.addItem(
+        Event(
+            EventKind.Birth,
+            person,
+            spouse=spouse,
+            child=child,
+            dateTime=util.Date(2001, 1, 1),
+        )
+    )
+    descCol = model.columnIndex(model.DESCRIPTION)
+    personCol = model.columnIndex(model.PERSON)
+    tagsCol = model.columnIndex(model.TAGS)
+    dateCol = model.columnIndex(model.DATETIME)
+    assert model.index(0, descCol).data() == "Moved"
+    assert model.index(0, tagsCol).data() == "here"
+    assert model.index(1, personCol).data() == "Child"
+
+    shift.setDescription("Moved away")
+    shift.setTags(["here", "there"])
+    child.setName("Kid")
+    assert model.index(0, descCol).data() == "Moved away"
+    assert model.index(0, tagsCol).data() == "here, there"
+    assert model.index(1, personCol).data() == "Kid"
+
+    scene.setHideNames(True)
+    assert model.index(1, personCol).data() == "<hidden>"
+
+    shift.setDateTime(util.Date(2002, 1, 1))
+    assert model.eventForRow(1) == shift
+    assert model.index(1, dateCol).data() == util.dateString(util.Date(2002, 1, 1))
+
+
+def test_dynamic_column_dispatch(scene, model):
+    person = scene.addItem(Person(name="Person A"))
+    event = scene.addItem(
+        Event(EventKind.Shift, person, dateTime=util.Date(2000, 1, 1))
+    )
+    scene.addEventProperty("var-1")
+    scene.addEventProperty("var-2")
+    event.dynamicProperty("var-2").set("down")
+    col = model.columnIndex("var-2")
+    assert model.dynamicPropertyAttr(model.index(0, col)) == "var-2"
+    assert model.index(0, col).data() == "down"
+    assert model.index(0, col + 1).data() is None
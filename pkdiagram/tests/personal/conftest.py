@@ -34,6 +34,7 @@ def personalApp(qApp, test_session):
 
     yield app
 
+    app.diagramSaveQueue.cancelAll()
     app.sceneModel.scene = None
     app.peopleModel.scene = None
     scene.deinit()
@@ -0,0 +1,113 @@
+import os.path
+import json
+
+import pytest
+
+from pkdiagram.personal.clustering import (
+    ClusterPoint,
+    LocalClusterEngine,
+    windowsFor,
+    agreement,
+)
+
+
+def _event(id, date, **kwargs):
+    return dict(id=id, kind="shift", dateTime=date, description="", **kwargs)
+
+
+EVENTS = [
+    _event(1, "2001-01-01", symptom="up"),
+    _event(2, "2001-02-01", anxiety="up"),
+    _event(3, "2001-03-01", anxiety="up"),
+    _event(4, "2005-01-01", functioning="down"),
+    _event(5, "2005-01-20", functioning="down", relationship="conflict"),
+    _event(6, "2010-06-01"),
+]
+
+
+def test_windowsFor():
+    points = [ClusterPoint.fromDict(x) for x in EVENTS]
+    windows = windowsFor(points, maxGapDays=180)
+    assert [[p.id for p in w] for w in windows] == [[1, 2, 3], [4, 5], [6]]
+
+
+def test_detect():
+    engine = LocalClusterEngine(maxGapDays=180, minEvents=2)
+    clusters = engine.detect(EVENTS)
+    assert [c["eventIds"] for c in clusters] == [[1, 2, 3], [4, 5]]
+    assert clusters[0]["title"] == "Anxiety up, Symptom up"
+    assert clusters[0]["startDate"] == "2001-01-01"
+    assert clusters[0]["endDate"] == "2001-03-01"
+    assert clusters[1]["title"] == "Functioning down, Relationship"
+    assert all(c["source"] == "local" for c in clusters)
+
+
+def test_detect_skips_undated():
+    engine = LocalClusterEngine()
+    assert engine.detect([_event(1, None, symptom="up")]) == []
+
+
+def test_detect_incremental():
+    engine = LocalClusterEngine(maxGapDays=180, minEvents=2)
+    engine.detect(EVENTS)
+    assert engine.nClustered == 3
+
+    # Only the window the new event lands in is re-clustered.
+    clusters = engine.detect(EVENTS + [_event(7, "2005-02-01", anxiety="down")])
+    assert engine.nClustered == 4
+    assert clusters[1]["eventIds"] == [4, 5, 7]
+
+
+def test_update():
+    engine = LocalClusterEngine(maxGapDays=180, minEvents=2)
+    engine.detect(EVENTS)
+
+    # Only the window the new event lands in is clustered.
+    clusters = engine.update(7, _event(7, "2010-01-01", symptom="up"))
+    assert engine.nClustered == 4
+    assert [c["eventIds"] for c in clusters] == [[1, 2, 3], [4, 5]]
+
+    # Moving it away splits the window it leaves.
+    clusters = engine.update(7, _event(7, "2001-04-01", symptom="up"))
+    assert engine.nClustered == 6
+    assert [c["eventIds"] for c in clusters] == [[1, 2, 3, 7], [4, 5]]
+
+    clusters = engine.update(7, None)
+    assert engine.nClustered == 7
+    assert clusters == engine.detect(EVENTS)
+
+
+def test_detect_disk_cache(tmp_path):
+    LocalClusterEngine(cacheDir=tmp_path).detect(EVENTS)
+    assert len(list((tmp_path / "clusterwindows").iterdir())) == 3
+
+    engine = LocalClusterEngine(cacheDir=tmp_path)
+    clusters = engine.detect(EVENTS)
+    assert engine.nClustered == 0
+    assert len(clusters) == 2
+
+
+def test_agreement():
+    local = LocalClusterEngine().detect(EVENTS)
+    server = [
+        {"id": "a", "eventIds": [1, 2, 3]},
+        {"id": "b", "eventIds": [4, 5]},
+    ]
+    assert agreement(local, server) == 1.0
+    assert agreement(local, [{"id": "a", "eventIds": [1, 2, 3, 4, 5]}]) < 1.0
+
+
+# One file per server cluster response in tests/data/clusters: the events
+# posted to /personal/diagrams/<id>/clusters and the response body. The local
+# engine only windows events by date, so it can't match the server exactly,
+# but it shouldn't drift further than this.
+MIN_SERVER_AGREEMENT = 0.75
+
+
+@pytest.mark.parametrize("name", ["move_and_illness", "divorce"])
+def test_agreement_with_server(data_root, name):
+    with open(os.path.join(data_root, "clusters", f"{name}.json")) as f:
+        recorded = json.load(f)
+    local = LocalClusterEngine().detect(recorded["events"])
+    server = recorded["response"]["clusters"]
+    assert agreement(local, server) >= MIN_SERVER_AGREEMENT
@@ -303,3 +303,121 @@ def test_show_clusters_persisted_in_cache(clusterModel, tmp_path):
     new_model.diagramId = 123
     assert new_model.showClusters == False
     new_model.deinit()
+
+
+def test_detect_local(clusterModel, scene, session):
+    person = Person()
+    scene.addItem(person)
+    event1, event2 = scene.addItems(
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(2024, 1, 15)),
+            symptom=VariableShift.Up,
+        ),
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(2024, 2, 15)),
+            anxiety=VariableShift.Up,
+        ),
+    )
+    clusterModel.scene = scene
+
+    clusterModel.detectLocal()
+    session.server().nonBlockingRequest.assert_not_called()
+    assert clusterModel.count == 1
+    clusterId = clusterModel.clusterAt(0)["id"]
+    assert clusterModel.clusterForEvent(event1.id) == clusterId
+    assert clusterModel.clusterForEvent(event2.id) == clusterId
+
+    # Local clusters follow scene edits.
+    event2.setDateTime(QDateTime(QDate(2030, 1, 1)))
+    assert clusterModel.count == 0
+
+
+def test_detect_falls_back_to_local_on_server_error(clusterModel, scene, session):
+    person = Person()
+    scene.addItem(person)
+    event1, event2, event3, event4 = scene.addItems(
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(2020, 1, 15)),
+            symptom=VariableShift.Up,
+        ),
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(2020, 2, 15)),
+            anxiety=VariableShift.Up,
+        ),
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(2024, 1, 15)),
+            symptom=VariableShift.Down,
+        ),
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(2024, 2, 15)),
+            functioning=VariableShift.Up,
+        ),
+    )
+    clusterModel.scene = scene
+    clusterModel.diagramId = 123
+    errorOccurred = MagicMock()
+    clusterModel.errorOccurred.connect(errorOccurred)
+    reply = session.server().nonBlockingRequest.return_value
+    reply.errorString.return_value = "Network unreachable"
+
+    clusterModel.detect()
+    session.server().nonBlockingRequest.call_args.kwargs["error"]()
+    assert errorOccurred.call_args[0][0] == "Network unreachable"
+    assert clusterModel.detecting == False
+    assert clusterModel.count == 2
+    assert clusterModel.eventsInCluster(clusterModel.clusterAt(0)["id"]) == [
+        event1.id,
+        event2.id,
+    ]
+
+    # Edits re-cluster only the windows the event leaves and lands in.
+    engine = clusterModel._localEngine
+    nClustered = engine.nClustered
+    event4.setNotes("Notes are not clustered")
+    assert engine.nClustered == nClustered
+    event4.setDateTime(QDateTime(QDate(2020, 3, 15)))
+    assert engine.nClustered == nClustered + 2
+    assert clusterModel.count == 1
+    assert clusterModel.eventsInCluster(clusterModel.clusterAt(0)["id"]) == [
+        event1.id,
+        event2.id,
+        event4.id,
+    ]
+    scene.removeItem(event3)
+    assert engine.nClustered == nClustered + 2
+    assert clusterModel.count == 1
+
+
+def test_detect_without_diagram_is_local(clusterModel, scene, session):
+    person = Person()
+    scene.addItem(person)
+    scene.addItems(
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(2024, 1, 15)),
+            symptom=VariableShift.Up,
+        ),
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(2024, 2, 15)),
+            anxiety=VariableShift.Up,
+        ),
+    )
+    clusterModel.scene = scene
+    clusterModel.detect()
+    session.server().nonBlockingRequest.assert_not_called()
+    assert clusterModel.count == 1
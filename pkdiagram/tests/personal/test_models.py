@@ -23,7 +23,6 @@ from btcopilot.schema import (
     asdict as schema_asdict,
 )
 
-
 _log = logging.getLogger(__name__)
 
 
@@ -88,14 +87,18 @@ def session():
     return s
 
 
-def _create_save_func(personalApp: PersonalAppController) -> Callable:
-    def save(server, applyChange, stillValidAfterRefresh, useJson=False):
-        diagramData = personalApp._diagram.getDiagramData()
-        diagramData = applyChange(diagramData)
-        personalApp._diagram.setDiagramData(diagramData)
-        return True
+@contextlib.contextmanager
+def _savedAsync(personalApp: PersonalAppController, qtbot):
+    """Send queued saves to a server that accepts every PUT."""
+
+    def saveAsync(server, applyChange, stillValidAfterRefresh, finished, **kwargs):
+        diagram = personalApp._diagram
+        diagram.setDiagramData(applyChange(diagram.getDiagramData()))
+        finished(True)
 
-    return save
+    with patch.object(personalApp._diagram, "saveAsync", saveAsync):
+        yield
+        qtbot.waitUntil(lambda: not personalApp.diagramSaveQueue.isBusy())
 
 
 @pytest.fixture
@@ -130,9 +133,9 @@ def personalApp(scene, session):
     yield personalApp
 
 
-def test_accept_person(personalApp):
+def test_accept_person(personalApp, qtbot):
     with (
-        patch.object(personalApp._diagram, "save", _create_save_func(personalApp)),
+        _savedAsync(personalApp, qtbot),
         patch.object(personalApp, "_addCommittedItemsToScene"),
     ):
         result = personalApp.acceptPDPItem(-1, undo=False)
@@ -149,9 +152,9 @@ def test_accept_person(personalApp):
     assert final_data.people[0]["id"] > 0
 
 
-def test_accept_event(personalApp):
+def test_accept_event(personalApp, qtbot):
     with (
-        patch.object(personalApp._diagram, "save", _create_save_func(personalApp)),
+        _savedAsync(personalApp, qtbot),
         patch.object(personalApp, "_addCommittedItemsToScene"),
     ):
         result = personalApp.acceptPDPItem(-3, undo=False)
@@ -172,8 +175,8 @@ def test_accept_event(personalApp):
     assert final_data.people[0]["name"] == "Alice"
 
 
-def test_reject_person(personalApp):
-    with patch.object(personalApp._diagram, "save", _create_save_func(personalApp)):
+def test_reject_person(personalApp, qtbot):
+    with _savedAsync(personalApp, qtbot):
         result = personalApp.rejectPDPItem(-1, undo=False)
 
     assert result is True
@@ -188,8 +191,8 @@ def test_reject_person(personalApp):
     assert len(final_data.events) == 0
 
 
-def test_reject_event(personalApp):
-    with patch.object(personalApp._diagram, "save", _create_save_func(personalApp)):
+def test_reject_event(personalApp, qtbot):
+    with _savedAsync(personalApp, qtbot):
         result = personalApp.rejectPDPItem(-3, undo=False)
 
     assert result is True
@@ -204,7 +207,61 @@ def test_reject_event(personalApp):
     assert len(final_data.events) == 0
 
 
-def test_accept_with_pair_bond(scene, session):
+def test_accept_queues_one_save_and_reports_failure(personalApp, qtbot):
+    sent = []
+
+    def saveAsync(server, applyChange, stillValidAfterRefresh, finished, **kwargs):
+        sent.append(applyChange)
+        finished(False)
+
+    serverErrors = []
+    personalApp.serverError.connect(serverErrors.append)
+    with (
+        patch.object(personalApp._diagram, "saveAsync", saveAsync),
+        patch.object(personalApp, "_addCommittedItemsToScene"),
+    ):
+        assert personalApp.acceptPDPItem(-1, undo=False) is True
+        assert personalApp.acceptPDPItem(-2, undo=False) is True
+        assert personalApp._diagram.getDiagramData().pdp.people == []
+        qtbot.waitUntil(lambda: not personalApp.diagramSaveQueue.isBusy())
+
+    assert len(sent) == 1
+    assert serverErrors
+
+
+def test_accept_conflict_replays_committed_ids(personalApp, qtbot):
+    serverData = personalApp._diagram.getDiagramData()
+    serverData.lastItemId = 100  # another client saved in the meantime
+    sent = []
+
+    def saveAsync(server, applyChange, stillValidAfterRefresh, finished, **kwargs):
+        # The PUT conflicted, so the change is applied to the server's copy.
+        sent.append(applyChange(serverData))
+        personalApp._diagram.setDiagramData(sent[-1])
+        finished(True)
+
+    with patch.object(personalApp._diagram, "saveAsync", saveAsync):
+        assert personalApp.acceptPDPItem(-1, undo=False) is True
+        qtbot.waitUntil(lambda: not personalApp.diagramSaveQueue.isBusy())
+
+    sceneIds = {x.id for x in personalApp.scene.people()}
+    sentIds = {x["id"] for x in sent[-1].people}
+    assert sentIds and sentIds <= sceneIds
+    assert [x.id for x in sent[-1].pdp.people] == [-2]
+    assert sent[-1].lastItemId == 100
+
+
+def test_undo_accept_while_queued(personalApp, qtbot):
+    with _savedAsync(personalApp, qtbot):
+        assert personalApp.acceptPDPItem(-1) is True
+        personalApp._undoStack.undo()  # before the save was sent
+
+    diagramData = personalApp._diagram.getDiagramData()
+    assert diagramData.people == []
+    assert [x.id for x in diagramData.pdp.people] == [-1, -2]
+
+
+def test_accept_with_pair_bond(scene, session, qtbot):
     undoStack = QUndoStack()
 
     diagramData = DiagramData(
@@ -234,7 +291,7 @@ def test_accept_with_pair_bond(scene, session):
     personalApp._diagram = diagram
 
     with (
-        patch.object(personalApp._diagram, "save", _create_save_func(personalApp)),
+        _savedAsync(personalApp, qtbot),
         patch.object(personalApp, "_addCommittedItemsToScene"),
     ):
         result = personalApp.acceptPDPItem(-3, undo=False)
@@ -257,7 +314,7 @@ def test_accept_with_pair_bond(scene, session):
     assert pair_bond["person_b"] > 0
 
 
-def test_accept_event_after_person_already_committed(scene, session):
+def test_accept_event_after_person_already_committed(scene, session, qtbot):
     """Accept person first, then accept event referencing that person.
 
     This tests the scenario where an event references a person via negative ID,
@@ -298,7 +355,7 @@ def test_accept_event_after_person_already_committed(scene, session):
 
     # First accept Bob (-2)
     with (
-        patch.object(personalApp._diagram, "save", _create_save_func(personalApp)),
+        _savedAsync(personalApp, qtbot),
         patch.object(personalApp, "_addCommittedItemsToScene"),
     ):
         result = personalApp.acceptPDPItem(-2, undo=False)
@@ -315,7 +372,7 @@ def test_accept_event_after_person_already_committed(scene, session):
     # Now accept the wedding event (-3) which references spouse=-2
     # This should work even though Bob is no longer in PDP
     with (
-        patch.object(personalApp._diagram, "save", _create_save_func(personalApp)),
+        _savedAsync(personalApp, qtbot),
         patch.object(personalApp, "_addCommittedItemsToScene"),
     ):
         result = personalApp.acceptPDPItem(-3, undo=False)
@@ -339,7 +396,7 @@ def test_accept_event_after_person_already_committed(scene, session):
     assert event["spouse"] == bob_committed_id
 
 
-def test_accept_event_with_spouse_both_in_pdp(scene, session):
+def test_accept_event_with_spouse_both_in_pdp(scene, session, qtbot):
     """Accept event where both person and spouse are still in PDP."""
     undoStack = QUndoStack()
 
@@ -376,7 +433,7 @@ def test_accept_event_with_spouse_both_in_pdp(scene, session):
 
     # Accept wedding event - should transitively commit both Alice and Bob
     with (
-        patch.object(personalApp._diagram, "save", _create_save_func(personalApp)),
+        _savedAsync(personalApp, qtbot),
         patch.object(personalApp, "_addCommittedItemsToScene"),
     ):
         result = personalApp.acceptPDPItem(-3, undo=False)
@@ -1,8 +1,9 @@
 import pytest
 from btcopilot.schema import EventKind, VariableShift
 from pkdiagram.pyqt import QDateTime, QDate
+from pkdiagram import util
 from pkdiagram.scene import Scene, Person, Event
-from pkdiagram.personal.sarfgraphmodel import SARFGraphModel
+from pkdiagram.personal.sarfgraphmodel import SARFGraphModel, SARFEventTable
 
 
 def test_sarfgraphmodel_empty(scene):
@@ -84,3 +85,100 @@ def test_sarfgraphmodel_is_life_event():
     assert model.isLifeEvent("married") == True
     assert model.isLifeEvent("shift") == False
     assert model.isLifeEvent("death") == False
+
+
+def test_sarfgraphmodel_incremental_updates(scene):
+    person = Person()
+    scene.addItem(person)
+    event1 = scene.addItem(
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(1990, 1, 1)),
+            symptom=VariableShift.Up,
+        )
+    )
+    model = SARFGraphModel()
+    model.scene = scene
+    assert model.symptomSeries == [1]
+
+    event2 = scene.addItem(
+        Event(
+            kind=EventKind.Shift,
+            person=person,
+            dateTime=QDateTime(QDate(1980, 1, 1)),
+            symptom=VariableShift.Up,
+        )
+    )
+    assert [e["id"] for e in model.events] == [event2.id, event1.id]
+    assert model.symptomSeries == [1, 2]
+
+    event2.setSymptom(VariableShift.Down)
+    assert model.symptomSeries == [-1, 0]
+    assert model.cumulative[1]["symptom"] == 0
+
+    event2.setDateTime(QDateTime(QDate(2000, 1, 1)))
+    assert [e["id"] for e in model.events] == [event1.id, event2.id]
+    assert model.symptomSeries == [1, 0]
+    assert model.yearFracs[0] == pytest.approx(1990 + 1 / 365)
+
+    scene.removeItem(event1)
+    assert [e["id"] for e in model.events] == [event2.id]
+    assert model.symptomSeries == [-1]
+
+
+def test_sarfeventtable_lookups(scene):
+    person = scene.addItem(Person())
+    events = scene.addItems(
+        *[
+            Event(
+                kind=EventKind.Shift,
+                person=person,
+                dateTime=QDateTime(QDate(year, 1, 1)),
+            )
+            for year in (2001, 1990, 1995, 1995, 2010)
+        ]
+    )
+    table = SARFEventTable()
+    table.rebuild(events)
+    for event in events:
+        assert table.ids[table.indexOf(event.id)] == event.id
+    assert table.indexOf(-1) == -1
+
+    assert [table.ids[i] for i in table.yearRows(1995)] == [
+        events[2].id,
+        events[3].id,
+    ]
+    assert [table.ids[i] for i in table.yearRows(1995, 2005)] == [
+        events[2].id,
+        events[3].id,
+        events[0].id,
+    ]
+    assert list(table.yearRows(2003)) == []
+
+    events[3].setDateTime(QDateTime(QDate(2020, 1, 1)))
+    table.update(events[3])
+    assert table.indexOf(events[3].id) == len(table) - 1
+    table.remove(events[2].id)
+    assert table.indexOf(events[2].id) == -1
+    assert [table.ids[i] for i in table.yearRows(1990, 2001)] == [
+        events[1].id,
+        events[0].id,
+    ]
+
+
+def test_sarfgraphmodel_ignores_unrelated_properties(scene):
+    person = Person()
+    scene.addItem(person)
+    event = scene.addItem(
+        Event(
+            kind=EventKind.Shift, person=person, dateTime=QDateTime(QDate(1990, 1, 1))
+        )
+    )
+    model = SARFGraphModel()
+    model.scene = scene
+    changed = util.Condition(model.changed)
+    event.setColor("#ff0000")
+    assert changed.callCount == 0
+    event.setAnxiety(VariableShift.Up)
+    assert changed.callCount == 1
@@ -0,0 +1,34 @@
+from pkdiagram.scene import Scene
+from pkdiagram.scene.diagramgenerator import DiagramSpec, generate
+
+
+def _summary(scene):
+    data = {}
+    scene.write(data)
+    people = sorted(
+        (x["id"], x["name"], x["lastName"], x["gender"]) for x in data["people"]
+    )
+    return people, len(data["pair_bonds"]), len(data["events"])
+
+
+def test_counts(scene):
+    spec = DiagramSpec(people=60, eventsPerPerson=2, emotions=10, layers=2, tags=3)
+    diagram = generate(spec, scene)
+    assert len(scene.people()) == 60
+    assert len(scene.marriages()) == len(diagram.marriages) > 0
+    assert len(scene.layers(includeInternal=False)) == 2
+    assert set(diagram.tags) <= set(scene.tags())
+    assert len(scene.emotions()) >= 10
+    assert any(x.childOf for x in scene.people())
+
+
+def test_deterministic(qApp):
+    spec = DiagramSpec(people=40, seed=7)
+    scenes = [Scene(), Scene(), Scene()]
+    generate(spec, scenes[0])
+    generate(spec, scenes[1])
+    generate(DiagramSpec(people=40, seed=8), scenes[2])
+    assert _summary(scenes[0]) == _summary(scenes[1])
+    assert _summary(scenes[0]) != _summary(scenes[2])
+    for scene in scenes:
+        scene.deinit()
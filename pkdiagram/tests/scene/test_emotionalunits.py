@@ -1,3 +1,5 @@
+import mock
+
 from btcopilot.schema import EventKind
 from pkdiagram import util
 from pkdiagram.scene import Scene, Marriage, Person, Layer, Event
@@ -82,6 +84,29 @@ def test_remove_people():
     assert child_2._layers == []
 
 
+def test_members_incremental():
+    scene = Scene()
+    marriage = _add_unit(scene)
+    personA, personB = marriage.people
+    child_1, child_2 = marriage.children
+    emotionalUnit = marriage.emotionalUnit()
+    assert emotionalUnit.members() == {personA, personB, child_1, child_2}
+
+    child_3 = scene.addItem(Person(name="E"))
+    child_3.setParents(marriage)
+    assert child_3.layers() == [emotionalUnit.layer().id]
+    assert child_3 in emotionalUnit.members()
+
+    child_3.setParents(None)
+    assert child_3.layers() == []
+    assert child_3 not in emotionalUnit.members()
+
+    # Nothing changes on a no-op update
+    with mock.patch.object(personA, "setLayers") as setLayers:
+        emotionalUnit.update()
+    assert setLayers.call_count == 0
+
+
 def test_ignores_custom_layers():
     CUSTOM_NAME = "My Layer"
 
@@ -1,7 +1,8 @@
 import pytest
+from mock import patch
 
 from btcopilot.schema import RelationshipKind, EventKind
-from pkdiagram.pyqt import QPointF, QDateTime
+from pkdiagram.pyqt import QPointF, QDateTime, QGraphicsScene, QPainter
 from pkdiagram import util
 from pkdiagram.scene import Scene, Person, Emotion, Layer, ItemMode
 from pkdiagram.scene.emotions import Jig, FannedBox
@@ -704,3 +705,58 @@ def test_drag_create_cutoff_emotion(qtbot):
     assert emotion.kind() == RelationshipKind.Cutoff
     assert emotion.pos() == QPointF(0, 0)
     assert emotion.parentItem() == person
+
+
+def test_levelOfDetail(scene):
+    personA, personB = scene.addItems(
+        Person(pos=QPointF(-200, 0)), Person(pos=QPointF(200, 0))
+    )
+    event = scene.addItem(
+        Event(
+            EventKind.Shift,
+            personA,
+            relationship=RelationshipKind.Conflict,
+            relationshipTargets=[personB],
+            dateTime=util.Date(2001, 2, 1),
+        )
+    )
+    conflict = scene.emotionsFor(event)[0]
+    fullCount = conflict.path().elementCount()
+    assert fullCount > 2
+
+    scene.setLevelOfDetail(util.LOD_SIMPLE)
+    assert conflict.path().elementCount() == 2
+    assert personA.cacheMode() == personA.DeviceCoordinateCache
+
+    scene.setLevelOfDetail(util.LOD_FULL)
+    assert conflict.path().elementCount() == fullCount
+    assert personA.cacheMode() == personA.NoCache
+
+
+def test_render_uses_full_detail(scene):
+    personA, personB = scene.addItems(
+        Person(pos=QPointF(-200, 0)), Person(pos=QPointF(200, 0))
+    )
+    event = scene.addItem(
+        Event(
+            EventKind.Shift,
+            personA,
+            relationship=RelationshipKind.Conflict,
+            relationshipTargets=[personB],
+            dateTime=util.Date(2001, 2, 1),
+        )
+    )
+    conflict = scene.emotionsFor(event)[0]
+    fullCount = conflict.path().elementCount()
+    scene.setLevelOfDetail(util.LOD_SIMPLE)
+
+    rendered = []
+    with patch.object(
+        QGraphicsScene,
+        "render",
+        lambda *args: rendered.append(conflict.path().elementCount()),
+    ):
+        scene.render(QPainter())
+    assert rendered == [fullCount]
+    assert scene.levelOfDetail() == util.LOD_SIMPLE
+    assert conflict.path().elementCount() == 2
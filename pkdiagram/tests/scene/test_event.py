@@ -349,3 +349,21 @@ def test_read_filters_invalid_relationshipTriangles(scene, caplog):
     newScene.deinit()
 
 
+def test_sortKey(scene):
+    person = scene.addItem(Person())
+    death = scene.addItem(
+        Event(EventKind.Death, person, dateTime=util.Date(2000, 1, 2))
+    )
+    birth = scene.addItem(
+        Event(EventKind.Birth, person, dateTime=util.Date(2000, 1, 2))
+    )
+    undated = scene.addItem(Event(EventKind.Shift, person))
+    assert sorted([undated, death, birth], key=Event.sortKey) == [
+        birth,
+        death,
+        undated,
+    ]
+    assert birth < death
+
+    undated.setDateTime(util.Date(1999, 1, 1), notify=False)  # invalidates cache
+    assert sorted([death, birth, undated], key=Event.sortKey)[0] == undated
@@ -2,7 +2,9 @@ import enum
 
 import pytest
 
+from pkdiagram import util
 from pkdiagram.scene import Scene, Item, Layer
+from pkdiagram.scene.property import Property
 
 pytestmark = [pytest.mark.component("Item")]
 
@@ -139,3 +141,99 @@ def test_set_enum():
 
     with pytest.raises(ValueError):
         item.setKind("three")
+
+
+class MyListItem(Item):
+    Item.registerProperties(({"attr": "things", "default": []},))
+
+
+def test_schema_compiled_once():
+    assert Item.classSchema(MyListItem) is Item.classSchema(MyListItem)
+    item1, item2 = MyListItem(), MyListItem()
+    assert item1.prop("things")._spec is item2.prop("things")._spec
+
+
+def test_mutable_default_not_shared():
+    item1, item2 = MyListItem(), MyListItem()
+    item1.things().append(1)
+    assert item1.things() == [1]
+    assert item2.things() == []
+
+
+def test_setLayered_rebinds_getter(scene):
+    item = MyNumItem(num=1)
+    assert item.num() == 1
+    layer = Layer(name="Layer 1", active=True)
+    scene.addItems(item, layer)
+    item.prop("num").setLayered(True)
+    item.prop("num").set(2, forLayers=[layer])
+    item.onActiveLayersChanged()
+    assert item.num() == 2
+    assert item.prop("num").get(forLayers=[]) == 1
+
+
+class MyDateItem(Item):
+    Item.registerProperties(({"attr": "dateTime"},))
+
+
+def test_sortBy_dateTime():
+    items = [MyDateItem(dateTime=util.Date(2000 - i, 1, 1)) for i in range(3)]
+    undated = MyDateItem()
+    assert Property.sortBy(items + [undated], "dateTime") == [undated] + items[::-1]
+
+
+class NotifyCounter:
+    def __init__(self):
+        self.props = []
+        self.refreshes = 0
+
+    def onItemProperty(self, prop):
+        self.props.append(prop)
+        prop.scene().deferCall(self.refresh)
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+@pytest.mark.parametrize("undo", [False, True])
+def test_macro_deferNotifications(scene, undo):
+    items = scene.addItems(*[MyNumItem() for i in range(10)])
+    counter = NotifyCounter()
+    for item in items:
+        item.addPropertyListener(counter)
+    with scene.macro("Set nums", undo=undo, deferNotifications=True):
+        for item in items:
+            item.setNum(1, undo=undo)
+            item.setNum(2, undo=undo)
+            assert counter.props == []
+    assert [x.item for x in counter.props] == items  # once per item
+    assert counter.refreshes == 1
+    assert all(item.num() == 2 for item in items)
+
+    if undo:
+        counter.props, counter.refreshes = [], 0
+        scene.undo()
+        assert all(item.num() == -1 for item in items)
+        assert [x.item for x in counter.props] == list(reversed(items))
+        assert counter.refreshes == 1
+
+
+def test_notifications_not_deferred(scene):
+    item = scene.addItem(MyNumItem())
+    counter = NotifyCounter()
+    item.addPropertyListener(counter)
+    with scene.macro("Set num"):
+        item.setNum(1, undo=True)
+        assert len(counter.props) == 1
+        assert counter.refreshes == 1
+
+    # Nor when undoing or redoing that macro.
+    item.setNum(2, undo=True)
+    with scene.macro("Set num again"):
+        item.setNum(3, undo=True)
+        item.setNum(4, undo=True)
+    for undoRedo in (scene.undo, scene.redo):
+        counter.props, counter.refreshes = [], 0
+        undoRedo()
+        assert len(counter.props) == 2
+        assert counter.refreshes == 2
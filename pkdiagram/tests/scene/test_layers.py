@@ -56,6 +56,14 @@ def test_add_layers_retain_order(scene):
     assert scene.query1(name="View 4").order() == 3
 
 
+def test_sortKey_follows_name(scene):
+    layerA, layerB, unnamed = scene.addItems(Layer(name="A"), Layer(name="B"), Layer())
+    assert sorted([unnamed, layerB, layerA]) == [layerA, layerB, unnamed]
+
+    layerA.setName("C")  # invalidates cache
+    assert sorted([unnamed, layerB, layerA]) == [layerB, layerA, unnamed]
+
+
 def test_layerOrderChanged(scene):
     scene.addItems(
         Layer(name="View 1"),
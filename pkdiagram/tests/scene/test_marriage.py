@@ -177,6 +177,35 @@ def test_sort():
     assert marriage2 < marriage1
 
 
+def test_sortKey_follows_birth_dates(scene):
+    child1, child2 = scene.addItems(Person(), Person())
+    mother1, father1, marriage1 = scene.ensureParentsFor(child1)
+    mother2, father2, marriage2 = scene.ensureParentsFor(child2)
+    birth1, birth2 = scene.addItems(
+        Event(
+            EventKind.Birth,
+            mother1,
+            spouse=father1,
+            child=child1,
+            dateTime=util.Date(2001, 1, 1),
+        ),
+        Event(
+            EventKind.Birth,
+            mother2,
+            spouse=father2,
+            child=child2,
+            dateTime=util.Date(2002, 1, 1),
+        ),
+    )
+    assert marriage1 < marriage2
+
+    birth1.setDateTime(util.Date(2003, 1, 1))  # invalidates cache
+    assert marriage2 < marriage1
+
+    scene.removeItem(birth2)
+    assert marriage2.sortKey() == (0, 0)
+
+
 def test_marriageFor_one(scene, marriage):
     personA, personB = marriage.people
     assert scene.marriageFor(personA, personB) == marriage
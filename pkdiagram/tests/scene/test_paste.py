@@ -0,0 +1,96 @@
+import pytest
+
+from btcopilot.schema import EventKind
+from pkdiagram import util
+from pkdiagram.pyqt import QPointF
+from pkdiagram.scene import Scene, Person, Marriage, Event
+from pkdiagram.scene.clipboard import Clipboard, ImportItems
+from pkdiagram.scene.diagramgenerator import DiagramSpec, generate
+
+pytestmark = [
+    pytest.mark.component("Scene"),
+    pytest.mark.depends_on("Item"),
+]
+
+
+def _family(scene):
+    father, mother, child = scene.addItems(
+        Person(name="father"), Person(name="mother"), Person(name="child")
+    )
+    marriage = scene.addItem(Marriage(father, mother))
+    child.setParents(marriage)
+    birth = scene.addItem(
+        Event(
+            EventKind.Birth,
+            father,
+            spouse=mother,
+            child=child,
+            dateTime=util.Date(1990, 1, 1),
+        )
+    )
+    return father, mother, child, marriage, birth
+
+
+def test_paste_remaps_family(scene):
+    father, mother, child, marriage, birth = _family(scene)
+    for person in (father, mother, child):
+        person.setSelected(True)
+    scene.copy()
+    items = scene.paste()
+
+    people = [x for x in items if x.isPerson]
+    assert len(people) == 3
+    assert not set(people) & {father, mother, child}
+    byName = {x.name(): x for x in people}
+    assert byName["child"].parents() is not marriage
+    assert set(byName["child"].parents().people) == {
+        byName["father"],
+        byName["mother"],
+    }
+    assert byName["father"].itemPos() == father.itemPos() + QPointF(
+        util.PASTE_OFFSET, util.PASTE_OFFSET
+    )
+    events = [x for x in items if x.isEvent]
+    assert len(events) == 1
+    assert events[0].child() is byName["child"]
+    assert len(scene.people()) == 6
+    assert len(scene.marriages()) == 2
+
+
+def test_paste_skips_events_for_unselected_people(scene):
+    father, mother, child, marriage, birth = _family(scene)
+    child.setSelected(True)
+    scene.copy()
+    items = scene.paste()
+    assert [x.name() for x in items] == ["child"]
+    assert items[0].parents() is None
+
+
+def test_paste_undo_redo(scene):
+    father, mother, child, marriage, birth = _family(scene)
+    for person in (father, mother, child):
+        person.setSelected(True)
+    scene.copy()
+    items = scene.paste()
+    assert len(scene.people()) == 6
+    scene.undo()
+    assert len(scene.people()) == 3
+    assert len(scene.events()) == 1
+    scene.redo()
+    assert len(scene.people()) == 6
+    assert len(scene.events()) == 2
+    assert all(x.scene() is scene for x in items if x.isPathItem)
+
+
+def test_import_generated(scene):
+    source = Scene()
+    generate(DiagramSpec(people=80, emotions=10), source)
+    items = Clipboard(source.people()).copy(scene)
+    source.deinit()
+    scene.push(ImportItems(scene, items))
+    assert len(scene.people()) == 80
+    assert len(scene.events()) > 80
+    ids = [x.id for x in scene.itemRegistry.values()]
+    assert len(ids) == len(set(ids))
+    scene.undo()
+    assert scene.people() == []
@@ -0,0 +1,62 @@
+import math
+from array import array
+
+import pytest
+
+from pkdiagram.pyqt import Qt, QImage, QColor, QPointF, QRect, QPoint
+from pkdiagram.scene import PencilStroke
+from pkdiagram.scene.pencilstroke import (
+    bbox,
+    packPoints,
+    unpackPoints,
+    simplifyPoints,
+)
+
+pytestmark = [
+    pytest.mark.component("PencilStroke"),
+    pytest.mark.depends_on("Scene"),
+]
+
+
+def test_bbox(qApp):
+    image = QImage(40, 30, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    image.setPixelColor(5, 7, QColor("red"))
+    image.setPixelColor(33, 20, QColor("blue"))
+    assert bbox(image) == QRect(QPoint(5, 7), QPoint(33, 20))
+
+
+def test_pack_roundtrip():
+    points = [QPointF(1, 2), QPointF(3.5, -4)]
+    assert unpackPoints(packPoints(points)) == points
+
+
+def test_simplifyPoints():
+    line = array("d")
+    for i in range(100):
+        line.extend((i, 0.1 * (i % 2)))
+    assert simplifyPoints(line, 0.5) == array("d", [0, 0, 99, 0.1])
+
+    circle = array("d")
+    for i in range(200):
+        circle.extend((math.cos(i / 30) * 50, math.sin(i / 30) * 50))
+    simplified = simplifyPoints(circle, 0.5)
+    assert 4 < len(simplified) // 2 < 50
+    assert simplified[:2] == circle[:2]
+    assert simplified[-2:] == circle[-2:]
+
+
+def test_draw_incrementally_then_simplify(scene):
+    stroke = PencilStroke()
+    scene.addItem(stroke)
+    stroke.beginDrawing()
+    for i in range(100):
+        stroke.addPoint(QPointF(i, 0))
+        assert stroke.isDrawing()
+    assert stroke.points() == []  # samples are only kept packed while drawing
+    assert stroke.path().currentPosition() == QPointF(99, 0)
+
+    stroke.endDrawing()
+    assert not stroke.isDrawing()
+    assert stroke.points() == [QPointF(0, 0), QPointF(99, 0)]
+    assert not stroke.path().isEmpty()
@@ -4,6 +4,7 @@ import pytest
 
 from btcopilot.schema import EventKind
 from pkdiagram import util
+from pkdiagram.pyqt import QPointF
 from pkdiagram.scene import Scene, Person, Marriage, Event
 
 pytestmark = [
@@ -108,3 +109,55 @@ def test_find_by_types_and_tags(simpleScene):
 
     items = simpleScene.find(tags=["hello"], types=Person)
     assert len(items) == 2
+
+
+def test_eventsFor_tracks_add_remove_and_people(scene):
+    personA, personB, personC = scene.addItems(
+        Person(name="A"), Person(name="B"), Person(name="C")
+    )
+    marriage = scene.addItem(Marriage(personA, personB))
+    early = scene.addItem(
+        Event(EventKind.Shift, personA, dateTime=util.Date(2000, 1, 1))
+    )
+    married = scene.addItem(
+        Event(
+            EventKind.Married, personA, spouse=personB, dateTime=util.Date(1990, 1, 1)
+        )
+    )
+    assert scene.eventsFor(personA) == [married, early]
+    assert scene.eventsFor(personB) == [married]
+    assert scene.eventsFor(marriage) == [married]
+
+    married.setSpouse(personC)
+    assert scene.eventsFor(personB) == []
+    assert scene.eventsFor(personC) == [married]
+    assert scene.eventsFor(marriage) == []
+
+    scene.removeItem(early)
+    assert scene.eventsFor(personA) == [married]
+    late = scene.addItem(
+        Event(EventKind.Shift, personC, dateTime=util.Date(2010, 1, 1))
+    )
+    assert scene.eventsFor(personC) == [married, late]
+
+
+def test_items_under(scene):
+    personA, personB = scene.addItems(Person(name="A"), Person(name="B"))
+    personA.setItemPosNow(QPointF(-500, 0))
+    personB.setItemPosNow(QPointF(500, 0))
+    marriage = scene.addItem(Marriage(personA, personB))
+    assert scene.personUnder(QPointF(-500, 0)) == personA
+    assert scene.personUnder(QPointF(500, 0)) == personB
+    assert scene.personUnder(QPointF(0, 0)) is None
+    assert scene.itemUnder(QPointF(500, 0), types=(Marriage, Person)) == personB
+
+    personB.setPos(QPointF(700, 0))
+    assert scene.personUnder(QPointF(500, 0)) is None
+    assert scene.personUnder(QPointF(700, 0)) == personB
+    assert marriage in scene.spatialIndex()
+
+    personC = scene.addItem(Person(name="C", pos=QPointF(0, 500)))
+    assert scene.personUnder(QPointF(0, 500)) == personC
+    scene.removeItem(personC)
+    assert scene.personUnder(QPointF(0, 500)) is None
+    assert personC not in scene.spatialIndex()
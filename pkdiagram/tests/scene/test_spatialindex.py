@@ -0,0 +1,95 @@
+import pytest
+
+from pkdiagram.pyqt import QGraphicsScene, QGraphicsRectItem, QPointF, QRectF
+from pkdiagram.scene import SpatialIndex
+
+pytestmark = [
+    pytest.mark.component("SpatialIndex"),
+]
+
+
+class Box(QGraphicsRectItem):
+    pass
+
+
+class OtherBox(QGraphicsRectItem):
+    pass
+
+
+@pytest.fixture
+def graphicsScene(qApp):
+    ret = QGraphicsScene()
+    yield ret
+    ret.clear()
+
+
+def _add(graphicsScene, index, cls, x, y, z=0):
+    item = cls(QRectF(0, 0, 100, 100))
+    item.setPos(x, y)
+    item.setZValue(z)
+    graphicsScene.addItem(item)
+    index.add(item)
+    return item
+
+
+def test_itemsAt_by_type(graphicsScene):
+    index = SpatialIndex()
+    box = _add(graphicsScene, index, Box, 0, 0)
+    other = _add(graphicsScene, index, OtherBox, 50, 50)
+    assert index.itemsAt(QPointF(75, 75), Box) == [box]
+    assert index.itemsAt(QPointF(75, 75), OtherBox) == [other]
+    assert index.itemAt(QPointF(75, 75), (Box, OtherBox)) == other  # added last
+    assert index.itemAt(QPointF(500, 500), Box) is None
+
+
+def test_itemsAt_stacking(graphicsScene):
+    index = SpatialIndex()
+    top = _add(graphicsScene, index, Box, 0, 0, z=1)
+    bottom = _add(graphicsScene, index, Box, 0, 0, z=0)
+    assert index.itemsAt(QPointF(50, 50), Box) == [top, bottom]
+    assert graphicsScene.items(QPointF(50, 50)) == [top, bottom]
+
+
+def test_markDirty(graphicsScene):
+    index = SpatialIndex(cellSize=50)
+    box = _add(graphicsScene, index, Box, 0, 0)
+    assert index.itemAt(QPointF(10, 10), Box) == box
+    box.setPos(1000, 1000)
+    assert index.itemAt(QPointF(1010, 1010), Box) is None  # stale until marked
+    index.markDirty(box)
+    assert index.itemAt(QPointF(10, 10), Box) is None
+    assert index.itemAt(QPointF(1010, 1010), Box) == box
+
+
+def test_hidden_and_removed(graphicsScene):
+    index = SpatialIndex()
+    box = _add(graphicsScene, index, Box, 0, 0)
+    box.setVisible(False)
+    assert index.itemAt(QPointF(10, 10), Box) is None
+    box.setVisible(True)
+    index.remove(box)
+    assert index.itemAt(QPointF(10, 10), Box) is None
+    assert len(index) == 0
+
+
+def test_itemsIn(graphicsScene):
+    index = SpatialIndex(cellSize=50)
+    a = _add(graphicsScene, index, Box, 0, 0)
+    b = _add(graphicsScene, index, Box, 300, 0)
+    _add(graphicsScene, index, OtherBox, 0, 0)
+    assert set(index.itemsIn(QRectF(-10, -10, 500, 20), Box)) == {a, b}
+    assert index.itemsIn(QRectF(250, 0, 10, 10), Box) == []
+
+
+def test_nearestTop(graphicsScene):
+    index = SpatialIndex()
+    a = _add(graphicsScene, index, Box, 0, 0)
+    b = _add(graphicsScene, index, Box, 500, 100)
+    c = _add(graphicsScene, index, Box, 900, 180)
+    assert index.nearestTop(90, Box)[0] == b
+    assert index.nearestTop(150, Box)[0] == c
+    item, rect, distance = index.nearestTop(40, Box, accept=lambda x: x is not a)
+    assert item == b
+    assert rect == b.sceneBoundingRect()
+    assert distance == rect.top() - 40
+    assert index.nearestTop(0, OtherBox) is None
@@ -0,0 +1,50 @@
+import pytest
+
+from pkdiagram import util
+from pkdiagram.scene import Person, Marriage, updateprofiler
+
+
+@pytest.fixture
+def profiler(scene):
+    updateprofiler.reset()
+    updateprofiler.enable([scene])
+    yield updateprofiler
+    updateprofiler.disable()
+    updateprofiler.reset()
+
+
+def test_disabled_restores_methods(scene):
+    updateGeometry = Person.__dict__["updateGeometry"]
+    updateprofiler.enable([scene])
+    assert Person.__dict__["updateGeometry"] is not updateGeometry
+    updateprofiler.disable()
+    assert Person.__dict__["updateGeometry"] is updateGeometry
+    assert updateprofiler.frame("updateAll") is updateprofiler.frame("other")
+
+
+def test_updateAll_frame(scene, profiler):
+    personA, personB = scene.addItems(Person(name="A"), Person(name="B"))
+    scene.addItem(Marriage(personA, personB))
+    profiler.reset()
+
+    scene.updateAll()
+    (frame,) = profiler.frames()
+    assert frame["kind"] == "updateAll"
+    assert frame["stats"]["Person.updateGeometry"]["calls"] == 2
+    assert frame["stats"]["Marriage.updateGeometry"]["calls"] == 1
+    assert frame["stats"]["Person.updateAll"]["calls"] == 2
+    assert "Person.updateGeometry" in profiler.dump()
+
+
+def test_currentDateTime_frame_and_signals(scene, profiler):
+    scene.addItem(Person(name="A"))
+    profiler.reset()
+
+    scene.setCurrentDateTime(util.Date(2000, 1, 1))
+    frames = profiler.frames()
+    kinds = [x["kind"] for x in frames]
+    assert "currentDateTime" in kinds
+    names = {x["name"] for x in profiler.summary()}
+    assert "Person.onCurrentDateTime" in names
+    assert "Scene.Property.set" in names
+    assert "Scene.propertyChanged" in names
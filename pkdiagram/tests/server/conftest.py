@@ -0,0 +1,73 @@
+import gzip
+import pickle
+import hashlib
+import threading
+import http.server
+
+import pytest
+import mock
+
+from pkdiagram import util
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """
+    A minimal diagram server: stores PUT bodies by path and returns them on
+    GET with an ETag, answering matching If-None-Match with 304. Compresses
+    responses and accepts compressed requests as the real endpoints should.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=b"", headers=None):
+        accept = self.headers.get("Accept-Encoding", "")
+        compress = len(body) >= 1024 and "gzip" in accept
+        if compress:
+            body = gzip.compress(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-python-pickle")
+        self.send_header("Accept-Encoding", "gzip")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests.append((dict(self.headers), b""))
+        body = self.server.bodies.get(self.path)
+        if body is None:
+            self._reply(404)
+            return
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self._reply(304, headers={"ETag": etag})
+        else:
+            self._reply(200, body, headers={"ETag": etag})
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append((dict(self.headers), body))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        self.server.bodies[self.path] = body
+        self._reply(200, pickle.dumps({"version": 2}))
+
+
+@pytest.fixture
+def standInServer():
+    """A local HTTP server on a free port that Server requests go to."""
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    httpd.bodies = {}  # path: bytes
+    httpd.requests = []  # [(headers, body)]
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    with mock.patch.object(
+        util, "SERVER_URL_ROOT", f"http://127.0.0.1:{httpd.server_address[1]}"
+    ):
+        yield httpd
+    httpd.shutdown()
+    httpd.server_close()
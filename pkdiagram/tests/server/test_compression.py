@@ -0,0 +1,50 @@
+import pickle
+
+import pytest
+
+from pkdiagram.server_types import (
+    Server,
+    encodeBody,
+    decodeBody,
+    FD_COMPRESS_MIN_BYTES,
+)
+
+
+def test_encodeBody_roundtrip():
+    bdata = pickle.dumps({"people": [{"id": i, "name": "x"} for i in range(5000)]})
+    encoded, md5 = encodeBody(bdata, "gzip")
+    assert len(encoded) < len(bdata)
+    assert decodeBody(encoded, "gzip") == bdata
+    assert md5 == encodeBody(encoded)[1]
+
+
+@pytest.mark.real_server
+def test_compressed_put_and_get(standInServer):
+    server = Server()
+    bdata = pickle.dumps(list(range(FD_COMPRESS_MIN_BYTES)))
+
+    # No upload compression until the server has advertised it.
+    server.blockingRequest("PUT", "/v1/diagrams/1", bdata=bdata, from_root=True)
+    headers, body = standInServer.requests[-1]
+    assert "Content-Encoding" not in headers
+    assert body == bdata
+
+    server.blockingRequest("PUT", "/v1/diagrams/1", bdata=bdata, from_root=True)
+    headers, body = standInServer.requests[-1]
+    assert headers["Content-Encoding"] == "gzip"
+    assert len(body) < len(bdata)
+    assert headers["Content-MD5"] == encodeBody(body)[1]
+
+    response = server.blockingRequest("GET", "/v1/diagrams/1", from_root=True)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.body == bdata
+
+
+@pytest.mark.real_server
+def test_small_bodies_not_compressed(standInServer):
+    server = Server()
+    server._requestEncodings = {"gzip"}
+    server.blockingRequest("PUT", "/v1/diagrams/2", bdata=b"small", from_root=True)
+    headers, body = standInServer.requests[-1]
+    assert "Content-Encoding" not in headers
+    assert body == b"small"
@@ -0,0 +1,58 @@
+import os
+import pickle
+
+import pytest
+
+from pkdiagram.httpcache import HTTPCache
+from pkdiagram.server_types import Server
+
+
+def test_put_and_validators(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    assert cache.validators("key") == {}
+    cache.put("key", b"body", etag='"abc"', lastModified="Mon, 01 Jan 2024")
+    assert cache.validators("key") == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 Jan 2024",
+    }
+    assert cache.body("key") == b"body"
+
+    cache.put("key", b"body")  # no validators any more
+    assert cache.validators("key") == {}
+    assert cache.body("key") is None
+
+
+def test_prune_oldest(tmp_path):
+    cache = HTTPCache(str(tmp_path), maxSize=2500)
+    for i in range(3):
+        cache.put(f"key-{i}", bytes(1000), etag=str(i))
+        os.utime(cache._paths(f"key-{i}")[1], (i, i))
+    cache.prune()
+    assert cache.body("key-0") is None
+    assert cache.body("key-2") == bytes(1000)
+    assert cache.size() <= 2500
+
+
+@pytest.mark.real_server
+def test_conditional_get(tmp_path, standInServer):
+    server = Server(cache=HTTPCache(str(tmp_path)))
+    bdata = pickle.dumps({"id": 1, "data": b"x" * 5000})
+    standInServer.bodies["/v1/diagrams/1"] = bdata
+
+    response = server.blockingRequest("GET", "/v1/diagrams/1", from_root=True)
+    assert response.body == bdata
+    assert response.notModified == False
+    headers, _ = standInServer.requests[-1]
+    assert "If-None-Match" not in headers
+
+    response = server.blockingRequest("GET", "/v1/diagrams/1", from_root=True)
+    headers, _ = standInServer.requests[-1]
+    assert headers["If-None-Match"] == response.headers["ETag"]
+    assert response.status_code == 200
+    assert response.notModified == True
+    assert response.body == bdata
+
+    standInServer.bodies["/v1/diagrams/1"] = pickle.dumps({"id": 1, "data": b"y"})
+    response = server.blockingRequest("GET", "/v1/diagrams/1", from_root=True)
+    assert response.notModified == False
+    assert pickle.loads(response.body)["data"] == b"y"
@@ -0,0 +1,105 @@
+import pytest
+
+from pkdiagram.savequeue import DiagramSaveQueue
+
+
+class FakeDiagram:
+    """Records saveAsync() calls so the test decides when each PUT finishes."""
+
+    def __init__(self, id=1):
+        self.id = id
+        self.data = []
+        self.calls = []
+
+    def saveAsync(
+        self, server, applyChange, stillValidAfterRefresh, finished, **kwargs
+    ):
+        self.calls.append((applyChange, finished))
+
+    def getDiagramData(self):
+        return list(self.data)
+
+    def setDiagramData(self, data):
+        self.data = data
+
+    def finish(self, success=True):
+        applyChange, finished = self.calls[-1]
+        if success:
+            self.data = applyChange(list(self.data))
+        finished(success)
+
+
+def _append(x):
+    return lambda data: data + [x]
+
+
+def _add(x):
+    return lambda data: data if x in data else data + [x]
+
+
+@pytest.fixture
+def saveQueue(qApp):
+    ret = DiagramSaveQueue(lambda: None, coalesceMs=0)
+    yield ret
+    ret.cancelAll()
+
+
+def test_coalesce(qtbot, saveQueue):
+    diagram = FakeDiagram()
+    results = []
+    for i in range(3):
+        saveQueue.save(diagram, _append(i), finished=results.append)
+    assert saveQueue.isBusy()
+    qtbot.waitUntil(lambda: len(diagram.calls) == 1)
+    diagram.finish()
+    assert diagram.data == [0, 1, 2]
+    assert results == [True, True, True]
+    assert not saveQueue.isBusy()
+
+
+def test_key_replaces_pending(qtbot, saveQueue):
+    diagram = FakeDiagram()
+    saveQueue.save(diagram, _append("old"), key="scene")
+    saveQueue.save(diagram, _append("new"), key="scene")
+    qtbot.waitUntil(lambda: len(diagram.calls) == 1)
+    diagram.finish()
+    assert diagram.data == ["new"]
+
+
+def test_changes_during_flight_sent_next(qtbot, saveQueue):
+    diagram = FakeDiagram()
+    saveQueue.save(diagram, _append(1))
+    qtbot.waitUntil(lambda: len(diagram.calls) == 1)
+    saveQueue.save(diagram, _append(2))
+    diagram.finish()
+    assert len(diagram.calls) == 2
+    diagram.finish()
+    assert diagram.data == [1, 2]
+    assert not saveQueue.isBusy()
+
+
+def test_cancel(qtbot, saveQueue):
+    diagram = FakeDiagram()
+    results = []
+    saveQueue.save(diagram, _append(1), finished=results.append)
+    qtbot.waitUntil(lambda: len(diagram.calls) == 1)
+    saveQueue.save(diagram, _append(2), finished=results.append)
+    saveQueue.cancel(diagram.id)
+    assert results == [False, False]
+    assert not saveQueue.isBusy()
+    diagram.finish()  # late reply is ignored
+    assert results == [False, False]
+
+
+def test_applyLocally(qtbot, saveQueue):
+    diagram = FakeDiagram()
+    saveQueue.save(diagram, _add(1), applyLocally=True)
+    assert diagram.data == [1]
+    qtbot.waitUntil(lambda: len(diagram.calls) == 1)
+    saveQueue.save(diagram, _add(2), applyLocally=True)
+    assert diagram.data == [1, 2]
+    diagram.data = [1]  # the PUT's reply replaces the local copy
+    diagram.finish()
+    assert diagram.data == [1, 2]  # queued local change applied again
+    diagram.finish()
+    assert diagram.data == [1, 2]
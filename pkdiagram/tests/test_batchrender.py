@@ -0,0 +1,54 @@
+import os
+import json
+import pickle
+
+from pkdiagram import batchrender
+from pkdiagram.pyqt import QImage, QPointF
+from pkdiagram.scene import Scene, Person, Layer
+
+
+def _writePackage(path):
+    scene = Scene()
+    scene.addItems(Person(name="A"), Person(name="B", itemPos=QPointF(200, 0)))
+    scene.addItem(Layer(name="View 1"))
+    data = {}
+    scene.write(data)
+    scene.deinit()
+    os.makedirs(path)
+    with open(os.path.join(path, "diagram.pickle"), "wb") as f:
+        f.write(pickle.dumps(data))
+    return path
+
+
+def test_findPackages(tmp_path):
+    one = _writePackage(str(tmp_path / "one.fd"))
+    two = _writePackage(str(tmp_path / "sub" / "two.fd"))
+    assert batchrender.findPackages([str(tmp_path)]) == [one, two]
+    assert batchrender.findPackages([two]) == [two]
+
+
+def test_renderAll_in_process(qApp, tmp_path):
+    fdPath = _writePackage(str(tmp_path / "in" / "one.fd"))
+    os.makedirs(tmp_path / "in" / "bad.fd")
+    outDir = str(tmp_path / "out")
+    options = batchrender.RenderOptions(
+        formats=("png", "pdf"), layers=("View 1",), maxSize=64
+    )
+    manifest = batchrender.renderAll(
+        batchrender.findPackages([str(tmp_path / "in")]), outDir, options, jobs=1
+    )
+    assert manifest["count"] == 2
+    assert manifest["failed"] == 1
+    with open(os.path.join(outDir, batchrender.MANIFEST_NAME)) as f:
+        assert json.load(f) == manifest
+
+    bad, good = manifest["results"]
+    assert not bad["ok"] and bad["error"]
+    assert good["ok"] and good["source"] == fdPath
+    image = QImage(good["outputs"]["png"]["path"])
+    assert max(image.width(), image.height()) <= 64
+    assert os.path.getsize(good["outputs"]["pdf"]["path"]) > 0
+
+    options = batchrender.RenderOptions(formats=("png",), skipUnchanged=True)
+    result = batchrender.renderOne(fdPath, outDir, options)
+    assert result["skipped"]
@@ -0,0 +1,25 @@
+import json
+
+from pkdiagram import benchmark
+from pkdiagram.scene.diagramgenerator import DiagramSpec
+
+
+def test_run_and_compare(qApp):
+    spec = DiagramSpec(people=20, emotions=5, layers=1, tags=2)
+    results = benchmark.run(spec, repeat=1)
+    json.dumps(results)  # machine-readable
+    assert results["counts"]["people"] == 20
+    assert set(results["timings"]) >= {
+        "write",
+        "read",
+        "pickle.save",
+        "pickle.load",
+        "layers.switch",
+        "currentDateTime.scrub",
+        "timeline.refresh",
+        "search.tags",
+        "bulkDelete.undo",
+        "bulkDelete.redo",
+    }
+    rows = benchmark.compare(results, results)
+    assert rows and all(ratio == 1 for *_, ratio in rows)
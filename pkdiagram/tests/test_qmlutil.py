@@ -0,0 +1,18 @@
+import datetime
+
+from pkdiagram.pyqt import QJSValue
+from pkdiagram.app.qmlutil import _qmlValue
+
+
+def test_qmlValue_matches_json():
+    value = _qmlValue(
+        {
+            1: (1, 2.5, "x"),
+            "when": datetime.datetime(2024, 1, 2, 3, 4, 5),
+            "nested": {"none": None},
+        }
+    )
+    assert value["1"] == [1, 2.5, "x"]
+    assert value["when"] == "2024-01-02T03:04:05"
+    none = value["nested"]["none"]
+    assert isinstance(none, QJSValue) and none.isNull()
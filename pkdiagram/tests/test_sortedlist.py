@@ -1,4 +1,4 @@
-from pkdiagram import util
+from pkdiagram import util, sortedlist
 from sortedcontainers import SortedList
 
 
@@ -15,3 +15,22 @@ def test_SortedList():
     stuff.add(d4)
     assert d2 in stuff
     assert d3 in stuff
+
+
+class Thing:
+    def __init__(self, value):
+        self.value = value
+
+
+def test_pkdiagram_SortedList_key():
+    stuff = sortedlist.SortedList(key=lambda x: x.value)
+    things = [Thing(v) for v in (3, 1, 2, 2)]
+    for thing in things:
+        stuff.add(thing)
+    assert [x.value for x in stuff] == [1, 2, 2, 3]
+    assert stuff.index(things[3]) == 2  # equal keys, found by scanning
+    assert stuff.bisect_right(Thing(2)) == 3
+
+    things[0].value = 0  # stale key falls back to a linear search
+    stuff.remove(things[0])
+    assert [x.value for x in stuff] == [1, 2, 2]
@@ -0,0 +1,42 @@
+import sys
+import json
+import importlib
+
+from pkdiagram import startuptrace
+
+
+def test_trace_imports_and_spans(tmp_path):
+    path = str(tmp_path / "trace.json")
+    sys.modules.pop("colorsys", None)
+    startuptrace.start(path)
+    assert startuptrace.isActive()
+    import colorsys
+
+    with startuptrace.span("qml", "Test.qml"):
+        pass
+    data = startuptrace.finish()
+    assert not startuptrace.isActive()
+
+    names = {(x["kind"], x["name"]) for x in data["entries"]}
+    assert ("import", "colorsys") in names
+    assert ("qml", "Test.qml") in names
+    with open(path) as f:
+        assert json.load(f)["total"] == data["total"]
+
+
+def test_trace_import_module(tmp_path):
+    sys.modules.pop("colorsys", None)
+    startuptrace.start(str(tmp_path / "trace.json"))
+    importlib.import_module("colorsys")
+    data = startuptrace.finish()
+    assert importlib.import_module.__module__ == "importlib"
+
+    names = {(x["kind"], x["name"]) for x in data["entries"]}
+    assert ("import", "colorsys") in names
+
+
+def test_span_without_trace():
+    assert not startuptrace.isActive()
+    with startuptrace.span("qml", "Test.qml"):
+        pass
+    assert startuptrace.finish() is None
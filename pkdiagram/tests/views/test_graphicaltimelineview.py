@@ -197,3 +197,46 @@ def test_rubber_band_select_events(qtbot, scene, create_gtv):
     )
     assert canvas._rubberBand.isVisible() == False
     assert len(events_for_selectionChanged) == 3
+
+
+def test_tag_lanes_and_rect_cache(scene, create_gtv):
+    TAG_1 = "Tag 1"
+    TAG_2 = "Tag 2"
+
+    gtv = create_gtv()
+    gtv.searchModel.tags = [TAG_1, TAG_2]
+    canvas = gtv.timeline.canvas
+    canvas.setIsSlider(False)
+    for i, person in enumerate(scene.people()):
+        scene.addItem(
+            Event(
+                EventKind.Shift,
+                person,
+                dateTime=util.Date(2000 + i, 1, 1),
+                tags=[TAG_1] if i % 2 == 0 else [TAG_1, TAG_2],
+            )
+        )
+    lanes = dict(canvas._tagRows)
+    assert len(lanes[TAG_1].timelineRows) == 5
+    assert len(lanes[TAG_2].timelineRows) == 2
+    assert lanes[TAG_1].dayOffsets == sorted(lanes[TAG_1].dayOffsets)
+
+    canvas._buildTimelineRowRectCache()
+    cache = canvas._timelineRowRectCache
+    assert len(cache) == 7
+    canvas._buildTimelineRowRectCache()
+    assert canvas._timelineRowRectCache is cache  # reused until geometry changes
+
+    canvas.resize(canvas.width() + 100, canvas.height())
+    canvas._buildTimelineRowRectCache()
+    assert canvas._timelineRowRectCache is not cache
+
+
+def test_paint_tags_without_matching_rows(scene, create_gtv):
+    gtv = create_gtv()
+    gtv.searchModel.tags = ["Nothing tagged"]
+    canvas = gtv.timeline.canvas
+    canvas.setIsSlider(False)
+    lanes = dict(canvas._tagRows)
+    assert lanes["Nothing tagged"].timelineRows == []
+    canvas.grab()  # paintEvent raises if labels use an empty lane
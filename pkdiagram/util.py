@@ -351,6 +351,20 @@ EMOTION_INTENSITY_NAMES = [entry["name"] for entry in EMOTION_INTENSITIES]
 DEFAULT_EMOTION_INTENSITY = 1
 DEFAULT_SCENE_SCALE = 0.33  # so default person size is largest size
 DEEMPHASIZED_OPACITY = 0.1
+
+# Level of detail, by how many view pixels one scene unit takes up (see
+# View.getVisibleSceneScaleRatio()).
+LOD_SIMPLE = 0  # straight emotion lines, no SARF graphics, cached person pixmaps
+LOD_FULL = 1
+LOD_SIMPLE_RATIO = float(os.getenv("FD_LOD_SIMPLE_RATIO", 0.2))
+HIDE_DETAILS_RATIO = float(os.getenv("FD_HIDE_DETAILS_RATIO", 0.28))
+
+
+def levelOfDetailForRatio(ratio: float) -> int:
+    if ratio < LOD_SIMPLE_RATIO:
+        return LOD_SIMPLE
+    return LOD_FULL
+
 CLEAR_BUTTON_OPACITY = 1.0
 BUTTON_SIZE = 36
 MARGIN_Y = round(BUTTON_SIZE / 5)
@@ -1054,6 +1068,16 @@ def dateTimeString(dateTime: QDateTime):
         return ""
 
 
+def dateTimeSortKey(dateTime) -> float:
+    """
+    Milliseconds since the epoch, so that dates can be sorted as numbers
+    instead of through QDateTime comparisons. Null dates sort first.
+    """
+    if dateTime:
+        return dateTime.toMSecsSinceEpoch()
+    return -math.inf
+
+
 def dateRangesOverlap(startA, endA, startB, endB):
     if (not startA and not endA) or (not startB and not endB):
         return True
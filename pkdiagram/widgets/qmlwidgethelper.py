@@ -20,7 +20,7 @@ from pkdiagram.pyqt import (
     QPointF,
     QJSValue,
 )
-from pkdiagram import util
+from pkdiagram import util, startuptrace
 from pkdiagram.models import QObjectHelper
 
 
@@ -74,7 +74,8 @@ class QmlWidgetHelper(QObjectHelper):
         else:
             fpath = QUrl.fromLocalFile(self._qmlSource)
         # log.info(f"Loading QML: {fpath}")
-        self.qml.setSource(fpath)
+        with startuptrace.span("qml", fpath.toString()):
+            self.qml.setSource(fpath)
         if self.qml.status() == QQuickWidget.Error:
             for error in self.qml.errors():
                 log.error(error.toString(), exc_info=True)